@@ -2,7 +2,7 @@
 # CoPawAgent is lazy-loaded so that importing agents.skills_manager (e.g.
 # from CLI init_cmd/skills_cmd) does not pull react_agent, agentscope, tools.
 # pylint: disable=undefined-all-variable
-__all__ = ["CoPawAgent"]
+__all__ = ["AgentTemplate", "CoPawAgent"]
 
 
 def __getattr__(name: str):
@@ -10,4 +10,8 @@ def __getattr__(name: str):
         from .react_agent import CoPawAgent
 
         return CoPawAgent
+    if name == "AgentTemplate":
+        from .template import AgentTemplate
+
+        return AgentTemplate
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""Non-blocking media downloader with a content-addressed cache.
+
+Files are streamed to disk in chunks (never held in memory as a whole),
+hashed while written and stored as ``<cache>/<sha256>/<filename>``, so the
+same content received twice is stored once. URLs are remembered together
+with their ETag; a repeated URL is revalidated with ``If-None-Match`` and
+served from the cache on 304. The cache is bounded in size and evicts the
+least recently used content first.
+
+Disk work (decoding, writing downloaded chunks, scanning, storing,
+evicting, the URL index) runs in worker threads, the cache state under
+one lock, so the event loop only receives bytes; the URL index is written at most every INDEX_SAVE_DELAY
+seconds.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from ..constant import (
+    MEDIA_CACHE_DIR,
+    MEDIA_CACHE_MAX_BYTES,
+    MEDIA_DOWNLOAD_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the network / decoded from base64 per chunk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Seconds without receiving data before a download is aborted
+DOWNLOAD_READ_TIMEOUT = 60
+# Max URLs remembered for ETag revalidation
+URL_INDEX_MAX = 5000
+# Seconds new URL index entries wait before the index is written
+INDEX_SAVE_DELAY = 5.0
+
+_INDEX_FILE = "url_index.json"
+_TMP_DIR = ".tmp"
+
+
+def _safe_filename(filename: str) -> str:
+    """Strip directory parts so a filename cannot escape the cache."""
+    name = os.path.basename(filename.replace("\\", "/")).strip()
+    return name if name not in ("", ".", "..") else "file"
+
+
+def local_path_from_url(url: str) -> Optional[str]:
+    """Return the local path for file:// URLs and existing plain paths."""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme == "file":
+        path = urllib.request.url2pathname(parsed.path)
+    elif not parsed.scheme or (len(parsed.scheme) == 1 and os.name == "nt"):
+        # Plain path (or a Windows drive letter parsed as scheme)
+        path = url
+    else:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+class MediaCache:
+    """Shared download cache (see module docstring).
+
+    Args:
+        cache_dir: Root directory of the cache
+        max_bytes: Evict least recently used content above this size
+        concurrency: Max downloads running at once
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = MEDIA_CACHE_DIR,
+        max_bytes: int = MEDIA_CACHE_MAX_BYTES,
+        concurrency: int = MEDIA_DOWNLOAD_CONCURRENCY,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._concurrency = max(1, concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # url -> in-flight download shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Guards the cache dir, sizes, URL index and counters (threads)
+        self._lock = threading.Lock()
+        self._index_task: Optional[asyncio.Task] = None
+        self._index_dirty = False
+        self._url_index: Optional[Dict[str, Dict[str, Any]]] = None
+        # digest -> size in bytes; None until the cache dir is scanned
+        self._sizes: Optional[Dict[str, int]] = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # ── helpers ─────────────────────────────────────────────────────
+
+    def _bind_loop(self) -> None:
+        """(Re)create loop-bound resources when used from a new loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+        self._session = None
+        self._inflight = {}
+        self._index_task = None
+
+    def _http(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    sock_connect=30,
+                    sock_read=DOWNLOAD_READ_TIMEOUT,
+                ),
+            )
+        return self._session
+
+    def _index(self) -> Dict[str, Dict[str, Any]]:
+        if self._url_index is None:
+            try:
+                with open(
+                    self.cache_dir / _INDEX_FILE,
+                    "r",
+                    encoding="utf-8",
+                ) as f:
+                    self._url_index = json.load(f)
+            except (OSError, ValueError):
+                self._url_index = {}
+        return self._url_index
+
+    def _save_index(self) -> None:
+        with self._lock:
+            if not self._index_dirty:
+                return
+            self._index_dirty = False
+            index = self._index()
+            while len(index) > URL_INDEX_MAX:
+                index.pop(next(iter(index)))
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / _INDEX_FILE
+            tmp = path.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp, path)
+
+    def _schedule_index_save(self) -> None:
+        """Write the URL index soon, once for all entries added until
+        then."""
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.get_running_loop().create_task(
+                self._save_index_later(),
+            )
+
+    async def _save_index_later(self) -> None:
+        # Entries added while writing are saved on the next round
+        while self._index_dirty:
+            await asyncio.sleep(INDEX_SAVE_DELAY)
+            try:
+                await asyncio.to_thread(self._save_index)
+            except OSError:
+                logger.warning(
+                    "Failed to save media URL index",
+                    exc_info=True,
+                )
+                return
+
+    def _scan(self) -> Dict[str, int]:
+        if self._sizes is None:
+            sizes: Dict[str, int] = {}
+            if self.cache_dir.is_dir():
+                for entry in os.scandir(self.cache_dir):
+                    if not entry.is_dir() or entry.name == _TMP_DIR:
+                        continue
+                    files = [f for f in os.scandir(entry.path) if f.is_file()]
+                    if files:
+                        sizes[entry.name] = files[0].stat().st_size
+            self._sizes = sizes
+        return self._sizes
+
+    def _tmp_file(self):
+        tmp_dir = self.cache_dir / _TMP_DIR
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(
+            dir=tmp_dir,
+            delete=False,
+        )
+
+    def _materialize(self, digest: str, filename: str) -> Optional[Path]:
+        """Return ``<digest>/<filename>``, linking it to stored content."""
+        content_dir = self.cache_dir / digest
+        target = content_dir / filename
+        if not target.is_file():
+            try:
+                existing = next(
+                    f for f in content_dir.iterdir() if f.is_file()
+                )
+            except (OSError, StopIteration):
+                return None
+            try:
+                os.link(existing, target)
+            except OSError:
+                shutil.copy2(existing, target)
+        # mtime of the content dir is the LRU clock
+        os.utime(content_dir)
+        return target
+
+    def _store(self, tmp_path: str, digest: str, filename: str) -> Path:
+        """Move a finished temp file into the cache (or drop duplicate).
+
+        Blocking; run it in a thread.
+        """
+        with self._lock:
+            return self._store_locked(tmp_path, digest, filename)
+
+    def _store_locked(
+        self,
+        tmp_path: str,
+        digest: str,
+        filename: str,
+    ) -> Path:
+        sizes = self._scan()
+        if digest in sizes:
+            path = self._materialize(digest, filename)
+            if path is not None:
+                os.unlink(tmp_path)
+                self._hits += 1
+                return path
+            # Removed behind our back; store it again
+            sizes.pop(digest)
+        content_dir = self.cache_dir / digest
+        content_dir.mkdir(parents=True, exist_ok=True)
+        target = content_dir / filename
+        os.replace(tmp_path, target)
+        sizes[digest] = target.stat().st_size
+        self._misses += 1
+        self._evict(keep=digest)
+        return target
+
+    def _evict(self, keep: str) -> None:
+        sizes = self._scan()
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age = []
+        for digest in sizes:
+            try:
+                mtime = (self.cache_dir / digest).stat().st_mtime
+            except OSError:
+                mtime = 0.0
+            by_age.append((mtime, digest))
+        for _, digest in sorted(by_age):
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            shutil.rmtree(self.cache_dir / digest, ignore_errors=True)
+            total -= sizes.pop(digest)
+            self._evictions += 1
+        logger.debug("Media cache evicted down to %d bytes", total)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache hit/miss/eviction counters and current size."""
+        sizes = self._sizes or {}
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "entries": len(sizes),
+            "bytes": sum(sizes.values()),
+        }
+
+    # ── public API ──────────────────────────────────────────────────
+
+    async def close(self) -> None:
+        """Close the HTTP session (pending downloads are not awaited) and
+        write the URL index if it has unsaved entries."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        task, self._index_task = self._index_task, None
+        if task is not None and not task.done():
+            task.cancel()
+        if self._index_dirty:
+            await asyncio.to_thread(self._save_index)
+
+    async def save_base64(
+        self,
+        base64_data: str,
+        filename: Optional[str] = None,
+    ) -> str:
+        """Decode base64 data chunk by chunk into the cache.
+
+        Args:
+            base64_data: Base64 content, optionally with a data: prefix
+            filename: Name to store the file under; a hash-based name is
+                used if not given
+
+        Returns:
+            str: Absolute local path of the file.
+        """
+        return await asyncio.to_thread(
+            self._save_base64_sync,
+            base64_data,
+            filename,
+        )
+
+    def _save_base64_sync(
+        self,
+        base64_data: str,
+        filename: Optional[str],
+    ) -> str:
+        if base64_data.startswith("data:") and "," in base64_data:
+            base64_data = base64_data.split(",", 1)[1]
+        if any(c.isspace() for c in base64_data[:1024]) or (
+            len(base64_data) % 4
+        ):
+            base64_data = "".join(base64_data.split())
+
+        sha = hashlib.sha256()
+        step = DOWNLOAD_CHUNK_SIZE // 3 * 4
+        with self._tmp_file() as tmp:
+            try:
+                for start in range(0, len(base64_data), step):
+                    chunk = base64.b64decode(
+                        base64_data[start : start + step],
+                    )
+                    sha.update(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        digest = sha.hexdigest()
+        name = _safe_filename(filename or f"file_{digest[:32]}")
+        path = self._store(tmp.name, digest, name)
+        logger.debug("Saved base64 file to: %s", path)
+        return str(path.absolute())
+
+    async def download(self, url: str, filename: Optional[str] = None) -> str:
+        """Stream *url* into the cache; concurrent calls share one download.
+
+        Args:
+            url: http(s) URL, file:// URL or existing local path
+            filename: Name to store the file under; taken from the URL
+                path (or a hash of the URL) if not given
+
+        Returns:
+            str: Absolute local path of the file.
+        """
+        local = local_path_from_url(url)
+        if local is not None:
+            return os.path.abspath(local)
+
+        if not filename:
+            url_filename = os.path.basename(urllib.parse.urlparse(url).path)
+            filename = url_filename or (
+                "file_" + hashlib.md5(url.encode()).hexdigest()
+            )
+        filename = _safe_filename(filename)
+
+        self._bind_loop()
+        key = f"{url}\0{filename}"
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._download(url, filename)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve so an unawaited failure is not reported
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Index entry of *url* if its content is still cached."""
+        with self._lock:
+            entry = self._index().get(url)
+            if entry and entry.get("digest") in self._scan():
+                return entry
+            return None
+
+    def _materialize_hit(self, digest: str, filename: str) -> Optional[Path]:
+        with self._lock:
+            path = self._materialize(digest, filename)
+            if path is not None:
+                self._hits += 1
+            return path
+
+    def _record(
+        self,
+        tmp_path: str,
+        digest: str,
+        filename: str,
+        url: str,
+        etag: Optional[str],
+    ) -> Path:
+        """Store a downloaded file and remember *url* with its ETag."""
+        with self._lock:
+            path = self._store_locked(tmp_path, digest, filename)
+            index = self._index()
+            index.pop(url, None)
+            index[url] = {"digest": digest, "etag": etag}
+            self._index_dirty = True
+            return path
+
+    async def _download(self, url: str, filename: str) -> str:
+        entry = await asyncio.to_thread(self._lookup, url)
+        assert self._semaphore is not None
+        async with self._semaphore:
+            fetched = None
+            if entry and entry.get("etag"):
+                fetched = await self._fetch(url, if_none_match=entry["etag"])
+                if fetched is None:
+                    path = await asyncio.to_thread(
+                        self._materialize_hit,
+                        entry["digest"],
+                        filename,
+                    )
+                    if path is not None:
+                        logger.debug("Media cache hit (etag) for %s", url)
+                        return str(path.absolute())
+                    # Evicted since the lookup: fetch the body again
+            if fetched is None:
+                fetched = await self._fetch(url)
+        assert fetched is not None
+        tmp_path, digest, etag = fetched
+
+        path = await asyncio.to_thread(
+            self._record,
+            tmp_path,
+            digest,
+            filename,
+            url,
+            etag,
+        )
+        self._schedule_index_save()
+        logger.debug("Downloaded %s to: %s", url, path)
+        return str(path.absolute())
+
+    async def _fetch(
+        self,
+        url: str,
+        if_none_match: Optional[str] = None,
+    ) -> Optional[Tuple[str, str, Optional[str]]]:
+        """Stream *url* into a temp file; file writes run in a thread.
+
+        Returns:
+            ``(temp path, sha256, ETag)``, or None if the server answered
+            304 to *if_none_match*.
+        """
+        headers = {"If-None-Match": if_none_match} if if_none_match else {}
+        async with self._http().get(url, headers=headers) as resp:
+            if resp.status == 304 and if_none_match:
+                return None
+            if resp.status >= 400:
+                raise RuntimeError(
+                    f"Failed to download file: HTTP {resp.status}",
+                )
+            tmp = await asyncio.to_thread(self._tmp_file)
+            sha = hashlib.sha256()
+            size = 0
+            try:
+                async for chunk in resp.content.iter_chunked(
+                    DOWNLOAD_CHUNK_SIZE,
+                ):
+                    await asyncio.to_thread(_write_chunk, tmp, sha, chunk)
+                    size += len(chunk)
+                await asyncio.to_thread(tmp.close)
+                if size == 0:
+                    raise ValueError("Downloaded file is empty")
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+            return tmp.name, sha.hexdigest(), resp.headers.get("ETag")
+
+
+def _write_chunk(tmp, sha, chunk: bytes) -> None:
+    sha.update(chunk)
+    tmp.write(chunk)
+
+
+_media_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> MediaCache:
+    """Return the process-wide media cache."""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = MediaCache()
+    return _media_cache
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Background memory compaction with soft/hard watermarks.
+
+Compaction is an extra LLM call. Instead of awaiting it right before
+reasoning once the threshold is exceeded, a summary is prepared in the
+background as soon as usage crosses the soft watermark and swapped into
+memory at a later step (or turn). Only when usage crosses the hard
+watermark does the agent block: on the in-flight job if there is one,
+otherwise on an inline compaction.
+
+Hysteresis: after a background job is started, no new one is started for
+the session until its summary has been applied or usage has dropped below
+the re-arm watermark, so a discarded or failed job does not re-trigger on
+every step while usage hovers around the soft watermark.
+
+Agents are created per query, so jobs are tracked per session key by a
+compactor shared through the agent template.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from agentscope.agent._react_agent import _MemoryMark
+from agentscope.message import Msg
+
+from ...constant import (
+    MEMORY_COMPACT_REARM_RATIO,
+    MEMORY_COMPACT_SOFT_RATIO,
+    MEMORY_COMPACT_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sessions tracked at once (oldest idle sessions are dropped first)
+COMPACTION_MAX_SESSIONS = 256
+
+
+class CompactionJob:
+    """A compaction running (or finished) in the background."""
+
+    def __init__(
+        self,
+        task: asyncio.Task,
+        messages: list[Msg],
+        previous_summary: str,
+    ):
+        self.task = task
+        self.messages = messages
+        self.msg_ids = [msg.id for msg in messages]
+        self.previous_summary = previous_summary
+        self.started_at = time.monotonic()
+
+
+class _SessionState:
+    def __init__(self) -> None:
+        self.job: Optional[CompactionJob] = None
+        self.armed = True
+
+
+class BackgroundCompactor:
+    """Prepare compaction summaries ahead of time, per session.
+
+    Args:
+        memory_manager: MemoryManager providing ``compact_memory``
+        threshold: Hard watermark in tokens (blocking compaction)
+        soft_ratio: Soft watermark as a fraction of *threshold*
+        rearm_ratio: Re-arm watermark as a fraction of *threshold*
+    """
+
+    def __init__(
+        self,
+        memory_manager,
+        threshold: int = MEMORY_COMPACT_THRESHOLD,
+        soft_ratio: float = MEMORY_COMPACT_SOFT_RATIO,
+        rearm_ratio: float = MEMORY_COMPACT_REARM_RATIO,
+    ):
+        self._memory_manager = memory_manager
+        self.hard_watermark = threshold
+        self.soft_watermark = int(threshold * soft_ratio)
+        self.rearm_watermark = int(threshold * min(rearm_ratio, soft_ratio))
+        self._sessions: OrderedDict[str, _SessionState] = OrderedDict()
+
+    def _state(self, key: str) -> _SessionState:
+        state = self._sessions.get(key)
+        if state is None:
+            state = _SessionState()
+            self._sessions[key] = state
+            while len(self._sessions) > COMPACTION_MAX_SESSIONS:
+                _, dropped = self._sessions.popitem(last=False)
+                if dropped.job is not None and not dropped.job.task.done():
+                    dropped.job.task.cancel()
+        else:
+            self._sessions.move_to_end(key)
+        return state
+
+    def pending(self, key: str) -> Optional[CompactionJob]:
+        """Return the session's in-flight or unapplied job, if any."""
+        state = self._sessions.get(key)
+        return state.job if state is not None else None
+
+    def should_start(self, key: str, tokens: int) -> bool:
+        """Update the hysteresis state and decide on a background job."""
+        state = self._state(key)
+        if tokens < self.rearm_watermark:
+            state.armed = True
+        return (
+            state.armed and state.job is None and tokens >= self.soft_watermark
+        )
+
+    def start(
+        self,
+        key: str,
+        messages: list[Msg],
+        previous_summary: str,
+    ) -> CompactionJob:
+        """Start compacting *messages* in the background."""
+        state = self._state(key)
+        messages = list(messages)
+        task = asyncio.create_task(
+            self._memory_manager.compact_memory(
+                messages_to_summarize=messages,
+                previous_summary=previous_summary,
+            ),
+        )
+        state.job = CompactionJob(
+            task=task,
+            messages=messages,
+            previous_summary=previous_summary,
+        )
+        state.armed = False
+        logger.info(
+            "Background memory compaction started for %s (%d messages)",
+            key,
+            len(messages),
+        )
+        return state.job
+
+    def discard(self, key: str) -> None:
+        """Drop the session's job (e.g. memory was compacted inline)."""
+        state = self._sessions.get(key)
+        if state is None or state.job is None:
+            return
+        if not state.job.task.done():
+            state.job.task.cancel()
+        state.job = None
+
+    async def apply_ready(
+        self,
+        key: str,
+        memory,
+        wait: bool = False,
+    ) -> Optional[CompactionJob]:
+        """Swap a prepared summary into *memory* if the job has finished.
+
+        The summary and the COMPRESSED marks are applied together. The
+        result is dropped if memory changed in a way that makes it stale
+        (summary replaced, compacted messages gone). Work that must only
+        happen once per compaction (the daily memory summary) belongs
+        after a job is applied, not when it starts.
+
+        Args:
+            key: Session key
+            memory: The agent memory (CoPawInMemoryMemory)
+            wait: Block until the in-flight job finishes
+
+        Returns:
+            Optional[CompactionJob]: The applied job, None if no summary
+                was applied.
+        """
+        state = self._sessions.get(key)
+        if state is None or state.job is None:
+            return None
+        job = state.job
+        if not job.task.done():
+            if not wait:
+                return None
+            logger.info(
+                "Memory above hard watermark, waiting for background "
+                "compaction of %s",
+                key,
+            )
+            try:
+                await asyncio.shield(job.task)
+            except Exception:
+                pass
+
+        state.job = None
+        if job.task.cancelled():
+            return None
+        exc = job.task.exception()
+        if exc is not None:
+            logger.error("Background memory compaction failed: %s", exc)
+            return None
+
+        if memory.get_compressed_summary() != job.previous_summary:
+            logger.info("Discarding stale background compaction for %s", key)
+            return None
+        current_ids = {
+            msg.id
+            for msg, marks in memory.content
+            if _MemoryMark.COMPRESSED not in marks
+        }
+        if not set(job.msg_ids) <= current_ids:
+            logger.info("Discarding stale background compaction for %s", key)
+            return None
+
+        await memory.update_compressed_summary(job.task.result())
+        updated_count = await memory.update_messages_mark(
+            new_mark=_MemoryMark.COMPRESSED,
+            msg_ids=job.msg_ids,
+        )
+        state.armed = True
+        logger.info(
+            "Applied background compaction for %s: %d messages compacted "
+            "(prepared in %.1fs)",
+            key,
+            updated_count,
+            time.monotonic() - job.started_at,
+        )
+        return job
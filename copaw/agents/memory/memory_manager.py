@@ -31,6 +31,7 @@ from agentscope.tool import ToolResponse
 
 from ...config.utils import load_config
 from ...providers import get_active_llm_config
+from ..model_clients import get_model_clients
 
 logger = logging.getLogger(__name__)
 
@@ -229,6 +230,8 @@ class TimestampedDashScopeChatFormatter(DashScopeChatFormatter):
 # Try to import reme, log warning if it fails
 try:
     from reme import ReMeFs
+    from reme.core.embedding import OpenAIEmbeddingModel
+    from reme.core.llm import OpenAILLM
 
     _REME_AVAILABLE = True
 except ImportError:
@@ -362,13 +365,47 @@ class MemoryManager(ReMeFs):
             embedding_api_key=embedding_api_key,
             embedding_base_url=embedding_base_url,
         )
+        self._use_shared_clients()
+
+    def _openai_models(self) -> list:
+        context = getattr(self, "service_context", None)
+        if context is None:
+            return []
+        models = [*context.llms.values(), *context.embedding_models.values()]
+        return [
+            model
+            for model in models
+            if isinstance(model, (OpenAILLM, OpenAIEmbeddingModel))
+        ]
+
+    def _use_shared_clients(self) -> None:
+        """Point ReMe's OpenAI clients at the shared registry.
+
+        ReMe builds one client per model on first use and keeps it even
+        when the API settings change; the registry returns the client of
+        the current settings, on a connection pool shared with agents.
+        """
+        registry = get_model_clients()
+        for model in self._openai_models():
+            if model.api_key:
+                # pylint: disable=protected-access
+                model._client = registry.openai_client(
+                    model.base_url,
+                    model.api_key,
+                )
 
     async def start(self):
         """Start the memory manager and initialize services."""
-        return await super().start()
+        result = await super().start()
+        self._use_shared_clients()
+        return result
 
     async def close(self):
         """Close the memory manager and cleanup resources."""
+        # The shared clients stay open for the agents
+        for model in self._openai_models():
+            # pylint: disable=protected-access
+            model._client = None
         return await super().close()
 
     async def compact_memory(
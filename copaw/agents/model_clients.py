@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""Process-wide registry of LLM clients sharing pooled HTTP connections.
+
+Agents and the memory manager used to build a new OpenAI client (and with
+it a new connection pool) each time, so consecutive turns paid for a new
+TCP + TLS handshake with the provider. The registry keeps one
+``httpx.AsyncClient`` per endpoint (scheme + host + port), HTTP/2 when the
+``h2`` package is installed, and hands out clients and chat models built
+on top of it:
+
+- ``openai_client(base_url, api_key)``: an ``openai.AsyncClient``
+- ``chat_model(provider_id, model, base_url, api_key)``: an
+  ``OpenAIChatModel``
+
+Both are cached by their settings (the API key by its hash), so the same
+settings return the same object and changed provider settings build new
+ones. Pools are only closed by :meth:`ModelClientRegistry.close`, since
+agents created before a settings change may still be using them. Pools
+are bound to the event loop that first uses them (the app's loop).
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import openai
+from agentscope.model import OpenAIChatModel
+
+from ..constant import (
+    LLM_HTTP2,
+    LLM_HTTP_CONNECT_TIMEOUT,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_HTTP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Clients and chat models kept per registry (least recently used dropped)
+_MAX_CACHED = 16
+
+
+@dataclass
+class _PoolStats:
+    requests: int = 0
+    new_connections: int = 0
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """Transport counting requests and newly opened connections."""
+
+    def __init__(self, stats: _PoolStats, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(
+        self,
+        request: httpx.Request,
+    ) -> httpx.Response:
+        self._stats.requests += 1
+        outer = request.extensions.get("trace")
+
+        async def _trace(event: str, info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                self._stats.new_connections += 1
+            if outer is not None:
+                await outer(event, info)
+
+        request.extensions["trace"] = _trace
+        return await super().handle_async_request(request)
+
+
+def _endpoint(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class ModelClientRegistry:
+    """LLM clients and chat models on shared pools (see module docstring).
+
+    Args:
+        max_connections: Max connections of one endpoint's pool
+        max_keepalive: Idle connections kept per pool
+        keepalive_expiry: Seconds an idle connection is kept
+        connect_timeout: Seconds to establish a connection
+        timeout: Seconds for reading a response (and writing a request)
+        http2: Use HTTP/2 when the ``h2`` package is installed
+    """
+
+    def __init__(
+        self,
+        max_connections: int = LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = LLM_HTTP_KEEPALIVE_EXPIRY,
+        connect_timeout: float = LLM_HTTP_CONNECT_TIMEOUT,
+        timeout: float = LLM_HTTP_TIMEOUT,
+        http2: bool = LLM_HTTP2,
+    ):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._lock = threading.Lock()
+        # endpoint -> (pool, stats)
+        self._pools: Dict[str, Tuple[httpx.AsyncClient, _PoolStats]] = {}
+        self._clients: "OrderedDict[tuple, openai.AsyncClient]" = (
+            OrderedDict()
+        )
+        self._models: "OrderedDict[tuple, OpenAIChatModel]" = OrderedDict()
+        self._hits = 0
+        self._builds = 0
+
+    def http_client(self, base_url: str) -> httpx.AsyncClient:
+        """Return the pooled HTTP client of *base_url*'s endpoint."""
+        endpoint = _endpoint(base_url)
+        with self._lock:
+            entry = self._pools.get(endpoint)
+            if entry is None or entry[0].is_closed:
+                stats = _PoolStats()
+                transport = _CountingTransport(
+                    stats,
+                    http2=self._http2,
+                    limits=self._limits,
+                )
+                pool = httpx.AsyncClient(
+                    transport=transport,
+                    timeout=self._timeout,
+                    follow_redirects=True,
+                )
+                entry = (pool, stats)
+                self._pools[endpoint] = entry
+                logger.debug(
+                    "Created LLM HTTP pool for %s (http2=%s)",
+                    endpoint,
+                    self._http2,
+                )
+            return entry[0]
+
+    def _cached(self, cache: OrderedDict, key: tuple) -> Optional[Any]:
+        """Return and refresh the entry for *key* (caller holds lock)."""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            self._hits += 1
+        return value
+
+    def _store(self, cache: OrderedDict, key: tuple, value: Any) -> None:
+        cache[key] = value
+        self._builds += 1
+        while len(cache) > _MAX_CACHED:
+            cache.popitem(last=False)
+
+    def openai_client(
+        self,
+        base_url: str,
+        api_key: str,
+    ) -> openai.AsyncClient:
+        """Return the OpenAI client for these settings.
+
+        Do not close it: the pool is shared.
+        """
+        key = (base_url, _key_hash(api_key))
+        with self._lock:
+            client = self._cached(self._clients, key)
+        if client is not None:
+            return client
+        client = openai.AsyncClient(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=self._timeout,
+            http_client=self.http_client(base_url),
+        )
+        with self._lock:
+            self._store(self._clients, key, client)
+        return client
+
+    def chat_model(
+        self,
+        provider_id: str,
+        model: str,
+        base_url: str,
+        api_key: str,
+    ) -> OpenAIChatModel:
+        """Return the streaming chat model for these settings.
+
+        Models of *provider_id* with other settings are dropped from the
+        cache, so a changed provider is rebuilt once.
+        """
+        key = (provider_id, base_url, _key_hash(api_key), model)
+        with self._lock:
+            chat_model = self._cached(self._models, key)
+            if chat_model is not None:
+                return chat_model
+            stale = [k for k in self._models if k[0] == provider_id]
+            for k in stale:
+                del self._models[k]
+        if stale:
+            logger.info(
+                "Provider %s settings changed; rebuilding its chat model",
+                provider_id or "(default)",
+            )
+        chat_model = OpenAIChatModel(
+            model,
+            api_key=api_key,
+            stream=True,
+            client_kwargs={
+                "base_url": base_url,
+                "timeout": self._timeout,
+                "http_client": self.http_client(base_url),
+            },
+        )
+        with self._lock:
+            self._store(self._models, key, chat_model)
+        return chat_model
+
+    async def close(self) -> None:
+        """Close every pool; clients handed out stop working."""
+        stats = self.stats()
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._clients.clear()
+            self._models.clear()
+        for pool, _stats in pools:
+            await pool.aclose()
+        if pools:
+            logger.info("LLM HTTP pools closed: %s", stats)
+
+    def stats(self) -> Dict[str, Any]:
+        """Client cache and connection reuse counters."""
+        with self._lock:
+            pools = list(self._pools.values())
+        requests = sum(stats.requests for _pool, stats in pools)
+        new_connections = sum(stats.new_connections for _p, stats in pools)
+        return {
+            "http2": self._http2,
+            "pools": len(pools),
+            "clients": len(self._clients),
+            "chat_models": len(self._models),
+            "cache_hits": self._hits,
+            "cache_builds": self._builds,
+            "requests": requests,
+            "new_connections": new_connections,
+            "reused_connections": max(0, requests - new_connections),
+        }
+
+
+_registry: Optional[ModelClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_clients() -> ModelClientRegistry:
+    """Return the process-wide model client registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelClientRegistry()
+        return _registry
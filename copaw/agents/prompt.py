@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 # flake8: noqa: E501
+import hashlib
+import json
 import logging
+import threading
 from pathlib import Path
+from typing import Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -9,10 +13,90 @@ SYS_PROMPT = """
 You are a helpful assistant.
 """
 
+# Prompt files in loading order: (filename, required)
+PROMPT_FILE_ORDER = (
+    ("AGENTS.md", True),
+    ("SOUL.md", True),
+    ("PROFILE.md", False),
+)
 
-def build_system_prompt_from_working_dir() -> (
-    str
-):  # pylint: disable=too-many-branches
+PROMPT_FILES = tuple(filename for filename, _ in PROMPT_FILE_ORDER)
+
+
+def _prompt_files_key(working_dir: Path) -> Tuple:
+    """(path, mtime_ns, size) of every prompt file; None for missing."""
+    key = []
+    for filename in PROMPT_FILES:
+        path = working_dir / filename
+        try:
+            st = path.stat()
+        except OSError:
+            key.append((str(path), None, None))
+        else:
+            key.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(key)
+
+
+# (files key, prompt, prompt hash) of the last built prompt
+_prompt_cache: Optional[Tuple[Tuple, str, str]] = None
+_prompt_cache_lock = threading.Lock()
+
+
+def _cached_system_prompt() -> Tuple[str, str]:
+    """Return (prompt, prompt hash), rebuilding if the files changed."""
+    global _prompt_cache
+    from ..constant import WORKING_DIR
+
+    key = _prompt_files_key(Path(WORKING_DIR))
+    with _prompt_cache_lock:
+        cached = _prompt_cache
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+
+    prompt = _read_system_prompt()
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    with _prompt_cache_lock:
+        _prompt_cache = (key, prompt, prompt_hash)
+    logger.debug("System prompt rebuilt (hash %s)", prompt_hash)
+    return prompt, prompt_hash
+
+
+def build_system_prompt_from_working_dir() -> str:
+    """
+    Build system prompt from the working directory's prompt files, cached.
+
+    The prompt is rebuilt only when the (path, mtime_ns, size) of one of
+    the prompt files changed, or after
+    :func:`invalidate_system_prompt_cache`; otherwise the call costs a
+    few ``stat`` calls and no file reads.
+
+    Returns:
+        str: See :func:`_read_system_prompt`.
+    """
+    return _cached_system_prompt()[0]
+
+
+def get_system_prompt_hash() -> str:
+    """Hash of the current system prompt (built if not cached).
+
+    Stable while the prompt files are unchanged; usable as a cache key
+    or to track prompt changes.
+    """
+    return _cached_system_prompt()[1]
+
+
+def invalidate_system_prompt_cache(*_args) -> None:
+    """Drop the cached prompt; the next build re-reads the files.
+
+    Used as a ConfigWatcher subscriber for prompts changes (catches
+    edits that keep mtime and size, e.g. within the mtime granularity).
+    """
+    global _prompt_cache
+    with _prompt_cache_lock:
+        _prompt_cache = None
+
+
+def _read_system_prompt() -> str:  # pylint: disable=too-many-branches
     """
     Build system prompt by reading markdown files from working directory.
 
@@ -37,17 +121,10 @@ def build_system_prompt_from_working_dir() -> (
 
     working_dir = Path(WORKING_DIR)
 
-    # Define file loading order: (filename, required)
-    file_order = [
-        ("AGENTS.md", True),
-        ("SOUL.md", True),
-        ("PROFILE.md", False),
-    ]
-
     prompt_parts = []
     loaded_count = 0
 
-    for filename, required in file_order:
+    for filename, required in PROMPT_FILE_ORDER:
         file_path = working_dir / filename
 
         if not file_path.exists():
@@ -116,6 +193,63 @@ def build_system_prompt_from_working_dir() -> (
     return final_prompt
 
 
+def assemble_sys_prompt(
+    base_prompt: str,
+    env_context: Optional[str],
+    layout: str = "prefix_cache",
+    skill_prompt: str = "",
+) -> str:
+    """Combine the static prompt parts with the per-request env context.
+
+    Args:
+        base_prompt: Prompt built from the working dir files
+        env_context: Per-session context (session, user, channel), if any
+        layout: "prefix_cache" puts the env context last so the base and
+            skill prompts form a prefix shared by all sessions; "legacy"
+            puts it first
+        skill_prompt: Prompt of the registered agent skills, if any
+
+    Returns:
+        The system prompt.
+    """
+    parts = [base_prompt]
+    if skill_prompt:
+        parts.append(skill_prompt)
+    if env_context is not None:
+        if layout == "legacy":
+            parts.insert(0, env_context)
+        else:
+            parts.append(env_context)
+    return "\n\n".join(parts)
+
+
+def compute_prefix_fingerprint(
+    tool_schemas: List[Any],
+    base_prompt: str,
+    skill_prompt: str = "",
+) -> str:
+    """Fingerprint the request prefix shared by all sessions.
+
+    Covers the tool schemas, the static system prompt and the skill
+    prompt, which lead every request in the prefix_cache layout; when
+    it changes, provider-side prefix caches start over.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            tool_schemas,
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8"),
+    )
+    digest.update(b"\0")
+    digest.update(base_prompt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(skill_prompt.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
 def build_bootstrap_guidance(
     bootstrap_content: str,
     language: str = "zh",
@@ -3,27 +3,43 @@ import asyncio
 import datetime
 import logging
 import os
-from typing import Optional, Type, List, Sequence, Tuple, Any
+from typing import (
+    Any,
+    Collection,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
 from agentscope.agent import ReActAgent
 from agentscope.agent._react_agent import _MemoryMark
-from agentscope.formatter import OpenAIChatFormatter
+from agentscope.formatter import FormatterBase, OpenAIChatFormatter
 from agentscope.memory import InMemoryMemory
-from agentscope.message import Msg, TextBlock
-from agentscope.model import OpenAIChatModel
+from agentscope.message import Msg, TextBlock, ToolResultBlock, ToolUseBlock
+from agentscope.model import ChatModelBase, OpenAIChatModel
 from agentscope.tool import Toolkit
 from pydantic import BaseModel
 
+from .model_clients import get_model_clients
 from .prompt import (
+    assemble_sys_prompt,
     build_system_prompt_from_working_dir,
     build_bootstrap_guidance,
 )
+from .tool_offload import (
+    collapse_old_results,
+    is_offloaded_path,
+    offload_output,
+)
 from .skills_manager import (
     ensure_skills_initialized,
     get_working_skills_dir,
     list_available_skills,
 )
 from .tools import (
+    READ_ONLY_TOOLS,
     execute_shell_command,
     read_file,
     write_file,
@@ -36,16 +52,18 @@ from .tools import (
 )
 from .utils import (
     process_file_and_media_blocks_in_message,
-    count_message_tokens,
     check_valid_messages,
+    get_message_token_cache,
     is_first_user_interaction,
     prepend_to_message_content,
 )
 from ..agents.memory import MemoryManager
+from ..agents.memory.compaction import BackgroundCompactor
 from ..config import load_config
 from ..constant import (
-    MEMORY_COMPACT_THRESHOLD,
     MEMORY_COMPACT_KEEP_RECENT,
+    PROMPT_LAYOUT,
+    TOOL_CALL_CONCURRENCY,
     WORKING_DIR,
 )
 from ..providers import get_active_llm_config
@@ -190,6 +208,89 @@ class CoPawInMemoryMemory(InMemoryMemory):
         self._compressed_summary = state_dict.get("_compressed_summary", "")
 
 
+def build_toolkit(
+    memory_manager: MemoryManager | None = None,
+) -> Toolkit:
+    """Build a toolkit with the built-in tools and all active skills.
+
+    Args:
+        memory_manager: Optional memory manager; when given, the
+            memory_search tool is registered as well.
+
+    Returns:
+        Toolkit ready to be shared by agents (MCP clients not included).
+    """
+    toolkit = Toolkit()
+    toolkit.register_tool_function(execute_shell_command)
+    toolkit.register_tool_function(read_file)
+    toolkit.register_tool_function(write_file)
+    toolkit.register_tool_function(edit_file)
+    toolkit.register_tool_function(browser_use)
+    # toolkit.register_tool_function(append_file)
+    toolkit.register_tool_function(desktop_screenshot)
+    toolkit.register_tool_function(send_file_to_user)
+    toolkit.register_tool_function(get_current_time)
+
+    # Check skills initialization
+    ensure_skills_initialized()
+
+    working_skills_dir = get_working_skills_dir()
+    available_skills = list_available_skills()
+
+    for skill_name in available_skills:
+        skill_dir = working_skills_dir / skill_name
+        if skill_dir.exists():
+            try:
+                toolkit.register_agent_skill(str(skill_dir))
+                logger.debug("Registered skill: %s", skill_name)
+            except Exception as e:
+                logger.error(
+                    "Failed to register skill '%s': %s",
+                    skill_name,
+                    e,
+                )
+
+    # Register memory_search tool if memory_manager is available
+    if memory_manager is not None:
+        memory_search_tool = create_memory_search_tool(memory_manager)
+        toolkit.register_tool_function(memory_search_tool)
+        logger.debug("Registered memory_search tool")
+
+    return toolkit
+
+
+def build_chat_model() -> OpenAIChatModel:
+    """Return the chat model of the active LLM slot.
+
+    Falls back to DASHSCOPE_API_KEY when no active LLM is configured.
+    The model comes from the shared registry: same settings return the
+    same model, whose HTTP connections are pooled across agents.
+    """
+    # Resolve model / api_key / base_url from the active LLM slot
+    llm_cfg = get_active_llm_config()
+    if llm_cfg and llm_cfg.api_key:
+        provider_id = llm_cfg.provider_id
+        model_name = llm_cfg.model or "qwen3-max"
+        api_key = llm_cfg.api_key
+        base_url = llm_cfg.base_url
+    else:
+        logger.warning(
+            "No active LLM configured — "
+            "falling back to DASHSCOPE_API_KEY env var",
+        )
+        provider_id = ""
+        model_name = "qwen3-max"
+        api_key = os.getenv("DASHSCOPE_API_KEY", "")
+        base_url = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+
+    return get_model_clients().chat_model(
+        provider_id,
+        model_name,
+        base_url,
+        api_key,
+    )
+
+
 class CoPawAgent(ReActAgent):
     def __init__(
         self,
@@ -197,82 +298,69 @@ class CoPawAgent(ReActAgent):
         enable_memory_manager: bool = True,
         mcp_clients: Optional[List[Any]] = None,
         memory_manager: MemoryManager | None = None,
+        toolkit: Optional[Toolkit] = None,
+        model: Optional[ChatModelBase] = None,
+        formatter: Optional[FormatterBase] = None,
+        base_sys_prompt: Optional[str] = None,
+        compactor: Optional[BackgroundCompactor] = None,
+        session_key: Optional[str] = None,
+        read_only_tools: Collection[str] = READ_ONLY_TOOLS,
+        tool_concurrency: int = TOOL_CALL_CONCURRENCY,
     ):
         """Initialize CoPawAgent.
 
         Args:
             env_context: Optional environment context
             enable_memory_manager: Whether to enable memory manager
+            mcp_clients: MCP clients to register via register_mcp_clients
+            memory_manager: Optional memory manager
+            toolkit: Pre-built (shared) toolkit; built from scratch if None
+            model: Pre-built (shared) chat model; created if None
+            formatter: Pre-built (shared) formatter; created if None
+            base_sys_prompt: Prompt built from the working dir files; read
+                from disk if None
+            compactor: Background compactor shared across queries, so a
+                summary prepared during one query can be applied in the
+                next; a private one is created if None
+            session_key: Key of the session in *compactor*; defaults to
+                this agent instance
+            read_only_tools: Names of tools without side effects; calls
+                of these in one reasoning step run concurrently, any
+                other tool call runs alone, in order
+            tool_concurrency: Max tool calls running at once
         """
-        toolkit = Toolkit()
         self._mcp_clients = mcp_clients or []
         self._env_context = env_context
-        toolkit.register_tool_function(execute_shell_command)
-        toolkit.register_tool_function(read_file)
-        toolkit.register_tool_function(write_file)
-        toolkit.register_tool_function(edit_file)
-        toolkit.register_tool_function(browser_use)
-        # toolkit.register_tool_function(append_file)
-        toolkit.register_tool_function(desktop_screenshot)
-        toolkit.register_tool_function(send_file_to_user)
-        toolkit.register_tool_function(get_current_time)
-
-        # Check skills initialization
-        ensure_skills_initialized()
-
-        working_skills_dir = get_working_skills_dir()
-        available_skills = list_available_skills()
-
-        for skill_name in available_skills:
-            skill_dir = working_skills_dir / skill_name
-            if skill_dir.exists():
-                try:
-                    toolkit.register_agent_skill(str(skill_dir))
-                    logger.debug("Registered skill: %s", skill_name)
-                except Exception as e:
-                    logger.error(
-                        "Failed to register skill '%s': %s",
-                        skill_name,
-                        e,
-                    )
+        self._base_sys_prompt = base_sys_prompt
+        if toolkit is None:
+            toolkit = build_toolkit(memory_manager=memory_manager)
 
         sys_prompt = self._build_sys_prompt()
 
-        # Resolve model / api_key / base_url from the active LLM slot
-        llm_cfg = get_active_llm_config()
-        if llm_cfg and llm_cfg.api_key:
-            model_name = llm_cfg.model or "qwen3-max"
-            api_key = llm_cfg.api_key
-            base_url = llm_cfg.base_url
-        else:
-            logger.warning(
-                "No active LLM configured — "
-                "falling back to DASHSCOPE_API_KEY env var",
-            )
-            model_name = "qwen3-max"
-            api_key = os.getenv("DASHSCOPE_API_KEY", "")
-            base_url = "https://dashscope.aliyuncs.com/compatible-mode/v1"
-
         super().__init__(
             name="Friday",
-            model=OpenAIChatModel(
-                model_name,
-                api_key=api_key,
-                stream=True,
-                client_kwargs={"base_url": base_url},
-            ),
+            model=model if model is not None else build_chat_model(),
             sys_prompt=sys_prompt,
             toolkit=toolkit,
             memory=CoPawInMemoryMemory(),
-            formatter=CoPawAgentFormatter(),
+            formatter=(
+                formatter if formatter is not None else CoPawAgentFormatter()
+            ),
+            parallel_tool_calls=True,
         )
+        self._read_only_tools = frozenset(
+            name for name in self.toolkit.tools if name in read_only_tools
+        )
+        self._tool_slots = asyncio.Semaphore(max(1, tool_concurrency))
+        # Completion of the tool calls started so far (see _acting)
+        self._last_exclusive_call: Optional[asyncio.Future] = None
+        self._read_only_calls: List[asyncio.Future] = []
+        self._last_recorded_call: Optional[asyncio.Future] = None
         self.memory_manager = memory_manager
-
-        # Register memory_search tool if memory_manager is available
-        if self.memory_manager is not None:
-            memory_search_tool = create_memory_search_tool(self.memory_manager)
-            self.toolkit.register_tool_function(memory_search_tool)
-            logger.debug("Registered memory_search tool")
+        if compactor is None and memory_manager is not None:
+            compactor = BackgroundCompactor(memory_manager)
+        self._compactor = compactor
+        self._session_key = session_key or f"agent-{id(self)}"
 
         self.register_instance_hook(
             hook_type="pre_reasoning",
@@ -281,6 +369,12 @@ class CoPawAgent(ReActAgent):
         )
         logger.debug("Registered bootstrap hook")
 
+        self.register_instance_hook(
+            hook_type="pre_reasoning",
+            hook_name="tool_result_collapse_hook",
+            hook=CoPawAgent._pre_reasoning_collapse_hook,
+        )
+
         if enable_memory_manager and self.memory_manager is not None:
             self.register_instance_hook(
                 hook_type="pre_reasoning",
@@ -293,11 +387,28 @@ class CoPawAgent(ReActAgent):
         self._bootstrap_checked = False
 
     def _build_sys_prompt(self) -> str:
-        """Build system prompt from working dir files and env context."""
-        sys_prompt = build_system_prompt_from_working_dir()
-        if self._env_context is not None:
-            sys_prompt = self._env_context + "\n\n" + sys_prompt
-        return sys_prompt
+        """Build the base system prompt from the working dir files.
+
+        The skill prompt and env context are added by :attr:`sys_prompt`.
+        """
+        if self._base_sys_prompt is not None:
+            return self._base_sys_prompt
+        return build_system_prompt_from_working_dir()
+
+    @property
+    def sys_prompt(self) -> str:
+        """The system prompt: base prompt, skill prompt, env context.
+
+        ``_sys_prompt`` holds the base prompt only, so in the
+        prefix_cache layout (see PROMPT_LAYOUT) the per-session env
+        context comes after every part shared by all sessions.
+        """
+        return assemble_sys_prompt(
+            self._sys_prompt,
+            self._env_context,
+            PROMPT_LAYOUT,
+            self.toolkit.get_agent_skill_prompt() or "",
+        )
 
     def rebuild_sys_prompt(self) -> None:
         """Rebuild and replace the system prompt.
@@ -305,18 +416,118 @@ class CoPawAgent(ReActAgent):
         Useful after load_session_state to ensure the prompt reflects
         the latest AGENTS.md / SOUL.md / PROFILE.md on disk.
 
-        Updates both ``self._sys_prompt`` and the first system-role
-        message stored in ``self.memory.content`` (if one exists).
+        Updates both ``self._sys_prompt`` (the base prompt) and the
+        first system-role message stored in ``self.memory.content`` (if
+        one exists), which gets the full :attr:`sys_prompt` in the same
+        order. The message is only rewritten when the prompt actually
+        changed, so the request prefix stays byte-stable across turns.
         """
         self._sys_prompt = self._build_sys_prompt()
 
         # Also update the first system prompt message in memory
         for msg, _marks in self.memory.content:
-            if msg.role == "system":
+            if msg.role == "system" and msg.content != self.sys_prompt:
                 msg.content = self.sys_prompt
             # Stop after inspecting the first message regardless
             break
 
+    async def _acting(self, tool_call: ToolUseBlock) -> dict | None:
+        """Execute a tool call, concurrently with others where safe.
+
+        The reasoning-acting loop starts all tool calls of a step at once
+        (``parallel_tool_calls``), in their original order. Read-only
+        calls only wait for the last side-effecting call before them;
+        a side-effecting call waits for every call before it, and later
+        calls wait for it. At most ``tool_concurrency`` run at a time.
+        Results are recorded in memory in the original order, so tool
+        results keep following their tool_use blocks.
+        """
+        loop = asyncio.get_running_loop()
+        # Bookkeeping before the first await, i.e. in call order
+        finished = loop.create_future()
+        recorded = loop.create_future()
+        if tool_call["name"] in self._read_only_tools:
+            waits_for = [self._last_exclusive_call]
+            self._read_only_calls.append(finished)
+        else:
+            waits_for = [self._last_exclusive_call, *self._read_only_calls]
+            self._read_only_calls = []
+            self._last_exclusive_call = finished
+        previous_record = self._last_recorded_call
+        self._last_recorded_call = recorded
+
+        tool_res_msg = Msg(
+            "system",
+            [
+                ToolResultBlock(
+                    type="tool_result",
+                    id=tool_call["id"],
+                    name=tool_call["name"],
+                    output=[],
+                ),
+            ],
+            "system",
+        )
+        try:
+            pending = [f for f in waits_for if f is not None and not f.done()]
+            if pending:
+                await asyncio.wait(pending)
+            async with self._tool_slots:
+                return await self._run_tool_call(tool_call, tool_res_msg)
+        finally:
+            if not finished.done():
+                finished.set_result(None)
+            try:
+                if previous_record is not None:
+                    await asyncio.shield(previous_record)
+                await self.memory.add(tool_res_msg)
+            finally:
+                if not recorded.done():
+                    recorded.set_result(None)
+
+    async def _run_tool_call(
+        self,
+        tool_call: ToolUseBlock,
+        tool_res_msg: Msg,
+    ) -> dict | None:
+        """Run *tool_call*, streaming its output into *tool_res_msg*.
+
+        Same as ``ReActAgent._acting`` except that the caller records
+        the result in memory.
+        """
+        tool_res = await self.toolkit.call_tool_function(tool_call)
+        async for chunk in tool_res:
+            output = chunk.content
+            if chunk.is_last and self._should_offload(tool_call):
+                output = await asyncio.to_thread(offload_output, output)
+            tool_res_msg.content[0]["output"] = output
+            await self.print(tool_res_msg, chunk.is_last)
+
+            # Handled by handle_interrupt
+            if chunk.is_interrupted:
+                raise asyncio.CancelledError()
+
+            # Only the structured output of a successful finish call
+            if (
+                tool_call["name"] == self.finish_function_name
+                and chunk.metadata
+                and chunk.metadata.get("success", False)
+            ):
+                return chunk.metadata.get("structured_output")
+        return None
+
+    def _should_offload(self, tool_call: ToolUseBlock) -> bool:
+        """Whether a large result of *tool_call* goes to a file."""
+        if tool_call["name"] == self.finish_function_name:
+            return False
+        # Pages of an offloaded output are bounded by read_file itself
+        file_path = (tool_call.get("input") or {}).get("file_path")
+        return not (
+            tool_call["name"] == "read_file"
+            and isinstance(file_path, str)
+            and is_offloaded_path(file_path)
+        )
+
     async def register_mcp_clients(self) -> None:
         """Register MCP clients on this agent's toolkit after construction."""
         for client in self._mcp_clients:
@@ -373,6 +584,102 @@ class CoPawAgent(ReActAgent):
 
         return None
 
+    async def _pre_reasoning_collapse_hook(  # pylint: disable=unused-argument
+        self,
+        kwargs: dict[str, Any],
+    ) -> dict[str, Any] | None:
+        """Collapse large tool results of earlier steps to previews."""
+        try:
+            await collapse_old_results(
+                [msg for msg, _marks in self.memory.content],
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to collapse old tool results: %s",
+                e,
+                exc_info=True,
+            )
+        return None
+
+    async def _split_compactable_messages(
+        self,
+    ) -> Optional[Tuple[List[Msg], List[Msg], List[Msg]]]:
+        """Split uncompressed memory into system/compactable/recent parts.
+
+        Returns:
+            (system_prompt_messages, messages_to_compact, messages_to_keep),
+            or None if there are not enough messages to compact.
+        """
+        messages = await self.memory.get_memory(
+            exclude_mark=_MemoryMark.COMPRESSED,
+            prepend_summary=False,
+        )
+        if not messages:
+            return None
+
+        logger.debug(f"===last message===: {messages[-1]}")
+
+        # Extract system prompt (consecutive system messages at start)
+        system_prompt_messages = []
+        for msg in messages:
+            if msg.role == "system":
+                system_prompt_messages.append(msg)
+            else:
+                break
+
+        # Get remaining messages after system prompt
+        remaining_messages = messages[len(system_prompt_messages) :]
+
+        # Skip if not enough messages to compact
+        if len(remaining_messages) <= MEMORY_COMPACT_KEEP_RECENT:
+            return None
+
+        # ensure the messages_to_keep is valid
+        keep_length = MEMORY_COMPACT_KEEP_RECENT
+        while keep_length > 0 and not check_valid_messages(
+            remaining_messages[-keep_length:],
+        ):
+            keep_length -= 1
+
+        # Split into compactable and recent messages
+        if keep_length > 0:
+            messages_to_compact = remaining_messages[:-keep_length]
+            messages_to_keep = remaining_messages[-keep_length:]
+        else:
+            messages_to_compact = remaining_messages
+            messages_to_keep = []
+        return system_prompt_messages, messages_to_compact, messages_to_keep
+
+    async def _count_compactable_tokens(self, messages: List[Msg]) -> int:
+        """Count tokens of *messages*; per-message counts are cached so
+        only new/edited messages are tokenized."""
+        token_cache = get_message_token_cache()
+        try:
+            estimated_tokens: int = await token_cache.count(
+                messages,
+                self.formatter,
+            )
+        except Exception as e:
+            prompt = await self.formatter.format(msgs=messages)
+            estimated_tokens = len(str(prompt)) // 4
+            logger.exception(
+                f"Failed to count tokens: {e}\n"
+                f"using estimated_tokens={estimated_tokens}",
+            )
+        logger.debug("Message token cache stats: %s", token_cache.stats())
+        return estimated_tokens
+
+    def _start_summary_task(self, messages: List[Msg]) -> None:
+        """Summarize *messages* into the daily memory in the background."""
+        self.summary_tasks.append(
+            asyncio.create_task(
+                self.memory_manager.summary_memory(
+                    messages=messages,
+                    date=datetime.datetime.now().strftime("%Y-%m-%d"),
+                ),
+            ),
+        )
+
     async def _pre_reasoning_compact_hook(  # pylint: disable=unused-argument
         self,
         kwargs: dict[str, Any],
@@ -382,7 +689,12 @@ class CoPawAgent(ReActAgent):
         This hook is called before each reasoning step. It extracts system
         prompt messages (consecutive system messages at the start) and recent
         messages, then counts tokens for the middle compactable messages only.
-        If the token count exceeds the threshold, it triggers compaction.
+
+        Compaction runs in the background: above the soft watermark a
+        summary is prepared without blocking the step, and swapped in by a
+        later step (or turn) once ready. Above the hard watermark
+        (MEMORY_COMPACT_THRESHOLD) the step waits for the in-flight job,
+        or compacts inline if there is none.
 
         Memory structure:
             [System Prompt (preserved)] + [Compactable (counted)] +
@@ -398,76 +710,56 @@ class CoPawAgent(ReActAgent):
         if self.memory_manager is None:
             return None
 
+        compactor = self._compactor
+        key = self._session_key
         try:
-            messages = await self.memory.get_memory(
-                exclude_mark=_MemoryMark.COMPRESSED,
-                prepend_summary=False,
-            )
-
-            logger.debug(f"===last message===: {messages[-1]}")
-
-            # Extract system prompt (consecutive system messages at start)
-            system_prompt_messages = []
-            for msg in messages:
-                if msg.role == "system":
-                    system_prompt_messages.append(msg)
-                else:
-                    break
+            # Swap in a summary prepared in the background, if ready
+            applied = await compactor.apply_ready(key, self.memory)
+            if applied is not None:
+                self._start_summary_task(applied.messages)
 
-            # Get remaining messages after system prompt
-            remaining_messages = messages[len(system_prompt_messages) :]
-
-            # Skip if not enough messages to compact
-            if len(remaining_messages) <= MEMORY_COMPACT_KEEP_RECENT:
+            split = await self._split_compactable_messages()
+            if split is None:
                 return None
+            estimated_tokens = await self._count_compactable_tokens(split[1])
 
-            # ensure the messages_to_keep is valid
-            keep_length = MEMORY_COMPACT_KEEP_RECENT
-            while keep_length > 0 and not check_valid_messages(
-                remaining_messages[-keep_length:],
+            # Hard watermark: block on the in-flight job, then re-check
+            if (
+                estimated_tokens > compactor.hard_watermark
+                and compactor.pending(key) is not None
             ):
-                keep_length -= 1
-
-            # Split into compactable and recent messages
-            if keep_length > 0:
-                messages_to_compact = remaining_messages[:-keep_length]
-                messages_to_keep = remaining_messages[-keep_length:]
-            else:
-                messages_to_compact = remaining_messages
-                messages_to_keep = []
-
-            # Count tokens for compactable messages only
-            prompt = await self.formatter.format(msgs=messages_to_compact)
-            try:
-                estimated_tokens: int = await count_message_tokens(prompt)
-            except Exception as e:
-                estimated_tokens = len(str(prompt)) // 4
-                logger.exception(
-                    f"Failed to count tokens: {e}\n"
-                    f"using estimated_tokens={estimated_tokens}",
+                applied = await compactor.apply_ready(
+                    key,
+                    self.memory,
+                    wait=True,
+                )
+                if applied is not None:
+                    self._start_summary_task(applied.messages)
+                split = await self._split_compactable_messages()
+                if split is None:
+                    return None
+                estimated_tokens = await self._count_compactable_tokens(
+                    split[1],
                 )
 
+            system_prompt_messages, messages_to_compact, messages_to_keep = (
+                split
+            )
+
             # Check if the compactable part exceeds threshold
-            if estimated_tokens > MEMORY_COMPACT_THRESHOLD:
+            if estimated_tokens > compactor.hard_watermark:
                 logger.info(
                     "Memory compaction triggered: estimated %d tokens "
                     "(threshold: %d), system_prompt_msgs: %d, "
                     "compactable_msgs: %d, keep_recent_msgs: %d",
                     estimated_tokens,
-                    MEMORY_COMPACT_THRESHOLD,
+                    compactor.hard_watermark,
                     len(system_prompt_messages),
                     len(messages_to_compact),
                     len(messages_to_keep),
                 )
 
-                self.summary_tasks.append(
-                    asyncio.create_task(
-                        self.memory_manager.summary_memory(
-                            messages=messages_to_compact,
-                            date=datetime.datetime.now().strftime("%Y-%m-%d"),
-                        ),
-                    ),
-                )
+                self._start_summary_task(messages_to_compact)
 
                 compact_content: str = (
                     await self.memory_manager.compact_memory(
@@ -486,6 +778,23 @@ class CoPawAgent(ReActAgent):
                     updated_count,
                 )
 
+            elif compactor.should_start(key, estimated_tokens):
+                logger.info(
+                    "Memory above soft watermark: estimated %d tokens "
+                    "(soft: %d, hard: %d), compacting %d messages "
+                    "in background",
+                    estimated_tokens,
+                    compactor.soft_watermark,
+                    compactor.hard_watermark,
+                    len(messages_to_compact),
+                )
+                # The daily summary is written once the result is applied
+                compactor.start(
+                    key,
+                    messages_to_compact,
+                    previous_summary=self.memory.get_compressed_summary(),
+                )
+
         except Exception as e:
             # todo: handle the exception
             logger.error(
@@ -560,6 +869,14 @@ class CoPawAgent(ReActAgent):
             )
 
         logger.debug(f"Enter received command: {query}")
+        if self._compactor is not None and query in (
+            "/compact",
+            "/new",
+            "/clear",
+        ):
+            # A summary prepared in the background is stale after these
+            self._compactor.discard(self._session_key)
+
         if query == "/compact":
             self.summary_tasks.append(
                 asyncio.create_task(
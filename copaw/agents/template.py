@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Pre-built agent template shared across queries.
+
+Building a CoPawAgent from scratch registers every tool and skill, reads
+the prompt files and providers.json and creates a new model client. The
+template keeps these immutable parts and hands out cheap per-session
+agents that only own their memory and env context. It is rebuilt when
+skills, providers or prompt files change on disk.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, List, Optional
+
+from agentscope.formatter import FormatterBase
+from agentscope.model import ChatModelBase
+from agentscope.tool import Toolkit
+
+from .memory import MemoryManager
+from .memory.compaction import BackgroundCompactor
+from .prompt import (
+    PROMPT_FILES,
+    build_system_prompt_from_working_dir,
+    compute_prefix_fingerprint,
+    get_system_prompt_hash,
+)
+from .react_agent import (
+    CoPawAgent,
+    CoPawAgentFormatter,
+    build_chat_model,
+    build_toolkit,
+)
+from .skills_manager import get_active_skills_dir
+from ..constant import WORKING_DIR
+from ..providers.store import get_providers_json_path
+
+logger = logging.getLogger(__name__)
+
+
+def _stat_key(path: Path) -> tuple:
+    """Return a cheap change key for *path* (missing files included)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return (str(path), None, None)
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def compute_template_fingerprint() -> tuple:
+    """Fingerprint the on-disk inputs of the agent template.
+
+    Covers providers.json, the prompt files, the active_skills directory
+    (skills added/removed) and every SKILL.md (skills edited). Only stat
+    calls are made, no file is read.
+    """
+    keys: list[tuple] = [_stat_key(get_providers_json_path())]
+    keys.extend(_stat_key(WORKING_DIR / name) for name in PROMPT_FILES)
+
+    skills_dir = get_active_skills_dir()
+    keys.append(_stat_key(skills_dir))
+    if skills_dir.is_dir():
+        skill_names = sorted(
+            entry.name for entry in os.scandir(skills_dir) if entry.is_dir()
+        )
+        keys.extend(
+            _stat_key(skills_dir / name / "SKILL.md") for name in skill_names
+        )
+
+    # Fallback credentials used when no active LLM is configured
+    fallback_key = os.getenv("DASHSCOPE_API_KEY", "")
+    keys.append(
+        ("DASHSCOPE_API_KEY", hashlib.sha256(fallback_key.encode()).digest()),
+    )
+    return tuple(keys)
+
+
+class AgentTemplate:
+    """Immutable agent parts shared by all per-session agents.
+
+    Holds the toolkit (tools, skills, MCP tools), the formatter, the model
+    client and the system prompt built from the working dir. Per-query
+    agents created by :meth:`create_agent` only carry their own memory and
+    env context.
+    """
+
+    def __init__(
+        self,
+        mcp_clients: Optional[List[Any]] = None,
+        memory_manager: MemoryManager | None = None,
+    ):
+        self._mcp_clients = mcp_clients or []
+        self._memory_manager = memory_manager
+        # Outlives the per-query agents so background compaction started
+        # in one query can be applied in the next one of the same session
+        self._compactor = (
+            BackgroundCompactor(memory_manager)
+            if memory_manager is not None
+            else None
+        )
+        self._lock = asyncio.Lock()
+
+        self._fingerprint: Optional[tuple] = None
+        self._toolkit: Optional[Toolkit] = None
+        self._model: Optional[ChatModelBase] = None
+        self._formatter: Optional[FormatterBase] = None
+        self._sys_prompt: Optional[str] = None
+        self._prompt_hash: Optional[str] = None
+        self._prefix_fingerprint: Optional[str] = None
+        self._build_count = 0
+
+    @property
+    def build_count(self) -> int:
+        """Number of times the template has been (re)built."""
+        return self._build_count
+
+    @property
+    def prompt_hash(self) -> Optional[str]:
+        """Hash of the system prompt the agents are built with."""
+        return self._prompt_hash
+
+    @property
+    def prefix_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the tool schemas, static and skill prompts.
+
+        Requests of every session start with these (see PROMPT_LAYOUT),
+        so a change means provider-side prefix caches start over.
+        """
+        return self._prefix_fingerprint
+
+    def invalidate(self) -> None:
+        """Drop the cached parts; the next agent rebuilds them."""
+        self._fingerprint = None
+
+    async def _build(self) -> None:
+        """Build all shared parts and publish them at once."""
+        toolkit = build_toolkit(memory_manager=self._memory_manager)
+        for client in self._mcp_clients:
+            await toolkit.register_mcp_client(client)
+
+        self._toolkit = toolkit
+        self._model = build_chat_model()
+        self._formatter = CoPawAgentFormatter()
+        self._sys_prompt = build_system_prompt_from_working_dir()
+        self._prompt_hash = get_system_prompt_hash()
+        # Taken after building: resolving providers may touch providers.json
+        self._fingerprint = compute_template_fingerprint()
+        self._build_count += 1
+        logger.info(
+            "Agent template built (#%d): %d tool(s), %d skill(s)",
+            self._build_count,
+            len(toolkit.tools),
+            len(toolkit.skills),
+        )
+        self._track_prefix()
+
+    def _track_prefix(self) -> None:
+        fingerprint = compute_prefix_fingerprint(
+            self._toolkit.get_json_schemas(),
+            self._sys_prompt,
+            self._toolkit.get_agent_skill_prompt() or "",
+        )
+        previous = self._prefix_fingerprint
+        self._prefix_fingerprint = fingerprint
+        if previous is not None and previous != fingerprint:
+            logger.info(
+                "Prompt prefix changed (%s -> %s); provider-side prefix "
+                "caches start over",
+                previous,
+                fingerprint,
+            )
+        else:
+            logger.debug("Prompt prefix fingerprint: %s", fingerprint)
+
+    async def ensure_fresh(self) -> None:
+        """Rebuild the template if its on-disk inputs have changed."""
+        fingerprint = compute_template_fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+        async with self._lock:
+            # Another query may have rebuilt it while we waited
+            if fingerprint == self._fingerprint:
+                return
+            await self._build()
+
+    async def create_agent(
+        self,
+        env_context: Optional[str] = None,
+        session_key: Optional[str] = None,
+    ) -> CoPawAgent:
+        """Create a per-session agent sharing this template's parts.
+
+        Args:
+            env_context: Per-request environment context
+            session_key: Stable key of the session (user + session id),
+                used to track background memory compaction
+
+        Returns:
+            CoPawAgent with fresh memory and the shared toolkit/model.
+        """
+        await self.ensure_fresh()
+        return CoPawAgent(
+            env_context=env_context,
+            memory_manager=self._memory_manager,
+            toolkit=self._toolkit,
+            model=self._model,
+            formatter=self._formatter,
+            base_sys_prompt=self._sys_prompt,
+            compactor=self._compactor,
+            session_key=session_key,
+        )
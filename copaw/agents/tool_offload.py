@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Offload large tool results to files, keeping previews in memory.
+
+A tool result whose text is longer than TOOL_RESULT_OFFLOAD_CHARS is
+written to a content-addressed file under TOOL_RESULTS_DIR (the same
+output is stored once). The model gets the beginning and the end of the
+output plus the file path, which it can page through with ``read_file``
+(start_line / end_line or tail_lines), instead of the full text being
+re-sent on every later reasoning step.
+
+Results the model has already acted on (TOOL_RESULT_COLLAPSE_AFTER
+reasoning steps ago) are collapsed the same way once they are longer
+than a preview.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+from agentscope.message import Msg, TextBlock
+
+from ..constant import (
+    TOOL_RESULT_COLLAPSE_AFTER,
+    TOOL_RESULT_OFFLOAD_CHARS,
+    TOOL_RESULT_PREVIEW_CHARS,
+    TOOL_RESULTS_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+# Offloaded outputs kept in TOOL_RESULTS_DIR (oldest deleted first)
+_MAX_FILES = 1000
+# Start of the note that replaces an offloaded output's middle
+_NOTE_PREFIX = "[Output offloaded:"
+
+
+def is_offloaded_path(path: str) -> bool:
+    """Whether *path* is an offloaded tool output file."""
+    try:
+        return Path(path).resolve().parent == TOOL_RESULTS_DIR.resolve()
+    except (OSError, ValueError):
+        return False
+
+
+def _prune() -> None:
+    try:
+        entries = list(os.scandir(TOOL_RESULTS_DIR))
+    except OSError:
+        return
+    if len(entries) <= _MAX_FILES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[: len(entries) - _MAX_FILES]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def save_output(text: str) -> Path:
+    """Write *text* to its content-addressed file and return the path."""
+    data = text.encode("utf-8", errors="surrogatepass")
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    path = TOOL_RESULTS_DIR / f"{digest}.txt"
+    if path.exists():
+        # Keep reused outputs from being pruned first
+        os.utime(path)
+        return path
+    TOOL_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    _prune()
+    return path
+
+
+def make_preview(text: str, path: Path, preview_chars: int) -> str:
+    """Head and tail of *text* around a note pointing to *path*."""
+    head_len = preview_chars * 3 // 4
+    tail_len = preview_chars - head_len
+    # Cut at line boundaries unless that drops more than half
+    head = text[:head_len]
+    cut = head.rfind("\n")
+    if cut > head_len // 2:
+        head = head[: cut + 1]
+    tail = text[-tail_len:] if tail_len > 0 else ""
+    cut = tail.find("\n")
+    if 0 <= cut < tail_len // 2:
+        tail = tail[cut + 1 :]
+    lines = text.count("\n") + (0 if text.endswith("\n") else 1)
+    note = (
+        f"{_NOTE_PREFIX} {len(text)} characters, {lines} lines. "
+        f"Full output: {path} (page through it with read_file using "
+        f"start_line/end_line or tail_lines)]"
+    )
+    return f"{head}\n... {note} ...\n{tail}"
+
+
+def _text_of(output: Any) -> Optional[str]:
+    """Joined text of a tool output, or None if it has no text."""
+    if isinstance(output, str):
+        return output
+    if not isinstance(output, list):
+        return None
+    texts = [
+        block.get("text", "")
+        for block in output
+        if isinstance(block, dict) and block.get("type") == "text"
+    ]
+    return "\n".join(texts) if texts else None
+
+
+def offload_output(
+    output: Any,
+    limit: int = TOOL_RESULT_OFFLOAD_CHARS,
+    preview_chars: int = TOOL_RESULT_PREVIEW_CHARS,
+) -> Any:
+    """Return *output* with its text offloaded if longer than *limit*.
+
+    Text blocks are replaced by a single preview block at the position of
+    the first one; other blocks (images, files) are kept. Outputs that
+    are short or already offloaded are returned unchanged.
+
+    Args:
+        output: Tool result output (str or list of content blocks)
+        limit: Max characters of text kept as is
+        preview_chars: Characters of the preview (head + tail)
+    """
+    text = _text_of(output)
+    if text is None or len(text) <= limit or _NOTE_PREFIX in text:
+        return output
+    preview = make_preview(text, save_output(text), preview_chars)
+    if isinstance(output, str):
+        return preview
+
+    blocks: List[Any] = []
+    for block in output:
+        if isinstance(block, dict) and block.get("type") == "text":
+            if preview is not None:
+                blocks.append(TextBlock(type="text", text=preview))
+                preview = None
+            continue
+        blocks.append(block)
+    return blocks
+
+
+def _tool_result_blocks(msg: Msg) -> Iterable[dict]:
+    if not isinstance(msg.content, list):
+        return ()
+    return [
+        block
+        for block in msg.content
+        if isinstance(block, dict) and block.get("type") == "tool_result"
+    ]
+
+
+async def collapse_old_results(
+    messages: List[Msg],
+    after_steps: int = TOOL_RESULT_COLLAPSE_AFTER,
+    preview_chars: int = TOOL_RESULT_PREVIEW_CHARS,
+) -> int:
+    """Collapse tool results followed by *after_steps* assistant messages.
+
+    Outputs longer than a preview are offloaded in place (the blocks of
+    *messages* are modified).
+
+    Args:
+        messages: Agent memory, oldest first
+        after_steps: Reasoning steps a result is kept in full; 0 disables
+        preview_chars: Characters of the preview (head + tail)
+
+    Returns:
+        Number of collapsed results.
+    """
+    if after_steps <= 0:
+        return 0
+    # Leave room for the note so a preview is never collapsed again
+    limit = preview_chars + preview_chars // 2
+    candidates = []
+    steps_after = 0
+    for msg in reversed(messages):
+        if msg.role == "assistant":
+            steps_after += 1
+            continue
+        if steps_after < after_steps:
+            continue
+        for block in _tool_result_blocks(msg):
+            text = _text_of(block.get("output"))
+            if text is not None and len(text) > limit:
+                if _NOTE_PREFIX not in text:
+                    candidates.append(block)
+
+    for block in candidates:
+        block["output"] = await asyncio.to_thread(
+            offload_output,
+            block.get("output"),
+            limit,
+            preview_chars,
+        )
+    if candidates:
+        logger.debug("Collapsed %d old tool result(s)", len(candidates))
+    return len(candidates)
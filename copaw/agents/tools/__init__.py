@@ -22,7 +22,21 @@ from .desktop_screenshot import desktop_screenshot
 from .memory_search import create_memory_search_tool
 from .get_current_time import get_current_time
 
+# Tools without side effects: several calls of these in one reasoning step
+# may run concurrently (any other tool runs alone, in order)
+READ_ONLY_TOOLS = frozenset(
+    {
+        "read_file",
+        "view_text_file",
+        "grep_search",
+        "glob_search",
+        "get_current_time",
+        "memory_search",
+    },
+)
+
 __all__ = [
+    "READ_ONLY_TOOLS",
     "execute_python_code",
     "execute_shell_command",
     "view_text_file",
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # flake8: noqa: E501
 # pylint: disable=line-too-long
+import asyncio
 import os
 from pathlib import Path
 from typing import Optional
@@ -9,6 +10,10 @@ from agentscope.message import TextBlock
 from agentscope.tool import ToolResponse
 
 from ...constant import WORKING_DIR
+from .line_index import LineRange, invalidate, read_line_range
+
+# Max bytes of file content returned by one read_file call
+_MAX_READ_BYTES = 256 * 1024
 
 
 def _resolve_file_path(file_path: str) -> str:
@@ -28,15 +33,26 @@ def _resolve_file_path(file_path: str) -> str:
         return str(WORKING_DIR / file_path)
 
 
+def _continuation_hint(result: LineRange) -> str:
+    """Tell the agent how to continue after output was cut at the cap."""
+    hint = f"\n\n(Output truncated at {_MAX_READ_BYTES} bytes"
+    if result.next_line is not None:
+        hint += f"; continue with start_line={result.next_line}"
+    return hint + f", file has {result.total} lines.)"
+
+
 async def read_file(  # pylint: disable=too-many-return-statements
     file_path: str,
     start_line: Optional[int] = None,
     end_line: Optional[int] = None,
+    tail_lines: Optional[int] = None,
 ) -> ToolResponse:
     """Read a file. Relative paths resolve from WORKING_DIR.
 
-    Use start_line/end_line to read a specific line range (output includes
-    line numbers). Omit both to read the full file.
+    Use start_line/end_line to read a specific line range, or tail_lines
+    to read the end of a file such as a log (output includes line
+    numbers). Omit all to read the full file. Output is capped in size;
+    when cut, a hint tells which start_line to continue from.
 
     Args:
         file_path (`str`):
@@ -45,6 +61,8 @@ async def read_file(  # pylint: disable=too-many-return-statements
             First line to read (1-based, inclusive).
         end_line (`int`, optional):
             Last line to read (1-based, inclusive).
+        tail_lines (`int`, optional):
+            Read the last N lines instead of start_line/end_line.
     """
 
     file_path = _resolve_file_path(file_path)
@@ -70,16 +88,22 @@ async def read_file(  # pylint: disable=too-many-return-statements
         )
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            all_lines = f.readlines()
-
-        range_requested = start_line is not None or end_line is not None
+        range_requested = (
+            start_line is not None
+            or end_line is not None
+            or tail_lines is not None
+        )
+        result = await asyncio.to_thread(
+            read_line_range,
+            file_path,
+            start_line,
+            end_line,
+            _MAX_READ_BYTES,
+            max(1, tail_lines) if tail_lines is not None else None,
+        )
+        s, e, total = result.start, result.end, result.total
 
         if range_requested:
-            total = len(all_lines)
-            s = max(1, start_line if start_line is not None else 1)
-            e = min(total, end_line if end_line is not None else total)
-
             if s > total:
                 return ToolResponse(
                     content=[
@@ -106,27 +130,21 @@ async def read_file(  # pylint: disable=too-many-return-statements
                     ],
                 )
 
-            selected = all_lines[s - 1 : e]
-            content = "".join(selected)
             header = f"{file_path}  (lines {s}-{e} of {total})\n"
-            return ToolResponse(
-                content=[
-                    TextBlock(
-                        type="text",
-                        text=header + content,
-                    ),
-                ],
-            )
+            content = header + result.text
         else:
-            content = "".join(all_lines)
-            return ToolResponse(
-                content=[
-                    TextBlock(
-                        type="text",
-                        text=content,
-                    ),
-                ],
-            )
+            content = result.text
+
+        if result.truncated:
+            content += _continuation_hint(result)
+        return ToolResponse(
+            content=[
+                TextBlock(
+                    type="text",
+                    text=content,
+                ),
+            ],
+        )
 
     except Exception as e:
         return ToolResponse(
@@ -167,6 +185,8 @@ async def write_file(
     try:
         with open(file_path, "w", encoding="utf-8") as file:
             file.write(content)
+        # Rewritten in place: cached line offsets no longer apply
+        invalidate(file_path)
         return ToolResponse(
             content=[
                 TextBlock(
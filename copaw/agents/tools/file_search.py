@@ -3,15 +3,27 @@
 # pylint: disable=line-too-long
 """File search tools: grep (content search) and glob (file discovery)."""
 
+import asyncio
+import io
+import logging
+import os
 import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from agentscope.message import TextBlock
 from agentscope.tool import ToolResponse
 
 from ...constant import WORKING_DIR
+from ...utils.walk import compile_glob, split_glob, walk
 from .file_io import _resolve_file_path
+from .search_index import get_search_index, required_literals
+
+logger = logging.getLogger(__name__)
 
 # Skip binary / large files
 _BINARY_EXTENSIONS = frozenset(
@@ -65,18 +77,172 @@ _BINARY_EXTENSIONS = frozenset(
 
 _MAX_MATCHES = 200
 _MAX_FILE_SIZE = 2 * 1024 * 1024  # 2 MB
+# Leading bytes checked for NUL to detect binary files
+_SNIFF_BYTES = 8192
+# Lines scanned between checks of the stop flag
+_STOP_CHECK_LINES = 1024
+# Files scanned in parallel (shared by all concurrent searches)
+_GREP_WORKERS = min(8, os.cpu_count() or 1)
+_grep_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _list_text_files(root: Path) -> list[tuple[Path, int, int]]:
+    """List (path, mtime_ns, size) of text files under *root*, sorted.
+
+    Ignored paths (.gitignore / .copawignore, VCS and cache dirs) are
+    pruned by the shared walker.
+    """
+    index = get_search_index()
+    entries: list[tuple[Path, int, int]] = []
+    for entry in walk(root):
+        file_path = entry.path
+        if file_path.suffix.lower() in _BINARY_EXTENSIONS:
+            continue
+        if index.is_index_file(file_path):
+            continue
+        try:
+            st = file_path.stat()
+        except OSError:
+            continue
+        if st.st_size > _MAX_FILE_SIZE:
+            continue
+        entries.append((file_path, st.st_mtime_ns, st.st_size))
+    return entries
 
 
-def _is_text_file(path: Path) -> bool:
-    """Heuristic check: skip known binary extensions and large files."""
-    if path.suffix.lower() in _BINARY_EXTENSIONS:
-        return False
+def _collect_search_files(
+    root: Path,
+    pattern: str,
+    is_regex: bool,
+) -> list[Path]:
+    """Return files to scan, narrowed by the trigram index when possible."""
+    entries = _list_text_files(root)
+    index = get_search_index()
+    if not index.covers(root):
+        return [entry[0] for entry in entries]
     try:
-        if path.stat().st_size > _MAX_FILE_SIZE:
-            return False
+        index.refresh(entries, under=root)
+        candidates = index.candidates(required_literals(pattern, is_regex))
+    except Exception:
+        logger.exception("Search index unavailable, scanning all files")
+        candidates = None
+    if candidates is None:
+        return [entry[0] for entry in entries]
+    key_for = index.keys_for(root)
+    return [
+        file_path
+        for file_path, _mtime, _size in entries
+        if key_for(file_path) in candidates
+    ]
+
+
+def _get_grep_executor() -> ThreadPoolExecutor:
+    global _grep_executor
+    if _grep_executor is None:
+        _grep_executor = ThreadPoolExecutor(
+            max_workers=_GREP_WORKERS,
+            thread_name_prefix="grep",
+        )
+    return _grep_executor
+
+
+def _scan_file(
+    file_path: Path,
+    regex: re.Pattern,
+    context_lines: int,
+    stop: threading.Event,
+) -> list[list[tuple[int, str, str]]]:
+    """Scan one file line by line; return a block per match.
+
+    A block holds (line_no, marker, text) for the match (marker ``>``)
+    and its context lines. Files whose head contains a NUL byte are
+    treated as binary and skipped. Reading stops at ``_MAX_MATCHES``
+    matches or when *stop* is set.
+    """
+    blocks: list[list[tuple[int, str, str]]] = []
+    before: deque[tuple[int, str]] = deque(maxlen=context_lines)
+    # Blocks still collecting trailing context: [block, lines_left]
+    trailing: list[list] = []
+    try:
+        with open(file_path, "rb") as raw:
+            if b"\0" in raw.read(_SNIFF_BYTES):
+                return []
+            raw.seek(0)
+            text = io.TextIOWrapper(raw, encoding="utf-8", errors="ignore")
+            for line_no, line in enumerate(text, start=1):
+                if line_no % _STOP_CHECK_LINES == 0 and stop.is_set():
+                    break
+                if line.endswith("\n"):
+                    line = line[:-1]
+                for entry in trailing:
+                    entry[0].append((line_no, " ", line))
+                    entry[1] -= 1
+                trailing = [entry for entry in trailing if entry[1] > 0]
+
+                if len(blocks) < _MAX_MATCHES:
+                    if regex.search(line):
+                        block = [(n, " ", t) for n, t in before]
+                        block.append((line_no, ">", line))
+                        blocks.append(block)
+                        if context_lines > 0:
+                            trailing.append([block, context_lines])
+                elif not trailing:
+                    break
+                if context_lines > 0:
+                    before.append((line_no, line))
     except OSError:
-        return False
-    return True
+        return []
+    return blocks
+
+
+async def _scan_files(
+    files: list[Path],
+    regex: re.Pattern,
+    context_lines: int,
+) -> AsyncIterator[tuple[Path, list[list[tuple[int, str, str]]]]]:
+    """Scan *files* in the grep thread pool, yielding results in order.
+
+    At most a small window of files is in flight, so stopping early
+    (the consumer breaks once the match cap is reached) leaves little
+    wasted work; running scans are told to stop and queued ones are
+    cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_grep_executor()
+    stop = threading.Event()
+    pending: deque[tuple[Path, asyncio.Future]] = deque()
+    remaining = iter(files)
+
+    def _submit() -> None:
+        file_path = next(remaining, None)
+        if file_path is not None:
+            pending.append(
+                (
+                    file_path,
+                    loop.run_in_executor(
+                        executor,
+                        _scan_file,
+                        file_path,
+                        regex,
+                        context_lines,
+                        stop,
+                    ),
+                ),
+            )
+
+    try:
+        for _ in range(_GREP_WORKERS * 2):
+            _submit()
+        while pending:
+            file_path, future = pending.popleft()
+            blocks = await future
+            _submit()
+            if blocks:
+                yield file_path, blocks
+    finally:
+        stop.set()
+        for _, future in pending:
+            future.cancel()
 
 
 async def grep_search(  # pylint: disable=too-many-branches
@@ -141,53 +307,37 @@ async def grep_search(  # pylint: disable=too-many-branches
             ],
         )
 
-    matches: list[str] = []
-    truncated = False
-
     # Collect files to search
     single_file = search_root.is_file()
     if single_file:
         files = [search_root]
     else:
-        files = sorted(
-            f
-            for f in search_root.rglob("*")
-            if f.is_file() and _is_text_file(f)
+        files = await asyncio.to_thread(
+            _collect_search_files,
+            search_root,
+            pattern,
+            is_regex,
         )
 
-    for file_path in files:
-        if truncated:
-            break
-        try:
-            lines = file_path.read_text(
-                encoding="utf-8",
-                errors="ignore",
-            ).splitlines()
-        except OSError:
-            continue
-
-        for line_no, line in enumerate(lines, start=1):
-            if regex.search(line):
+    matches: list[str] = []
+    truncated = False
+    async with aclosing(_scan_files(files, regex, context_lines)) as results:
+        async for file_path, blocks in results:
+            # For single-file search show the filename, not '.'
+            if single_file:
+                rel = file_path.name
+            else:
+                rel = _relative_display(file_path, search_root)
+            for block in blocks:
                 if len(matches) >= _MAX_MATCHES:
                     truncated = True
                     break
-
-                # Context window
-                start = max(0, line_no - 1 - context_lines)
-                end = min(len(lines), line_no + context_lines)
-
-                # For single-file search show the filename, not '.'
-                if single_file:
-                    rel = file_path.name
-                else:
-                    rel = _relative_display(file_path, search_root)
-                for ctx_idx in range(start, end):
-                    prefix = ">" if ctx_idx == line_no - 1 else " "
-                    matches.append(
-                        f"{rel}:{ctx_idx + 1}:{prefix} {lines[ctx_idx]}",
-                    )
+                for line_no, marker, line in block:
+                    matches.append(f"{rel}:{line_no}:{marker} {line}")
                 if context_lines > 0:
                     matches.append("---")
+            if truncated:
+                break
 
     if not matches:
         return ToolResponse(
@@ -213,6 +363,35 @@ async def grep_search(  # pylint: disable=too-many-branches
     )
 
 
+def _glob_entries(root: Path, pattern: str) -> tuple[list[str], bool]:
+    """Return up to ``_MAX_MATCHES`` sorted matches of *pattern* under
+    *root* and whether the list was truncated. Walks lazily and stops at
+    the cap; patterns without ``**`` only descend as deep as they reach.
+    """
+    # Like Path.glob: a trailing "/" or "**" only matches directories
+    dirs_only = pattern.endswith("/") or pattern.split("/")[-1] == "**"
+    ups, pattern = split_glob(pattern)
+    if not pattern:
+        return [], False
+    # Leading "..": walk from the parent, shown relative to *root*
+    prefix = "../" * ups
+    for _ in range(ups):
+        root = root.parent
+    regex = compile_glob(pattern)
+    max_depth = None if "**" in pattern else pattern.count("/") + 1
+    results: list[str] = []
+    for entry in walk(root, include_dirs=True, max_depth=max_depth):
+        if dirs_only and not entry.is_dir:
+            continue
+        if not regex.match(entry.rel_path):
+            continue
+        suffix = "/" if entry.is_dir else ""
+        results.append(f"{prefix}{entry.rel_path}{suffix}")
+        if len(results) >= _MAX_MATCHES:
+            return results, True
+    return results, False
+
+
 async def glob_search(
     pattern: str,
     path: Optional[str] = None,
@@ -259,15 +438,11 @@ async def glob_search(
         )
 
     try:
-        results: list[str] = []
-        truncated = False
-        for entry in sorted(search_root.glob(pattern)):
-            rel = _relative_display(entry, search_root)
-            suffix = "/" if entry.is_dir() else ""
-            results.append(f"{rel}{suffix}")
-            if len(results) >= _MAX_MATCHES:
-                truncated = True
-                break
+        results, truncated = await asyncio.to_thread(
+            _glob_entries,
+            search_root,
+            pattern,
+        )
 
         if not results:
             return ToolResponse(
@@ -302,6 +477,18 @@ async def glob_search(
         )
 
 
+def rebuild_search_index() -> dict:
+    """Re-index every text file under WORKING_DIR from scratch.
+
+    Returns:
+        Index statistics after the rebuild.
+    """
+    index = get_search_index()
+    index.clear()
+    index.refresh(_list_text_files(WORKING_DIR), under=WORKING_DIR)
+    return index.stats()
+
+
 def _relative_display(target: Path, root: Path) -> str:
     """Return a relative path string if possible, otherwise absolute."""
     try:
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Line-offset index for ranged reads of large text files.
+
+The index stores the number of newlines before every fixed-size block
+of the file, so locating line N is a binary search plus a short scan
+inside one block. Files are read through ``mmap``: only the pages of
+the requested lines are touched and memory stays constant regardless
+of file size. Indexes are cached per path and reused while the file's
+(mtime, size) is unchanged. A file that grew while its first bytes and
+the bytes before its previous end stayed the same (an appended log) is
+indexed incrementally from its previous end; any other change, including
+a same-size rewrite in place, rebuilds the index. Writers that rewrite a
+file call :func:`invalidate`.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# Bytes per index block (one newline count per block)
+_BLOCK_SIZE = 256 * 1024
+# Bytes compared at the start and at the old end to confirm that a
+# grown file was only appended to
+_SAMPLE = 64
+# Line indexes kept in memory
+_MAX_CACHED_INDEXES = 32
+
+
+@dataclass
+class LineRange:
+    """Result of :func:`read_line_range`."""
+
+    text: str
+    start: int
+    end: int
+    total: int
+    # First line not returned because of the byte cap, else None
+    next_line: Optional[int] = None
+    # Whether the byte cap cut the output (possibly mid-line)
+    truncated: bool = False
+
+
+class LineIndex:
+    """Newline counts per block of one file version (see module doc)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = 0
+        self.mtime_ns = 0
+        self.inode = 0
+        # counts[i] = newlines in bytes [0, i * _BLOCK_SIZE)
+        self.counts = array("Q", [0])
+        self.ends_with_newline = False
+        self._head = b""
+        self._tail = b""
+
+    @property
+    def total_lines(self) -> int:
+        newlines = self.counts[-1]
+        if self.size and not self.ends_with_newline:
+            return newlines + 1
+        return newlines
+
+    def matches(self, st: os.stat_result) -> bool:
+        return (st.st_mtime_ns, st.st_size) == (self.mtime_ns, self.size)
+
+    def update(self, mm: mmap.mmap, st: os.stat_result) -> None:
+        """Index *mm*, reusing the existing counts if it only grew."""
+        size = st.st_size
+        appended = (
+            self.size > 0
+            and st.st_ino == self.inode
+            and size > self.size
+            and mm[: len(self._head)] == self._head
+            and mm[max(0, self.size - _SAMPLE) : self.size] == self._tail
+        )
+        if appended:
+            # The last block may have been partial: recount from there
+            first_block = max(0, len(self.counts) - 2)
+            del self.counts[first_block + 1 :]
+        else:
+            first_block = 0
+            self.counts = array("Q", [0])
+
+        total = self.counts[first_block]
+        for offset in range(first_block * _BLOCK_SIZE, size, _BLOCK_SIZE):
+            total += mm[offset : offset + _BLOCK_SIZE].count(b"\n")
+            self.counts.append(total)
+
+        self.size = size
+        self.mtime_ns = st.st_mtime_ns
+        self.inode = st.st_ino
+        self.ends_with_newline = size > 0 and mm[size - 1 : size] == b"\n"
+        self._head = mm[:_SAMPLE]
+        self._tail = mm[max(0, size - _SAMPLE) : size]
+
+    def line_offset(self, mm: mmap.mmap, line: int) -> int:
+        """Byte offset where 1-based *line* starts."""
+        skip = line - 1
+        if skip <= 0:
+            return 0
+        if skip > self.counts[-1]:
+            return self.size
+        # Block holding the skip-th newline
+        block = bisect_left(self.counts, skip) - 1
+        pos = block * _BLOCK_SIZE
+        for _ in range(skip - self.counts[block]):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+
+
+_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_index(path: str, mm: mmap.mmap, st: os.stat_result) -> LineIndex:
+    with _cache_lock:
+        index = _cache.pop(path, None)
+    if index is None:
+        index = LineIndex(path)
+    if not index.matches(st):
+        index.update(mm, st)
+    with _cache_lock:
+        _cache[path] = index
+        while len(_cache) > _MAX_CACHED_INDEXES:
+            _cache.popitem(last=False)
+    return index
+
+
+def invalidate(path: str) -> None:
+    """Drop the cached index of *path* (call after rewriting it)."""
+    with _cache_lock:
+        _cache.pop(path, None)
+
+
+def _decode(data: bytes) -> str:
+    # Same newline handling as reading in text mode
+    return data.decode("utf-8").replace("\r\n", "\n")
+
+
+def read_line_range(
+    path: str,
+    start: Optional[int],
+    end: Optional[int],
+    max_bytes: int,
+    tail: Optional[int] = None,
+) -> LineRange:
+    """Read lines *start*..*end* (1-based, inclusive) of *path*.
+
+    Args:
+        path: File to read
+        start: First line; defaults to 1
+        end: Last line; defaults to the last line
+        max_bytes: Stop before exceeding this many bytes (at least one
+            line, cut if necessary, is returned)
+        tail: Read the last *tail* lines instead of start/end
+
+    Returns:
+        LineRange; ``start > total`` or ``start > end`` are returned
+        as-is for the caller to report.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return LineRange("", max(1, start or 1), 0, 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = _get_index(path, mm, st)
+            total = index.total_lines
+            if tail is not None:
+                start, end = max(1, total - tail + 1), total
+            s = max(1, start if start is not None else 1)
+            e = min(total, end if end is not None else total)
+            if s > total or s > e:
+                return LineRange("", s, e, total)
+
+            begin = index.line_offset(mm, s)
+            limit = min(index.size, begin + max_bytes)
+            pos, line = begin, s
+            while line <= e:
+                nl = mm.find(b"\n", pos, limit)
+                if nl < 0:
+                    if limit == index.size:
+                        # Last line without a trailing newline
+                        pos = index.size
+                        line += 1
+                    break
+                pos = nl + 1
+                line += 1
+            if line == s:
+                # A single line longer than the cap: return it cut
+                data = mm[begin:limit]
+                text = data.decode("utf-8", errors="ignore")
+                return LineRange(
+                    text,
+                    s,
+                    s,
+                    total,
+                    next_line=s + 1 if s < e else None,
+                    truncated=True,
+                )
+            text = _decode(mm[begin:pos])
+            next_line = line if line <= e else None
+            return LineRange(
+                text,
+                s,
+                line - 1,
+                total,
+                next_line=next_line,
+                truncated=next_line is not None,
+            )
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""Persistent trigram index used by grep_search to narrow candidate files.
+
+Every text file under WORKING_DIR gets a trigram signature: a fixed-size
+bitset with one bit set per (hashed) byte trigram of its case-folded
+UTF-8 content. A query extracts the literal runs that any match must
+contain (the pattern itself for literal searches, the required literal
+parts of a regex); only files whose signature has all the literals'
+trigram bits set are scanned. Hash collisions can only add candidates,
+never drop a file that matches. Queries without a usable literal (e.g.
+``\\d+``) fall back to scanning every file.
+
+Signatures are stored in a SQLite file and tested there, one row at a
+time, so memory does not grow with the number of files (a signature is
+4 KiB; 100k files would take ~400 MB in memory). Only each file's
+(mtime, size) is kept in memory. The index is refreshed incrementally
+before each query: files whose (mtime, size) changed are re-indexed,
+removed files are dropped, unchanged files are never read. Writes by
+another process (e.g. ``copaw search-index rebuild``) are detected with
+``PRAGMA data_version``: the in-memory entries are reloaded, and a query
+racing such a write scans every file instead of trusting the index.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef]
+
+from ...constant import SEARCH_INDEX_PATH, WORKING_DIR
+
+logger = logging.getLogger(__name__)
+
+_KeyMaker = Callable[[Path], str]
+
+# Signature size in bits (4 KiB per file)
+SIGNATURE_BITS = 32768
+# Files re-indexed per transaction during a refresh
+_BATCH_SIZE = 200
+# Bump when the signature layout changes; old indexes are rebuilt
+_INDEX_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sig BLOB NOT NULL
+);
+"""
+
+
+def trigrams(text: str) -> Set[bytes]:
+    """Return the byte trigrams of case-folded *text*."""
+    data = text.casefold().encode("utf-8")
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+def signature(grams: Iterable[bytes]) -> bytes:
+    """Return the trigram bitset of *grams*."""
+    bits = bytearray(SIGNATURE_BITS // 8)
+    mask = SIGNATURE_BITS - 1
+    for gram in grams:
+        bit = zlib.crc32(gram) & mask
+        bits[bit >> 3] |= 1 << (bit & 7)
+    return bytes(bits)
+
+
+def _signature_matcher(mask: bytes) -> Callable[[bytes], bool]:
+    """Return a test whether a signature has every bit of *mask* set.
+
+    Only the non-zero bytes of *mask* (a few per trigram) are compared.
+    """
+    needed = [(i, byte) for i, byte in enumerate(mask) if byte]
+
+    def _match(sig: bytes) -> bool:
+        return all(sig[i] & byte == byte for i, byte in needed)
+
+    return _match
+
+
+def _literal_runs(parsed) -> List[str]:
+    """Collect literal runs that every match of *parsed* must contain."""
+    runs: List[str] = []
+    current: List[str] = []
+
+    def _flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        _flush()
+        if op is sre_parse.SUBPATTERN:
+            runs.extend(_literal_runs(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            min_count, _max_count, sub = av
+            if min_count >= 1:
+                runs.extend(_literal_runs(sub))
+    _flush()
+    return runs
+
+
+def required_literals(pattern: str, is_regex: bool) -> List[str]:
+    """Return literal strings a matching line must contain.
+
+    An empty list means the index cannot narrow the search.
+    """
+    if not is_regex:
+        return [pattern]
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return []
+    return _literal_runs(parsed)
+
+
+class TrigramIndex:
+    """On-disk trigram signature index of text files under a root.
+
+    Args:
+        db_path: SQLite file holding the index
+        root: Directory whose files are indexed
+    """
+
+    def __init__(
+        self,
+        db_path: Path = SEARCH_INDEX_PATH,
+        root: Path = WORKING_DIR,
+    ):
+        self._db_path = Path(db_path)
+        self._root = Path(root)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # key -> (mtime_ns, size), loaded from the db; signatures stay
+        # in the db
+        self._entries: Optional[Dict[str, Tuple[int, int]]] = None
+        # PRAGMA data_version when _entries was loaded / last checked
+        self._data_version: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self._db_path),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _INDEX_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS grams")
+                conn.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _changed_elsewhere(self, conn: sqlite3.Connection) -> bool:
+        """Whether another connection (e.g. ``copaw search-index
+        rebuild`` in another process) wrote to the db since the last
+        check. Our own writes do not count (caller holds the lock)."""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._data_version is not None and (
+            version != self._data_version
+        )
+        self._data_version = version
+        return changed
+
+    def _load(self) -> Dict[str, Tuple[int, int]]:
+        """Return the in-memory entries, reloaded if the db was changed
+        by another connection (caller holds the lock)."""
+        conn = self._connect()
+        if self._changed_elsewhere(conn) and self._entries is not None:
+            logger.info("Search index changed by another process; reloading")
+            self._entries = None
+        if self._entries is None:
+            self._entries = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in conn.execute(
+                    "SELECT path, mtime_ns, size FROM files",
+                )
+            }
+        return self._entries
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._entries = None
+
+    def covers(self, path: Path) -> bool:
+        """Whether *path* lies under the indexed root."""
+        try:
+            path.resolve().relative_to(self._root.resolve())
+        except ValueError:
+            return False
+        return True
+
+    def is_index_file(self, path: Path) -> bool:
+        """Whether *path* is one of the index's own database files."""
+        return path.name.startswith(self._db_path.name) and (
+            path.parent == self._db_path.parent
+        )
+
+    def _prefix(self, under: Path) -> str:
+        """Index key of directory *under* ("" for the root itself)."""
+        base = under.resolve().relative_to(self._root.resolve()).as_posix()
+        return "" if base == "." else base
+
+    def keys_for(self, under: Path) -> _KeyMaker:
+        """Return a function mapping paths below *under* to index keys."""
+        prefix = self._prefix(under)
+        prefix = prefix + "/" if prefix else ""
+
+        def _key(path: Path) -> str:
+            return prefix + path.relative_to(under).as_posix()
+
+        return _key
+
+    # ---- refresh ----
+
+    def refresh(
+        self,
+        files: Iterable[Tuple[Path, int, int]],
+        under: Path,
+    ) -> None:
+        """Bring the index in sync with *files*.
+
+        Args:
+            files: (path, mtime_ns, size) of every text file under *under*
+            under: Directory the listing covers (below the root); indexed
+                files below it that are not listed are dropped
+        """
+        start = time.perf_counter()
+        key_for = self.keys_for(under)
+        prefix = self._prefix(under)
+        with self._lock:
+            entries = self._load()
+            removed = {
+                key
+                for key in entries
+                if not prefix or key.startswith(prefix + "/")
+            }
+            changed: List[Tuple[Path, str, int, int]] = []
+            for path, mtime_ns, size in files:
+                key = key_for(path)
+                removed.discard(key)
+                entry = entries.get(key)
+                if entry is None or entry != (mtime_ns, size):
+                    changed.append((path, key, mtime_ns, size))
+
+            conn = self._connect()
+            if removed:
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany(
+                        "DELETE FROM files WHERE path = ?",
+                        [(key,) for key in removed],
+                    )
+                for key in removed:
+                    entries.pop(key, None)
+            for i in range(0, len(changed), _BATCH_SIZE):
+                self._index_batch(conn, entries, changed[i : i + _BATCH_SIZE])
+        if changed or removed:
+            logger.debug(
+                "Search index refreshed: %d indexed, %d removed (%.0f ms)",
+                len(changed),
+                len(removed),
+                (time.perf_counter() - start) * 1000,
+            )
+
+    def _index_batch(
+        self,
+        conn: sqlite3.Connection,
+        entries: Dict[str, Tuple[int, int]],
+        batch: List[Tuple[Path, str, int, int]],
+    ) -> None:
+        rows = []
+        for path, key, mtime_ns, size in batch:
+            try:
+                text = path.read_text(encoding="utf-8", errors="ignore")
+            except OSError:
+                continue
+            entries[key] = (mtime_ns, size)
+            rows.append((key, mtime_ns, size, signature(trigrams(text))))
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, sig) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def clear(self) -> None:
+        """Drop every indexed file; the next refresh re-indexes all."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM files")
+            conn.execute("VACUUM")
+            self._entries = {}
+
+    # ---- query ----
+
+    def candidates(self, literals: List[str]) -> Optional[Set[str]]:
+        """Return indexed keys (paths relative to root) that may match.
+
+        Returns None when *literals* have no trigram to filter on, or
+        when another process changed the index since the last refresh
+        (e.g. cleared it for a rebuild), so its rows may be missing.
+        """
+        grams: Set[bytes] = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+
+        match = _signature_matcher(signature(grams))
+        with self._lock:
+            conn = self._connect()
+            if self._changed_elsewhere(conn):
+                self._entries = None
+                return None
+            conn.create_function("sig_match", 1, match)
+            keys = {
+                key
+                for (key,) in conn.execute(
+                    "SELECT path FROM files WHERE sig_match(sig)",
+                )
+            }
+        return keys
+
+    def stats(self) -> Dict[str, object]:
+        """Index size (read from the db, so valid in any process)."""
+        with self._lock:
+            files = 0
+            bits = 0
+            for (sig,) in self._connect().execute("SELECT sig FROM files"):
+                files += 1
+                bits += int.from_bytes(sig, "little").bit_count()
+            fill = bits / (files * SIGNATURE_BITS) if files else 0.0
+        try:
+            db_bytes = sum(
+                p.stat().st_size
+                for p in self._db_path.parent.iterdir()
+                if self.is_index_file(p)
+            )
+        except OSError:
+            db_bytes = 0
+        return {
+            "path": str(self._db_path),
+            "root": str(self._root),
+            "files": files,
+            "signature_bits": SIGNATURE_BITS,
+            "avg_fill_ratio": round(fill, 3),
+            "db_bytes": db_bytes,
+        }
+
+
+_index: Optional[TrigramIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> TrigramIndex:
+    """Return the process-wide index of WORKING_DIR."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TrigramIndex()
+        return _index
@@ -1,19 +1,73 @@
 # -*- coding: utf-8 -*-
 # flake8: noqa: E501
 # pylint: disable=line-too-long
-"""The shell command tool."""
+"""The shell command tool.
+
+Commands run in their own process group. stdout and stderr are drained
+concurrently while the command runs (so a chatty command never blocks on
+a full pipe) into bounded head + tail buffers; a stream that outgrows
+the cap is written in full to a file under SHELL_OUTPUT_DIR and the
+result points to it. While the command runs, progress updates with the
+latest output are streamed as intermediate tool responses.
+"""
 
 import asyncio
 import json
 import locale
+import os
 import re
+import signal
+import sys
+import time
+import uuid
+from contextlib import aclosing
 from pathlib import Path
-from typing import Optional
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from agentscope.tool import ToolResponse
 from agentscope.message import TextBlock
 
-from copaw.constant import WORKING_DIR
+from copaw.constant import (
+    SHELL_OUTPUT_DIR,
+    SHELL_OUTPUT_MAX_BYTES,
+    SHELL_PROGRESS_INTERVAL,
+    WORKING_DIR,
+)
+from .shell_session import get_shell_sessions, shell_session_key
+
+_IS_WINDOWS = sys.platform == "win32"
+
+# Bytes read from a pipe at once
+_READ_CHUNK = 64 * 1024
+# Seconds to wait for pipes to close after the command exited (background
+# children may keep them open)
+_DRAIN_GRACE = 0.5
+# Seconds between SIGTERM and SIGKILL of a timed-out process group
+_KILL_GRACE = 1.0
+# Seconds between checks of the exit status while pipes are still open
+_EXIT_POLL = 0.05
+# Bytes of latest output shown per stream in a progress update
+_PROGRESS_TAIL_BYTES = 1024
+# Spilled output files kept in SHELL_OUTPUT_DIR
+_MAX_SPILL_FILES = 50
+
+_SESSION_RESET_NOTE = (
+    "The persistent shell session was reset: its working directory and "
+    "variables are lost."
+)
+_SESSION_ENDED_NOTE = (
+    "The command exited the persistent shell; a new one is started on "
+    "the next call."
+)
 
 
 _HIMALAYA_SEND_PATTERN = re.compile(
@@ -22,6 +76,225 @@ _HIMALAYA_SEND_PATTERN = re.compile(
 )
 
 
+def _text_response(text: str, is_last: bool = True) -> ToolResponse:
+    return ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=text,
+            ),
+        ],
+        stream=True,
+        is_last=is_last,
+    )
+
+
+def _prune_spill_dir() -> None:
+    """Delete the oldest spilled output files beyond _MAX_SPILL_FILES."""
+    try:
+        files = sorted(
+            SHELL_OUTPUT_DIR.glob("*.log"),
+            key=lambda p: p.stat().st_mtime,
+        )
+    except OSError:
+        return
+    for path in files[:-_MAX_SPILL_FILES]:
+        path.unlink(missing_ok=True)
+
+
+class _StreamCapture:
+    """Head + tail of one output stream, bounded to *max_bytes*.
+
+    Once the stream exceeds the cap, everything received so far and all
+    further output are also written to *spill_path*.
+    """
+
+    def __init__(self, spill_path: Path, max_bytes: int):
+        self.total = 0
+        self.spill_path: Optional[Path] = None
+        self._target = spill_path
+        self._max_bytes = max_bytes
+        self._half = max(1, max_bytes // 2)
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill: Optional[BinaryIO] = None
+
+    def feed(self, data: bytes) -> None:
+        if self._spill is None and self.total + len(data) > self._max_bytes:
+            self._start_spill()
+        if self._spill is not None:
+            self._spill.write(data)
+        self.total += len(data)
+
+        room = self._half - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._tail += data
+            # Trim in batches to keep appends amortized O(1)
+            if len(self._tail) > 2 * self._half:
+                del self._tail[: -self._half]
+
+    def _start_spill(self) -> None:
+        try:
+            SHELL_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+            _prune_spill_dir()
+            # pylint: disable-next=consider-using-with
+            self._spill = open(self._target, "wb")
+        except OSError:
+            return
+        # Nothing was dropped yet: head + tail is the output so far
+        self._spill.write(self._head)
+        self._spill.write(self._tail)
+        self.spill_path = self._target
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def text(self, encoding: str) -> str:
+        """Captured output; the middle is elided if over the cap."""
+        if self.total <= self._max_bytes:
+            return bytes(self._head + self._tail).decode(
+                encoding,
+                errors="replace",
+            )
+        tail = _skip_partial_char(bytes(self._tail[-self._half :]))
+        omitted = self.total - len(self._head) - len(tail)
+        where = (
+            f"full output in {self.spill_path}"
+            if self.spill_path is not None
+            else "full output not saved"
+        )
+        return (
+            self._head.decode(encoding, errors="replace")
+            + f"\n... [{omitted} bytes omitted; {where}] ...\n"
+            + tail.decode(encoding, errors="replace")
+        )
+
+    def latest(self, size: int, encoding: str) -> str:
+        """The last *size* bytes received."""
+        data = bytes(self._tail[-size:])
+        if len(data) < size:
+            data = bytes(self._head[-(size - len(data)) :]) + data
+        return _skip_partial_char(data).decode(encoding, errors="replace")
+
+
+def _skip_partial_char(data: bytes) -> bytes:
+    """Drop UTF-8 continuation bytes left at the start by a cut."""
+    i = 0
+    while i < min(len(data), 3) and data[i] & 0xC0 == 0x80:
+        i += 1
+    return data[i:]
+
+
+async def _drain(stream: asyncio.StreamReader, capture: _StreamCapture):
+    while True:
+        data = await stream.read(_READ_CHUNK)
+        if not data:
+            return
+        capture.feed(data)
+
+
+def _signal_group(proc: asyncio.subprocess.Process, force: bool) -> None:
+    try:
+        if _IS_WINDOWS:
+            if force:
+                proc.kill()
+            else:
+                proc.terminate()
+        else:
+            os.killpg(
+                proc.pid,
+                signal.SIGKILL if force else signal.SIGTERM,
+            )
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _wait_exit(
+    proc: asyncio.subprocess.Process,
+    readers: Sequence[asyncio.Task],
+    timeout: Optional[float],
+) -> bool:
+    """Wait until *proc* exits; return False if *timeout* passed first.
+
+    ``Process.wait()`` also waits for the pipes to close, which children
+    left running in the background keep open, so the exit status is
+    polled as well. Readers reaching EOF (the usual sign of an exit)
+    wake the wait up early.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    waiter = asyncio.ensure_future(proc.wait())
+    try:
+        while proc.returncode is None:
+            step = _EXIT_POLL
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                step = min(step, remaining)
+            pending = [reader for reader in readers if not reader.done()]
+            await asyncio.wait(
+                [waiter, *pending],
+                timeout=step,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        return True
+    finally:
+        waiter.cancel()
+
+
+async def _kill_process_group(
+    proc: asyncio.subprocess.Process,
+    readers: Sequence[asyncio.Task] = (),
+) -> None:
+    """Terminate the command and everything it started."""
+    _signal_group(proc, force=False)
+    await _wait_exit(proc, readers, _KILL_GRACE)
+    # Also kills children that outlived the shell
+    _signal_group(proc, force=True)
+    await _wait_exit(proc, readers, None)
+
+
+def _progress_text(
+    elapsed: float,
+    stdout: _StreamCapture,
+    stderr: _StreamCapture,
+    encoding: str,
+) -> str:
+    parts = [
+        f"Command still running ({elapsed:.0f}s elapsed, "
+        f"{stdout.total} bytes stdout, {stderr.total} bytes stderr).",
+    ]
+    if stdout.total:
+        latest = stdout.latest(_PROGRESS_TAIL_BYTES, encoding)
+        parts.append(f"\n[latest stdout]\n{latest}")
+    if stderr.total:
+        latest = stderr.latest(_PROGRESS_TAIL_BYTES, encoding)
+        parts.append(f"\n[latest stderr]\n{latest}")
+    return "".join(parts)
+
+
+def _format_result(returncode: int, stdout_str: str, stderr_str: str) -> str:
+    """Format the response in a human-friendly way."""
+    if returncode == 0:
+        # Success case: just show the output
+        if stdout_str:
+            return stdout_str
+        return "Command executed successfully (no output)."
+    # Error case: show detailed information
+    response_parts = [f"Command failed with exit code {returncode}."]
+    if stdout_str:
+        response_parts.append(f"\n[stdout]\n{stdout_str}")
+    if stderr_str:
+        response_parts.append(f"\n[stderr]\n{stderr_str}")
+    return "".join(response_parts)
+
+
 def _blocked_response(message: str) -> ToolResponse:
     payload = {"ok": False, "error": message}
     return ToolResponse(
@@ -34,16 +307,238 @@ def _blocked_response(message: str) -> ToolResponse:
     )
 
 
-# pylint: disable=too-many-branches
+def _new_captures(name: str) -> Tuple[_StreamCapture, _StreamCapture]:
+    spill_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}"
+    return (
+        _StreamCapture(
+            SHELL_OUTPUT_DIR / f"{spill_name}.stdout.log",
+            SHELL_OUTPUT_MAX_BYTES,
+        ),
+        _StreamCapture(
+            SHELL_OUTPUT_DIR / f"{spill_name}.stderr.log",
+            SHELL_OUTPUT_MAX_BYTES,
+        ),
+    )
+
+
+async def _follow(
+    wait_done: Callable[[float], Awaitable[bool]],
+    stdout: _StreamCapture,
+    stderr: _StreamCapture,
+    timeout: float,
+    encoding: str,
+) -> AsyncGenerator[ToolResponse, None]:
+    """Yield progress updates until the command is done.
+
+    Args:
+        wait_done: Waits up to the given seconds for the command to
+            finish; returns whether it did
+        stdout: Capture of the command's stdout
+        stderr: Capture of the command's stderr
+        timeout: Seconds before giving up
+        encoding: Output encoding
+
+    Raises:
+        asyncio.TimeoutError: The command is still running after
+            *timeout* seconds.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    reported = 0
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        if await wait_done(min(remaining, SHELL_PROGRESS_INTERVAL)):
+            return
+        produced = stdout.total + stderr.total
+        if produced != reported:
+            reported = produced
+            yield _text_response(
+                _progress_text(
+                    loop.time() - started,
+                    stdout,
+                    stderr,
+                    encoding,
+                ),
+                is_last=False,
+            )
+
+
+def _final_response(
+    returncode: int,
+    stdout: _StreamCapture,
+    stderr: _StreamCapture,
+    encoding: str,
+    note: str = "",
+) -> ToolResponse:
+    """Result of a finished command; *note* is appended to stderr."""
+    stdout_str = stdout.text(encoding)
+    stderr_str = stderr.text(encoding)
+    if note:
+        if stderr_str:
+            stderr_str += f"\n{note}"
+        else:
+            stderr_str = note
+    return _text_response(_format_result(returncode, stdout_str, stderr_str))
+
+
+def _timeout_note(timeout: int) -> str:
+    return (
+        f"⚠️ TimeoutError: The command execution exceeded "
+        f"the timeout of {timeout} seconds. "
+        f"Please consider increasing the timeout value if this command "
+        f"requires more time to complete."
+    )
+
+
+async def _run_process(
+    cmd: str,
+    timeout: int,
+    working_dir: Path,
+    encoding: str,
+) -> AsyncGenerator[ToolResponse, None]:
+    """Run *cmd* in a new shell process."""
+    try:
+        proc = await asyncio.create_subprocess_shell(
+            cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(working_dir),
+            # Own process group, so a timeout kills the whole tree
+            start_new_session=not _IS_WINDOWS,
+        )
+    except Exception as e:
+        yield _text_response(
+            f"Error: Shell command execution failed due to \n{e}",
+        )
+        return
+
+    stdout, stderr = _new_captures(str(proc.pid))
+    readers: List[asyncio.Task] = [
+        asyncio.create_task(_drain(proc.stdout, stdout)),
+        asyncio.create_task(_drain(proc.stderr, stderr)),
+    ]
+
+    async def _wait_done(seconds: float) -> bool:
+        return await _wait_exit(proc, readers, seconds)
+
+    try:
+        note = ""
+        try:
+            async for progress in _follow(
+                _wait_done,
+                stdout,
+                stderr,
+                timeout,
+                encoding,
+            ):
+                yield progress
+            returncode = proc.returncode
+        except asyncio.TimeoutError:
+            await _kill_process_group(proc, readers)
+            returncode = -1
+            note = _timeout_note(timeout)
+        await asyncio.wait(readers, timeout=_DRAIN_GRACE)
+        yield _final_response(returncode, stdout, stderr, encoding, note)
+
+    except Exception as e:
+        yield _text_response(
+            f"Error: Shell command execution failed due to \n{e}",
+        )
+
+    finally:
+        # Also reached when the tool call is interrupted
+        if proc.returncode is None:
+            await _kill_process_group(proc, readers)
+        for reader in readers:
+            reader.cancel()
+        stdout.close()
+        stderr.close()
+
+
+async def _run_in_session(
+    cmd: str,
+    timeout: int,
+    cwd: Optional[Path],
+    encoding: str,
+) -> AsyncGenerator[ToolResponse, None]:
+    """Run *cmd* in the persistent shell of the current CoPaw session."""
+    sessions = get_shell_sessions()
+    key = shell_session_key.get()
+    try:
+        session = await sessions.get(key)
+    except Exception as e:
+        yield _text_response(
+            f"Error: Shell command execution failed due to \n{e}",
+        )
+        return
+
+    async with session.lock:
+        stdout, stderr = _new_captures(f"session-{uuid.uuid4().hex[:8]}")
+        run = asyncio.create_task(session.run(cmd, stdout, stderr, cwd))
+
+        async def _wait_done(seconds: float) -> bool:
+            await asyncio.wait({run}, timeout=seconds)
+            return run.done()
+
+        try:
+            note = ""
+            try:
+                async for progress in _follow(
+                    _wait_done,
+                    stdout,
+                    stderr,
+                    timeout,
+                    encoding,
+                ):
+                    yield progress
+                returncode = run.result()
+                if returncode is None:
+                    # The command ended the shell (e.g. "exit")
+                    await sessions.discard(key)
+                    returncode = session.returncode
+                    note = _SESSION_ENDED_NOTE
+            except asyncio.TimeoutError:
+                returncode = -1
+                note = f"{_timeout_note(timeout)}\n{_SESSION_RESET_NOTE}"
+            yield _final_response(
+                -1 if returncode is None else returncode,
+                stdout,
+                stderr,
+                encoding,
+                note,
+            )
+
+        except Exception as e:
+            yield _text_response(
+                f"Error: Shell command execution failed due to \n{e}",
+            )
+
+        finally:
+            # Timed out, failed or interrupted: the shell's state is
+            # unknown, so it is replaced on the next call
+            if not run.done():
+                run.cancel()
+                await sessions.discard(key)
+            stdout.close()
+            stderr.close()
+
+
 async def execute_shell_command(
     command: str,
     timeout: int = 60,
     cwd: Optional[Path] = None,
-) -> ToolResponse:
+    persistent: bool = False,
+) -> AsyncGenerator[ToolResponse, None]:
     """Execute given command and return the return code, standard output and
     error within <returncode></returncode>, <stdout></stdout> and
     <stderr></stderr> tags.
 
+    Long output is shortened to its beginning and end; the full output is
+    saved to a file whose path is given in the result.
+
     Args:
         command (`str`):
             The shell command to execute.
@@ -53,6 +548,11 @@ async def execute_shell_command(
         cwd (`Optional[Path]`, defaults to `None`):
             The working directory for the command execution.
             If None, defaults to WORKING_DIR.
+        persistent (`bool`, defaults to `False`):
+            Run in this conversation's persistent shell, so the working
+            directory, exported variables and activated virtualenvs carry
+            over to later calls with persistent=True. Use it for
+            multi-step work such as set up, build, then test.
 
     Returns:
         `ToolResponse`:
@@ -63,94 +563,21 @@ async def execute_shell_command(
 
     cmd = (command or "").strip()
     if not cmd:
-        return _blocked_response("command required")
+        yield _blocked_response("command required")
+        return
     if _HIMALAYA_SEND_PATTERN.search(cmd):
-        return _blocked_response(
+        yield _blocked_response(
             "Blocked: sending email via himalaya is disabled.",
         )
+        return
 
-    # Set working directory
-    working_dir = cwd if cwd is not None else WORKING_DIR
-
-    try:
-        proc = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            bufsize=0,
-            cwd=str(working_dir),
-        )
-
-        try:
-            await asyncio.wait_for(proc.wait(), timeout=timeout)
-            stdout, stderr = await proc.communicate()
-            encoding = locale.getpreferredencoding(False) or "utf-8"
-            stdout_str = stdout.decode(encoding, errors="replace")
-            stderr_str = stderr.decode(encoding, errors="replace")
-            returncode = proc.returncode
-
-        except asyncio.TimeoutError:
-            # Handle timeout
-            stderr_suffix = (
-                f"⚠️ TimeoutError: The command execution exceeded "
-                f"the timeout of {timeout} seconds. "
-                f"Please consider increasing the timeout value if this command "
-                f"requires more time to complete."
-            )
-            returncode = -1
-            try:
-                proc.terminate()
-                # Wait a bit for graceful termination
-                try:
-                    await asyncio.wait_for(proc.wait(), timeout=1)
-                except asyncio.TimeoutError:
-                    # Force kill if graceful termination fails
-                    proc.kill()
-                    await proc.wait()
-
-                stdout, stderr = await proc.communicate()
-                encoding = locale.getpreferredencoding(False) or "utf-8"
-                stdout_str = stdout.decode(encoding, errors="replace")
-                stderr_str = stderr.decode(encoding, errors="replace")
-                if stderr_str:
-                    stderr_str += f"\n{stderr_suffix}"
-                else:
-                    stderr_str = stderr_suffix
-            except ProcessLookupError:
-                stdout_str = ""
-                stderr_str = stderr_suffix
-
-        # Format the response in a human-friendly way
-        if returncode == 0:
-            # Success case: just show the output
-            if stdout_str:
-                response_text = stdout_str
-            else:
-                response_text = "Command executed successfully (no output)."
-        else:
-            # Error case: show detailed information
-            response_parts = [f"Command failed with exit code {returncode}."]
-            if stdout_str:
-                response_parts.append(f"\n[stdout]\n{stdout_str}")
-            if stderr_str:
-                response_parts.append(f"\n[stderr]\n{stderr_str}")
-            response_text = "".join(response_parts)
-
-        return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=response_text,
-                ),
-            ],
-        )
-
-    except Exception as e:
-        return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=f"Error: Shell command execution failed due to \n{e}",
-                ),
-            ],
-        )
+    encoding = locale.getpreferredencoding(False) or "utf-8"
+    if persistent and not _IS_WINDOWS:
+        responses = _run_in_session(cmd, timeout, cwd, encoding)
+    else:
+        # Set working directory
+        working_dir = cwd if cwd is not None else WORKING_DIR
+        responses = _run_process(cmd, timeout, working_dir, encoding)
+    async with aclosing(responses):
+        async for response in responses:
+            yield response
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""Persistent shell sessions used by ``execute_shell_command``.
+
+With ``persistent=True`` the commands of one CoPaw session run in a
+long-lived shell instead of a new process per call, so ``cd``, exported
+variables and activated virtualenvs carry over between calls. Each
+command is written to a script that the shell sources (with stdin from
+/dev/null), followed by sentinel lines carrying a random token on stdout
+and stderr; they delimit the command's output and carry its exit code.
+
+Sessions idle for SHELL_SESSION_IDLE_TIMEOUT seconds are closed, and at
+most SHELL_SESSION_MAX are kept (the least recently used is evicted).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shlex
+import shutil
+import signal
+import tempfile
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Optional, Protocol
+
+from ...constant import (
+    SHELL_SESSION_IDLE_TIMEOUT,
+    SHELL_SESSION_MAX,
+    WORKING_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+# Session the running tool calls belong to; set by the runner per query
+shell_session_key: ContextVar[str] = ContextVar(
+    "shell_session_key",
+    default="default",
+)
+
+# Bytes read from a pipe at once
+_READ_CHUNK = 64 * 1024
+# Seconds to wait for a closed shell to exit
+_CLOSE_TIMEOUT = 2.0
+
+
+class OutputSink(Protocol):
+    """Receives the output of a command as it arrives."""
+
+    def feed(self, data: bytes) -> None:
+        ...
+
+
+async def _read_until(
+    stream: asyncio.StreamReader,
+    marker: bytes,
+    sink: OutputSink,
+) -> Optional[bytes]:
+    """Feed *stream* to *sink* up to *marker*.
+
+    Returns:
+        The rest of the marker's line, or None if the stream ended first.
+    """
+    keep = len(marker) - 1
+    pending = b""
+    while True:
+        data = await stream.read(_READ_CHUNK)
+        if not data:
+            sink.feed(pending)
+            return None
+        pending += data
+        found = pending.find(marker)
+        if found >= 0:
+            sink.feed(pending[:found])
+            rest = pending[found + len(marker) :]
+            while b"\n" not in rest:
+                data = await stream.read(_READ_CHUNK)
+                if not data:
+                    break
+                rest += data
+            return rest.partition(b"\n")[0]
+        # Hold back only an end that may be the start of the marker
+        cut = len(pending)
+        start = pending.find(marker[:1], max(0, len(pending) - keep))
+        while start >= 0:
+            if marker.startswith(pending[start:]):
+                cut = start
+                break
+            start = pending.find(marker[:1], start + 1)
+        sink.feed(pending[:cut])
+        pending = pending[cut:]
+
+
+class ShellSession:
+    """One long-lived shell process (see module docstring).
+
+    Commands must not overlap: hold :attr:`lock` around :meth:`run`.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock = asyncio.Lock()
+        self.last_used = 0.0
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._script_dir: Optional[str] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """Exit code of the shell once it has exited."""
+        return self._proc.returncode if self._proc is not None else None
+
+    async def start(self) -> None:
+        shell = shutil.which("bash") or "/bin/sh"
+        self._script_dir = tempfile.mkdtemp(prefix="copaw-shell-")
+        self._proc = await asyncio.create_subprocess_exec(
+            shell,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(WORKING_DIR),
+            # Own process group, so close() also ends background jobs
+            start_new_session=True,
+        )
+        logger.debug(
+            "Started shell session %s (%s, pid %d)",
+            self.key,
+            shell,
+            self._proc.pid,
+        )
+
+    async def run(
+        self,
+        command: str,
+        stdout: OutputSink,
+        stderr: OutputSink,
+        cwd: Optional[Path] = None,
+    ) -> Optional[int]:
+        """Run *command* in the shell, feeding its output to the sinks.
+
+        Args:
+            command: Shell command (may span several lines)
+            stdout: Receives the command's stdout
+            stderr: Receives the command's stderr
+            cwd: Directory to ``cd`` into first (the change persists)
+
+        Returns:
+            The command's exit code, or None if the shell exited (e.g.
+            the command ran ``exit``).
+        """
+        proc = self._proc
+        if proc is None or not self.alive:
+            return None
+        script = os.path.join(self._script_dir, "command.sh")
+        with open(script, "w", encoding="utf-8") as f:
+            if cwd is not None:
+                f.write(f"cd -- {shlex.quote(str(cwd))} || return\n")
+            f.write(command + "\n")
+
+        marker = f"__COPAW_DONE_{uuid.uuid4().hex}__"
+        # Each marker starts on a new line: a leading "\n" is part of it,
+        # so output without a trailing newline is returned unchanged
+        framed = (
+            f". {shlex.quote(script)} </dev/null\n"
+            f"printf '\\n%s %s\\n' {marker} \"$?\"\n"
+            f"printf '\\n%s\\n' {marker} >&2\n"
+        )
+        try:
+            proc.stdin.write(framed.encode())
+            await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            return None
+
+        tagged = ("\n" + marker).encode()
+        status, _ = await asyncio.gather(
+            _read_until(proc.stdout, tagged, stdout),
+            _read_until(proc.stderr, tagged, stderr),
+        )
+        if status is None:
+            return None
+        try:
+            return int(status.strip())
+        except ValueError:
+            return None
+
+    async def close(self) -> None:
+        """Kill the shell and everything it started."""
+        proc = self._proc
+        if proc is not None and proc.returncode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            # Process.wait() may block on pipes inherited by stray
+            # children; the kill above is what matters
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=_CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+        if self._script_dir is not None:
+            shutil.rmtree(self._script_dir, ignore_errors=True)
+            self._script_dir = None
+        logger.debug("Closed shell session %s", self.key)
+
+
+class ShellSessionManager:
+    """Persistent shells keyed by CoPaw session, with idle eviction.
+
+    Args:
+        idle_timeout: Seconds after which an unused session is closed
+        max_sessions: Max sessions kept; the least recently used one is
+            closed to make room
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = SHELL_SESSION_IDLE_TIMEOUT,
+        max_sessions: int = SHELL_SESSION_MAX,
+    ):
+        self._idle_timeout = idle_timeout
+        self._max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ShellSession]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+        self._started = 0
+        self._reused = 0
+
+    async def get(self, key: str) -> ShellSession:
+        """Return the live session for *key*, starting one if needed."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is not None and not session.alive:
+                await session.close()
+                session = None
+            if session is None:
+                await self._evict_lru()
+                session = ShellSession(key)
+                await session.start()
+                self._started += 1
+            else:
+                self._reused += 1
+            session.last_used = loop.time()
+            self._sessions[key] = session
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reap_idle())
+            return session
+
+    async def _evict_lru(self) -> None:
+        """Make room for a new session (caller holds the lock).
+
+        Busy sessions are skipped, so the cap may be exceeded briefly.
+        """
+        idle = [
+            key
+            for key, session in self._sessions.items()
+            if not session.lock.locked()
+        ]
+        excess = len(self._sessions) - self._max_sessions + 1
+        for key in idle[: max(0, excess)]:
+            await self._sessions.pop(key).close()
+
+    async def discard(self, key: str) -> None:
+        """Close the session for *key* (e.g. after a timed-out command)."""
+        async with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            await session.close()
+
+    async def close_all(self) -> None:
+        async with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for session in sessions:
+            await session.close()
+
+    async def _reap_idle(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._sessions:
+            await asyncio.sleep(min(self._idle_timeout, 60.0))
+            now = loop.time()
+            async with self._lock:
+                idle = [
+                    key
+                    for key, session in self._sessions.items()
+                    if not session.lock.locked()
+                    and now - session.last_used >= self._idle_timeout
+                ]
+                closing = [self._sessions.pop(key) for key in idle]
+            for session in closing:
+                logger.debug("Closing idle shell session %s", session.key)
+                await session.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "started": self._started,
+            "reused": self._reused,
+        }
+
+
+_manager: Optional[ShellSessionManager] = None
+
+
+def get_shell_sessions() -> ShellSessionManager:
+    """Return the process-wide shell session manager."""
+    global _manager
+    if _manager is None:
+        _manager = ShellSessionManager()
+    return _manager
@@ -1,62 +1,56 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import os
-import base64
 import hashlib
+import json
 import logging
 import shutil
-import subprocess
 import urllib.parse
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Optional
 from pathlib import Path
 
+from .downloader import MediaCache, get_media_cache
+
 logger = logging.getLogger(__name__)
 
 # Global token counter instance (lazy initialization)
 _token_counter = None
 
+# Max (message id, content hash) entries kept by the message token cache
+MESSAGE_TOKEN_CACHE_MAX = 20000
+
 
 async def download_file_from_base64(
     base64_data: str,
     filename: Optional[str] = None,
-    download_dir: str = "downloads",
+    download_dir: Optional[str] = None,
 ) -> str:
     """
-    Save base64-encoded file data to local download directory.
+    Save base64-encoded file data into the media cache.
+
+    The data is decoded and written chunk by chunk; identical content is
+    stored once.
 
     Args:
         base64_data (`str`):
             Base64-encoded file content.
         filename (`str`, optional):
             The filename to save. If not provided, will generate one.
-        download_dir (`str`):
-            The directory to save files. Defaults to "downloads".
+        download_dir (`str`, optional):
+            Cache directory. Defaults to the shared media cache.
 
     Returns:
         `str`:
             The local file path.
     """
+    cache = (
+        get_media_cache()
+        if download_dir is None
+        else MediaCache(Path(download_dir))
+    )
     try:
-        # Decode base64 data
-        file_content = base64.b64decode(base64_data)
-
-        # Create download directory if not exists
-        download_path = Path(download_dir)
-        download_path.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename if not provided
-        if not filename:
-            # Use hash of content as filename
-            file_hash = hashlib.md5(file_content).hexdigest()
-            filename = f"file_{file_hash}"
-
-        # Save file
-        local_file_path = download_path / filename
-        with open(local_file_path, "wb") as f:
-            f.write(file_content)
-
-        logger.debug("Downloaded file to: %s", local_file_path)
-        return str(local_file_path.absolute())
-
+        return await cache.save_base64(base64_data, filename)
     except Exception as e:
         logger.error("Failed to download file from base64: %s", e)
         raise
@@ -65,10 +59,14 @@ async def download_file_from_base64(
 async def download_file_from_url(
     url: str,
     filename: Optional[str] = None,
-    download_dir: str = "downloads",
+    download_dir: Optional[str] = None,
 ) -> str:
     """
-    Download a file from URL to local download directory using wget or curl.
+    Download a file from URL into the media cache without blocking.
+
+    The response is streamed to disk; identical content is stored once and
+    a URL seen before is revalidated by ETag. file:// URLs and existing
+    local paths are returned as is.
 
     Args:
         url (`str`):
@@ -76,95 +74,21 @@ async def download_file_from_url(
         filename (`str`, optional):
             The filename to save. If not provided, will extract from URL or
             generate a hash-based name.
-        download_dir (`str`):
-            The directory to save files. Defaults to "downloads".
+        download_dir (`str`, optional):
+            Cache directory. Defaults to the shared media cache.
 
     Returns:
         `str`:
             The local file path.
     """
+    cache = (
+        get_media_cache()
+        if download_dir is None
+        else MediaCache(Path(download_dir))
+    )
     try:
-        # Create download directory if not exists
-        download_path = Path(download_dir)
-        download_path.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename if not provided
-        if not filename:
-            # Try to extract filename from URL
-            parsed_url = urllib.parse.urlparse(url)
-            url_filename = os.path.basename(parsed_url.path)
-            if url_filename:
-                filename = url_filename
-            else:
-                # Use hash of URL as filename
-                url_hash = hashlib.md5(url.encode()).hexdigest()
-                filename = f"file_{url_hash}"
-
-        # Full local file path
-        local_file_path = download_path / filename
-
-        # Try wget first, then curl, then fall back to urllib (for Windows)
-        download_success = False
-        try:
-            subprocess.run(
-                ["wget", "-q", "-O", str(local_file_path), url],
-                capture_output=True,
-                timeout=60,
-                check=True,
-            )
-            logger.debug("Downloaded file via wget to: %s", local_file_path)
-            download_success = True
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            # wget failed or not available, try curl
-            logger.debug("wget failed, trying curl: %s", e)
-            try:
-                subprocess.run(
-                    ["curl", "-s", "-L", "-o", str(local_file_path), url],
-                    capture_output=True,
-                    timeout=60,
-                    check=True,
-                )
-                logger.debug(
-                    "Downloaded file via curl to: %s",
-                    local_file_path,
-                )
-                download_success = True
-            except (
-                subprocess.CalledProcessError,
-                FileNotFoundError,
-            ) as curl_err:
-                # curl also failed, fall back to urllib
-                logger.debug("curl failed, trying urllib: %s", curl_err)
-                try:
-                    import urllib.request as _urlreq
-
-                    _urlreq.urlretrieve(url, str(local_file_path))
-                    logger.debug(
-                        "Downloaded file via urllib to: %s",
-                        local_file_path,
-                    )
-                    download_success = True
-                except Exception as urllib_err:
-                    logger.error(
-                        "wget, curl and urllib all failed for URL %s: %s",
-                        url,
-                        urllib_err,
-                    )
-                    raise RuntimeError(
-                        "Failed to download file: "
-                        "wget, curl and urllib all failed",
-                    ) from urllib_err
-
-        # Verify file was downloaded
-        if not download_success or not local_file_path.exists():
-            raise FileNotFoundError("Downloaded file does not exist")
-
-        if local_file_path.stat().st_size == 0:
-            raise ValueError("Downloaded file is empty")
-
-        return str(local_file_path.absolute())
-
-    except subprocess.TimeoutExpired as e:
+        return await cache.download(url, filename)
+    except asyncio.TimeoutError as e:
         logger.error("Download timeout for URL: %s", url)
         raise TimeoutError(f"Download timeout for URL: {url}") from e
     except Exception as e:
@@ -352,21 +276,27 @@ async def process_file_and_media_blocks_in_message(msg) -> None:
         if not isinstance(message.content, list):
             continue
 
-        # Collect download results with their indices
-        downloaded_files = []
-
-        # Process each content block
-        for i, block in enumerate(message.content):
-            if not isinstance(block, dict):
-                continue
-
-            block_type = block.get("type")
-            if block_type not in ["file", "image", "audio", "video"]:
-                continue
+        # Download all file/media blocks of the message in parallel;
+        # each task only replaces its own index
+        indices = [
+            i
+            for i, block in enumerate(message.content)
+            if isinstance(block, dict)
+            and block.get("type") in ["file", "image", "audio", "video"]
+        ]
+        local_paths = await asyncio.gather(
+            *(
+                _process_single_block(message.content, i, message.content[i])
+                for i in indices
+            ),
+        )
 
-            local_path = await _process_single_block(message.content, i, block)
-            if local_path:
-                downloaded_files.append((i, local_path))
+        # Collect download results with their indices
+        downloaded_files = [
+            (i, local_path)
+            for i, local_path in zip(indices, local_paths)
+            if local_path
+        ]
 
         # Add text blocks for successfully downloaded files
         for i, local_path in reversed(downloaded_files):
@@ -534,6 +464,91 @@ async def count_message_tokens(
     return token_count
 
 
+class MessageTokenCache:
+    """Memoize token counts per message.
+
+    Entries are keyed by ``(msg.id, content hash)`` so only new or edited
+    messages are formatted and tokenized; the total for a message list is
+    the sum of the cached per-message counts. Shared by all agents of the
+    process since agents are recreated for every query.
+    """
+
+    def __init__(self, max_entries: int = MESSAGE_TOKEN_CACHE_MAX):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def message_key(msg) -> tuple[str, str]:
+        """Return the cache key (id, content hash) of a Msg."""
+        payload = json.dumps(
+            [msg.name, msg.role, msg.content],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.blake2b(
+            payload.encode("utf-8", errors="surrogatepass"),
+            digest_size=16,
+        ).hexdigest()
+        return msg.id, digest
+
+    async def count(self, msgs: list, formatter: Any) -> int:
+        """Return the token total of *msgs*, tokenizing only cache misses.
+
+        Args:
+            msgs: Msg objects to count.
+            formatter: Formatter used to turn a Msg into chat format.
+
+        Returns:
+            int: Sum of the per-message token counts.
+        """
+        total = 0
+        for msg in msgs:
+            key = self.message_key(msg)
+            tokens = self._entries.get(key)
+            if tokens is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+                prompt = await formatter.format(msgs=[msg])
+                tokens = await count_message_tokens(prompt)
+                self._entries[key] = tokens
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+            total += tokens
+        return total
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters, hit rate and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_message_token_cache: Optional[MessageTokenCache] = None
+
+
+def get_message_token_cache() -> MessageTokenCache:
+    """Get the process-wide message token cache."""
+    global _message_token_cache
+    if _message_token_cache is None:
+        _message_token_cache = MessageTokenCache()
+    return _message_token_cache
+
+
 def check_valid_messages(messages: list) -> bool:
     """
     Check if the messages are valid by ensuring all tool_use blocks have
@@ -16,13 +16,31 @@ from ..config import (  # pylint: disable=no-name-in-module
     update_last_dispatch,
     ConfigWatcher,
 )
-from ..config.utils import get_jobs_path, get_chats_path
+from ..config.cache import flush_config_caches
+from ..config.watcher import (
+    SECTION_ENVS,
+    SECTION_PROMPTS,
+    SECTION_PROVIDERS,
+    SECTION_SKILLS,
+)
+from ..config.utils import (
+    get_jobs_path,
+    get_chats_path,
+    get_chats_db_path,
+)
 from ..constant import DOCS_ENABLED, LOG_LEVEL_ENV
 from ..__version__ import __version__
+from ..agents.downloader import get_media_cache
+from ..agents.prompt import invalidate_system_prompt_cache
+from ..agents.model_clients import get_model_clients
+from ..agents.tools.shell_session import get_shell_sessions
 from ..utils.logging import setup_logger
 from .channels import ChannelManager  # pylint: disable=no-name-in-module
 from .channels.utils import make_process_from_runner
-from .runner.repo.json_repo import JsonChatRepository
+from .runner.repo.sqlite_repo import (
+    SqliteChatRepository,
+    import_chats_json,
+)
 from .crons.repo.json_repo import JsonJobRepository
 from .crons.manager import CronManager
 from .runner.manager import ChatManager
@@ -47,6 +65,20 @@ agent_app = AgentApp(
 subapi = agent_app.get_fastapi_app()
 
 
+async def _open_chat_repo() -> SqliteChatRepository:
+    """Open chats.db, importing a legacy chats.json if one is present.
+
+    The import upserts by chat id, so an interrupted migration is simply
+    repeated on the next start; chats.json is renamed once imported.
+    """
+    json_path = get_chats_path()
+    repo = SqliteChatRepository(get_chats_db_path())
+    if json_path.exists():
+        await import_chats_json(json_path, repo)
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+    return repo
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await runner.start()
@@ -71,15 +103,24 @@ async def lifespan(app: FastAPI):
     await cron_manager.start()
 
     # --- chat manager init and connect to runner.session ---
-    chat_repo = JsonChatRepository(get_chats_path())
+    chat_repo = await _open_chat_repo()
     chat_manager = ChatManager(
         repo=chat_repo,
     )
 
     runner.set_chat_manager(chat_manager)
 
-    # --- config file watcher (auto-reload channels on config.json change) ---
+    # --- config file watcher (reload channels / agent template on change)
     config_watcher = ConfigWatcher(channel_manager=channel_manager)
+    config_watcher.subscribe(SECTION_PROMPTS, invalidate_system_prompt_cache)
+    config_watcher.subscribe(
+        (SECTION_PROVIDERS, SECTION_PROMPTS, SECTION_SKILLS, SECTION_ENVS),
+        runner.invalidate_agent_template,
+    )
+    config_watcher.subscribe(
+        SECTION_ENVS,
+        lambda _section: load_envs_into_environ(),
+    )
     await config_watcher.start()
 
     # expose to endpoints
@@ -102,6 +143,11 @@ async def lifespan(app: FastAPI):
         finally:
             await channel_manager.stop_all()
             await runner.stop()
+            await get_shell_sessions().close_all()
+            await get_model_clients().close()
+            await get_media_cache().close()
+            chat_repo.close()
+            flush_config_caches()
 
 
 app = FastAPI(
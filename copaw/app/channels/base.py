@@ -5,6 +5,7 @@ Base Channel: bound to AgentRequest/AgentResponse, unified by process.
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from abc import ABC
@@ -14,13 +15,18 @@ from typing import (
     Any,
     List,
     AsyncIterator,
+    Awaitable,
     Callable,
     TYPE_CHECKING,
 )
 
 from agentscope_runtime.engine.schemas.agent_schemas import RunStatus
 
+from .dedup import get_inbound_dedup
+from .dispatcher import SessionDispatcher
 from .schema import Incoming, ChannelType
+from .streaming import ReplyStream, SendText
+from ...constant import CHANNEL_MAX_CONCURRENCY
 
 # Called when a user-originated reply was sent (channel, user_id, session_id)
 OnReplySent = Optional[Callable[[str, str, str], None]]
@@ -46,6 +52,14 @@ OutgoingContentPart = Dict[str, Any]
 class BaseChannel(ABC):
     channel: ChannelType
 
+    # Whether stream_begin / stream_update can edit a sent message
+    supports_message_edit = False
+    # Limits of streamed replies: characters per message, edits per
+    # message, messages per reply (None: no limit)
+    stream_max_chars = 4000
+    stream_max_edits: Optional[int] = None
+    stream_max_messages: Optional[int] = None
+
     def __init__(
         self,
         process: ProcessHandler,
@@ -55,6 +69,11 @@ class BaseChannel(ABC):
         self._process = process
         self._on_reply_sent = on_reply_sent
         self._show_tool_details = show_tool_details
+        # Max messages processed at once by _dispatch_loop
+        self.max_concurrency = CHANNEL_MAX_CONCURRENCY
+        # Send reply text while it is generated (config: stream_replies)
+        self.stream_replies = False
+        self._dispatcher: Optional[SessionDispatcher] = None
 
     @classmethod
     def from_env(
@@ -523,6 +542,48 @@ class BaseChannel(ABC):
         Subclasses override to send real attachments.
         """
 
+    def _reply_stream(
+        self,
+        to_handle: str,
+        meta: Optional[Dict[str, Any]] = None,
+        send_text: Optional[SendText] = None,
+    ) -> Optional[ReplyStream]:
+        """Return a ReplyStream for one request, or None if disabled.
+
+        See streaming.py; *send_text* overrides how text chunks are sent
+        (and disables message edits).
+        """
+        if not self.stream_replies:
+            return None
+        return ReplyStream(self, to_handle, meta, send_text=send_text)
+
+    async def stream_begin(
+        self,
+        to_handle: str,
+        text: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Send the first version of a streamed message.
+
+        Channels with ``supports_message_edit`` return a handle passed to
+        stream_update; None means the message could not be sent as an
+        editable one (the text is then sent in chunks). *text* already
+        has the bot prefix.
+        """
+        return None
+
+    async def stream_update(
+        self,
+        handle: Any,
+        text: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Replace the text of a message sent by stream_begin.
+
+        Returns whether the edit succeeded.
+        """
+        return False
+
     def _response_to_text(self, response: "AgentResponse") -> str:
         """Extract reply text from AgentResponse (last message in output)."""
         from agentscope_runtime.engine.schemas.agent_schemas import (
@@ -551,18 +612,79 @@ class BaseChannel(ABC):
                 parts.append(c.refusal)
         return "".join(parts)
 
+    def _dispatch_key(self, msg: Incoming) -> str:
+        """Session key used by _dispatch_loop: messages with the same key
+        are processed in order, different keys concurrently.
+        Default: one session per sender, like to_agent_request.
+        """
+        return f"{self.channel}:{msg.sender}"
+
+    async def _dispatch_loop(
+        self,
+        queue: "asyncio.Queue[Incoming]",
+        handler: Callable[[Incoming], Awaitable[None]],
+    ) -> None:
+        """Consume *queue* with a per-session bounded worker pool.
+
+        Different sessions (see _dispatch_key) run concurrently, up to
+        max_concurrency; one session is processed strictly in order.
+        Runs until cancelled (channel stop).
+        """
+        self._dispatcher = SessionDispatcher(
+            handler,
+            key_func=self._dispatch_key,
+            max_concurrency=self.max_concurrency,
+            name=str(self.channel),
+        )
+        await self._dispatcher.run(queue)
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """Queue depth / concurrency counters of the consume loop."""
+        if self._dispatcher is None:
+            return {}
+        return self._dispatcher.stats()
+
+    def _is_duplicate(self, message_id: Optional[str]) -> bool:
+        """Whether *message_id* was already received (records it if not).
+
+        Call before enqueueing an incoming message and drop it if True;
+        thread-safe, but touches disk: from the event loop, run it in a
+        thread.
+        """
+        return get_inbound_dedup().check(self.channel, message_id)
+
+    def _forget_inbound(self, message_id: Optional[str]) -> None:
+        """Undo :meth:`_is_duplicate` for a message that could not be
+        accepted, so the platform's redelivery is handled again."""
+        get_inbound_dedup().forget(self.channel, message_id)
+
+    def dedup_stats(self) -> Dict[str, Any]:
+        """Incoming messages checked / dropped as redelivered."""
+        return get_inbound_dedup().stats(self.channel)
+
     def clone(self, config) -> "BaseChannel":
         """Clone a new channel instance with updated config, cloning
         process and on_reply_sent from self.
 
         Subclasses must implement from_config(process, config, on_reply_sent).
         """
-        return self.__class__.from_config(
+        new_channel = self.__class__.from_config(
             process=self._process,
             config=config,
             on_reply_sent=self._on_reply_sent,
             show_tool_details=getattr(self, "_show_tool_details", True),
         )
+        new_channel.max_concurrency = getattr(
+            config,
+            "max_concurrency",
+            self.max_concurrency,
+        )
+        new_channel.stream_replies = getattr(
+            config,
+            "stream_replies",
+            self.stream_replies,
+        )
+        return new_channel
 
     async def start(self) -> None:
         raise NotImplementedError
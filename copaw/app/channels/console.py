@@ -100,64 +100,65 @@ class ConsoleChannel(BaseChannel):
     async def _consume_loop(self) -> None:
         """Process messages from the queue."""
         assert self._queue is not None
-        while True:
-            msg = await self._queue.get()
-            try:
-                request = self.to_agent_request(msg)
-                last_response = None
-                event_count = 0
-                _ = {
-                    **(msg.meta or {}),
-                    "bot_prefix": self.bot_prefix,
-                }
-
-                async for event in self._process(request):
-                    event_count += 1
-                    obj = getattr(event, "object", None)
-                    status = getattr(event, "status", None)
-                    ev_type = getattr(event, "type", None)
-
-                    logger.debug(
-                        "console event #%s: object=%s status=%s type=%s",
-                        event_count,
-                        obj,
-                        status,
-                        ev_type,
-                    )
-
-                    if obj == "message" and status == RunStatus.Completed:
-                        parts = self._message_to_content_parts(event)
-                        self._print_parts(parts, ev_type)
-
-                    elif obj == "response":
-                        last_response = event
-
-                logger.info(
-                    "console stream done: event_count=%s has_response=%s",
+        await self._dispatch_loop(self._queue, self._consume_one)
+
+    async def _consume_one(self, msg: Incoming) -> None:
+        try:
+            request = self.to_agent_request(msg)
+            last_response = None
+            event_count = 0
+            _ = {
+                **(msg.meta or {}),
+                "bot_prefix": self.bot_prefix,
+            }
+
+            async for event in self._process(request):
+                event_count += 1
+                obj = getattr(event, "object", None)
+                status = getattr(event, "status", None)
+                ev_type = getattr(event, "type", None)
+
+                logger.debug(
+                    "console event #%s: object=%s status=%s type=%s",
                     event_count,
-                    last_response is not None,
+                    obj,
+                    status,
+                    ev_type,
                 )
 
-                if last_response and getattr(last_response, "error", None):
-                    err = getattr(
-                        last_response.error,
-                        "message",
-                        str(last_response.error),
-                    )
-                    self._print_error(err)
-
-                if self._on_reply_sent:
-                    self._on_reply_sent(
-                        self.channel,
-                        request.user_id or msg.sender,
-                        request.session_id or f"{self.channel}:{msg.sender}",
-                    )
+                if obj == "message" and status == RunStatus.Completed:
+                    parts = self._message_to_content_parts(event)
+                    self._print_parts(parts, ev_type)
 
-            except Exception:
-                logger.exception("console process/reply failed")
-                self._print_error(
-                    "An error occurred while processing your request.",
+                elif obj == "response":
+                    last_response = event
+
+            logger.info(
+                "console stream done: event_count=%s has_response=%s",
+                event_count,
+                last_response is not None,
+            )
+
+            if last_response and getattr(last_response, "error", None):
+                err = getattr(
+                    last_response.error,
+                    "message",
+                    str(last_response.error),
                 )
+                self._print_error(err)
+
+            if self._on_reply_sent:
+                self._on_reply_sent(
+                    self.channel,
+                    request.user_id or msg.sender,
+                    request.session_id or f"{self.channel}:{msg.sender}",
+                )
+
+        except Exception:
+            logger.exception("console process/reply failed")
+            self._print_error(
+                "An error occurred while processing your request.",
+            )
 
     # ── pretty-print helpers ────────────────────────────────────────
 
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Drop inbound messages that a channel has already received.
+
+Platforms redeliver events after a reconnect (Feishu and QQ websocket
+resumes, DingTalk stream retries), and each redelivered message would
+start another agent run. Channels check the platform's message id with
+:meth:`InboundDedup.check` before enqueueing a message, and
+:meth:`InboundDedup.forget` it if the message could not be accepted.
+
+Ids are kept ``ttl`` seconds per channel in a small SQLite table, so
+they survive a restart; the most recent ones are also kept in an LRU in
+memory, which answers most redeliveries without touching the disk. The
+check and the insert are one statement, so two concurrent deliveries of
+the same id cannot both pass. If the database cannot be used, ids are
+only kept in memory.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ...constant import (
+    CHANNEL_DEDUP_MEMORY_MAX,
+    CHANNEL_DEDUP_PATH,
+    CHANNEL_DEDUP_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    channel TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (channel, message_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_seen_expires ON seen (expires_at);
+"""
+
+# Inserts a new id, or renews an expired one; no change for a duplicate
+_MARK_SQL = (
+    "INSERT INTO seen (channel, message_id, expires_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(channel, message_id) DO UPDATE SET "
+    "expires_at = excluded.expires_at "
+    "WHERE seen.expires_at <= ?"
+)
+
+_PURGE_SQL = "DELETE FROM seen WHERE expires_at <= ?"
+
+# Expired rows are deleted every this many new ids
+_PURGE_EVERY = 1000
+
+
+class InboundDedup:
+    """Message ids received per channel (see module docstring).
+
+    Thread-safe: channels call it from their event loop or from the
+    threads their SDKs deliver events on.
+
+    Args:
+        path: SQLite database; None keeps ids in memory only
+        ttl: Seconds an id is remembered
+        memory_max: Ids kept in memory
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = CHANNEL_DEDUP_PATH,
+        ttl: float = CHANNEL_DEDUP_TTL,
+        memory_max: int = CHANNEL_DEDUP_MEMORY_MAX,
+    ):
+        self._path = path
+        self._ttl = ttl
+        self._memory_max = max(1, memory_max)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_ok = path is not None
+        # (channel, message_id) -> expiry as time.time()
+        self._recent: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._inserts = 0
+        # channel -> [checked, duplicates]
+        self._counts: Dict[str, list] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self._path),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.execute(_PURGE_SQL, (time.time(),))
+            self._conn = conn
+        return self._conn
+
+    def _mark_on_disk(self, key: Tuple[str, str], now: float) -> bool:
+        """Record *key*; False if it was already recorded (lock held)."""
+        if not self._disk_ok:
+            return True
+        try:
+            conn = self._connect()
+            cursor = conn.execute(_MARK_SQL, (*key, now + self._ttl, now))
+            if cursor.rowcount == 0:
+                return False
+            self._inserts += 1
+            if self._inserts % _PURGE_EVERY == 0:
+                conn.execute(_PURGE_SQL, (now,))
+        except (sqlite3.Error, OSError):
+            self._disk_ok = False
+            logger.warning(
+                "Inbound dedup store %s unusable; keeping ids in memory",
+                self._path,
+                exc_info=True,
+            )
+        return True
+
+    def check(self, channel: str, message_id: Optional[str]) -> bool:
+        """Record *message_id* of *channel*; True if it was seen before.
+
+        Messages without an id are never treated as duplicates.
+        """
+        if not message_id:
+            return False
+        key = (str(channel), str(message_id))
+        now = time.time()
+        with self._lock:
+            counts = self._counts.setdefault(key[0], [0, 0])
+            counts[0] += 1
+            expires_at = self._recent.get(key)
+            if expires_at is not None and expires_at > now:
+                duplicate = True
+            else:
+                duplicate = not self._mark_on_disk(key, now)
+                self._recent[key] = now + self._ttl
+                while len(self._recent) > self._memory_max:
+                    self._recent.popitem(last=False)
+            self._recent.move_to_end(key)
+            if duplicate:
+                counts[1] += 1
+        if duplicate:
+            logger.info(
+                "%s: dropped redelivered message %s",
+                channel,
+                str(message_id)[:32],
+            )
+        return duplicate
+
+    def forget(self, channel: str, message_id: Optional[str]) -> None:
+        """Drop the record of *message_id*, so a redelivery is handled.
+
+        For a message that was checked but could not be accepted (e.g.
+        its handler failed and the platform will retry it).
+        """
+        if not message_id:
+            return
+        key = (str(channel), str(message_id))
+        with self._lock:
+            self._recent.pop(key, None)
+            if not self._disk_ok:
+                return
+            try:
+                self._connect().execute(
+                    "DELETE FROM seen WHERE channel = ? AND message_id = ?",
+                    key,
+                )
+            except (sqlite3.Error, OSError):
+                logger.warning(
+                    "Inbound dedup: failed to forget %s",
+                    key[1][:32],
+                    exc_info=True,
+                )
+
+    def stats(self, channel: Optional[str] = None) -> Dict[str, Any]:
+        """Checked and dropped messages, of *channel* or all channels."""
+        with self._lock:
+            if channel is not None:
+                checked, duplicates = self._counts.get(channel, (0, 0))
+                return {"checked": checked, "duplicates": duplicates}
+            return {
+                "persistent": self._disk_ok,
+                "in_memory": len(self._recent),
+                "channels": {
+                    name: {"checked": checked, "duplicates": duplicates}
+                    for name, (checked, duplicates) in self._counts.items()
+                },
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_dedup: Optional[InboundDedup] = None
+_dedup_lock = threading.Lock()
+
+
+def get_inbound_dedup() -> InboundDedup:
+    """Return the process-wide inbound dedup store."""
+    global _dedup
+    with _dedup_lock:
+        if _dedup is None:
+            _dedup = InboundDedup()
+        return _dedup
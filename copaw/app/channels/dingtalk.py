@@ -24,7 +24,7 @@ import os
 import threading
 import mimetypes
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 from urllib.parse import urlparse
 
 
@@ -36,6 +36,7 @@ from agentscope_runtime.engine.schemas.agent_schemas import RunStatus
 from ...config.config import DingTalkConfig as DingTalkChannelConfig
 from ...config.utils import get_config_path
 
+from .http_session import PooledHttpSession
 from .schema import Incoming, IncomingContentItem
 from .base import BaseChannel, OnReplySent, OutgoingContentPart, ProcessHandler
 
@@ -274,12 +275,16 @@ class _DingTalkChannelHandler(dingtalk_stream.ChatbotHandler):
         queue: asyncio.Queue[Incoming],
         bot_prefix: str,
         download_url_fetcher,
+        is_duplicate: Callable[[Optional[str]], bool],
+        forget_inbound: Callable[[Optional[str]], None],
     ):
         super().__init__()
         self._main_loop = main_loop
         self._queue = queue
         self._bot_prefix = bot_prefix
         self._download_url_fetcher = download_url_fetcher
+        self._is_duplicate = is_duplicate
+        self._forget_inbound = forget_inbound
 
     def _emit_incoming_threadsafe(self, msg: Incoming) -> None:
         self._main_loop.call_soon_threadsafe(self._queue.put_nowait, msg)
@@ -371,8 +376,14 @@ class _DingTalkChannelHandler(dingtalk_stream.ChatbotHandler):
         return content
 
     async def process(self, callback: CallbackMessage) -> tuple[int, str]:
+        message_id = None
         try:
             incoming_message = ChatbotMessage.from_dict(callback.data)
+            message_id = getattr(incoming_message, "message_id", None)
+            if self._is_duplicate(message_id):
+                message_id = None
+                # Redelivered: ack without running the agent again
+                return dingtalk_stream.AckMessage.STATUS_OK, "ok"
 
             logger.debug(
                 f"Dingtalk message received:" f" {incoming_message.to_dict()}",
@@ -425,6 +436,8 @@ class _DingTalkChannelHandler(dingtalk_stream.ChatbotHandler):
 
         except Exception:
             logger.exception("process failed")
+            # DingTalk retries the message: do not drop it as a duplicate
+            self._forget_inbound(message_id)
             return dingtalk_stream.AckMessage.STATUS_SYSTEM_EXCEPTION, "error"
 
 
@@ -470,6 +483,8 @@ class DingTalkChannel(BaseChannel):
         self._consumer_task: Optional[asyncio.Task[None]] = None
         self._stream_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # Pooled keep-alive HTTP session for API calls (start() / stop())
+        self._http = PooledHttpSession(self.channel)
 
         # Store sessionWebhook for proactive send (in-memory).
         # Key is a handle string, e.g. "dingtalk:sw:<sender>"
@@ -699,29 +714,29 @@ class DingTalkChannel(BaseChannel):
         )
         logger.info(f"dingtalk sessionWebhook send: payload={payload}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    session_webhook,
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json; charset=utf-8",
-                    },
-                ) as resp:
-                    body_text = await resp.text()
-                    if resp.status >= 400:
-                        logger.warning(
-                            "dingtalk sessionWebhook POST failed: msgtype=%s "
-                            "status=%s body=%s",
-                            msgtype,
-                            resp.status,
-                            body_text[:500],
-                        )
-                        return False
-                    logger.info(
-                        f"dingtalk sessionWebhook POST ok: msgtype={msgtype} "
-                        f"status={resp.status}",
+            session = self._http.session()
+            async with session.post(
+                session_webhook,
+                json=payload,
+                headers={
+                    "Content-Type": "application/json; charset=utf-8",
+                },
+            ) as resp:
+                body_text = await resp.text()
+                if resp.status >= 400:
+                    logger.warning(
+                        "dingtalk sessionWebhook POST failed: msgtype=%s "
+                        "status=%s body=%s",
+                        msgtype,
+                        resp.status,
+                        body_text[:500],
                     )
-                    return True
+                    return False
+                logger.info(
+                    f"dingtalk sessionWebhook POST ok: msgtype={msgtype} "
+                    f"status={resp.status}",
+                )
+                return True
         except Exception:
             logger.exception(
                 f"dingtalk sessionWebhook POST failed: msgtype={msgtype}",
@@ -787,52 +802,52 @@ class DingTalkChannel(BaseChannel):
             or "application/octet-stream",
         )
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=form) as resp:
-                    result = await resp.json(content_type=None)
-                    if resp.status >= 400:
-                        logger.warning(
-                            "dingtalk upload_media failed: type=%s status=%s "
-                            "body=%s",
-                            media_type,
-                            resp.status,
-                            result,
-                        )
-                        return None
-                    # Old oapi returns errcode; 0 means success.
-                    errcode = result.get("errcode", 0)
-                    if errcode != 0:
-                        logger.warning(
-                            f"dingtalk upload_media oapi err: "
-                            f"type={media_type} "
-                            f"errcode={errcode} "
-                            f"errmsg={result.get('errmsg', '')}",
-                        )
-                        return None
-                    media_id = (
-                        result.get("media_id")
-                        or result.get("mediaId")
-                        or (result.get("result") or {}).get("media_id")
-                        or (result.get("result") or {}).get("mediaId")
+            session = self._http.session()
+            async with session.post(url, data=form) as resp:
+                result = await resp.json(content_type=None)
+                if resp.status >= 400:
+                    logger.warning(
+                        "dingtalk upload_media failed: type=%s status=%s "
+                        "body=%s",
+                        media_type,
+                        resp.status,
+                        result,
                     )
-                    if media_id:
-                        mid_preview = (
-                            media_id[:32] + "..."
-                            if len(media_id) > 32
-                            else media_id
-                        )
-                        logger.info(
-                            "dingtalk upload_media ok: type=%s media_id=%s",
-                            media_type,
-                            mid_preview,
-                        )
-                    else:
-                        logger.warning(
-                            "dingtalk upload_media: no media_id in response "
-                            "result=%s",
-                            result,
-                        )
-                    return media_id
+                    return None
+                # Old oapi returns errcode; 0 means success.
+                errcode = result.get("errcode", 0)
+                if errcode != 0:
+                    logger.warning(
+                        f"dingtalk upload_media oapi err: "
+                        f"type={media_type} "
+                        f"errcode={errcode} "
+                        f"errmsg={result.get('errmsg', '')}",
+                    )
+                    return None
+                media_id = (
+                    result.get("media_id")
+                    or result.get("mediaId")
+                    or (result.get("result") or {}).get("media_id")
+                    or (result.get("result") or {}).get("mediaId")
+                )
+                if media_id:
+                    mid_preview = (
+                        media_id[:32] + "..."
+                        if len(media_id) > 32
+                        else media_id
+                    )
+                    logger.info(
+                        "dingtalk upload_media ok: type=%s media_id=%s",
+                        media_type,
+                        mid_preview,
+                    )
+                else:
+                    logger.warning(
+                        "dingtalk upload_media: no media_id in response "
+                        "result=%s",
+                        result,
+                    )
+                return media_id
         except Exception:
             logger.exception(
                 "dingtalk upload_media failed: type=%s filename=%s",
@@ -848,20 +863,20 @@ class DingTalkChannel(BaseChannel):
             url[:80] + "..." if len(url) > 80 else url,
         )
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status >= 400:
-                        logger.warning(
-                            "dingtalk fetch_bytes_from_url failed: status=%s",
-                            resp.status,
-                        )
-                        return None
-                    data = await resp.read()
-                    logger.info(
-                        "dingtalk fetch_bytes_from_url ok: size=%s",
-                        len(data),
+            session = self._http.session()
+            async with session.get(url) as resp:
+                if resp.status >= 400:
+                    logger.warning(
+                        "dingtalk fetch_bytes_from_url failed: status=%s",
+                        resp.status,
                     )
-                    return data
+                    return None
+                data = await resp.read()
+                logger.info(
+                    "dingtalk fetch_bytes_from_url ok: size=%s",
+                    len(data),
+                )
+                return data
         except Exception:
             logger.exception(
                 "dingtalk fetch_bytes_from_url failed: url=%s",
@@ -1256,9 +1271,7 @@ class DingTalkChannel(BaseChannel):
 
     async def _consume_loop(self) -> None:
         assert self._debounced_queue is not None
-        while True:
-            msg = await self._debounced_queue.get()
-            await self._consume_one(msg)
+        await self._dispatch_loop(self._debounced_queue, self._consume_one)
 
     async def _consume_one(
         self,
@@ -1285,62 +1298,87 @@ class DingTalkChannel(BaseChannel):
                 session_webhook,
             )
 
-        async for event in self._process(request):
-            event_count += 1
-            obj = getattr(event, "object", None)
-            status = getattr(event, "status", None)
-            ev_type = getattr(event, "type", None)
-            logger.debug(
-                "dingtalk event #%s: object=%s status=%s type=%s",
-                event_count,
-                obj,
-                status,
-                ev_type,
+        # Without a sessionWebhook there is a single synchronous reply
+        stream = None
+        if use_multi and session_webhook:
+
+            async def _send_chunk(text: str) -> None:
+                await self._send_via_session_webhook(
+                    session_webhook,
+                    text,
+                    bot_prefix="",
+                )
+
+            stream = self._reply_stream(
+                msg.sender,
+                send_meta,
+                send_text=_send_chunk,
             )
-            if obj == "message" and status == RunStatus.Completed:
-                parts = self._message_to_content_parts(event)
-                logger.info(
-                    f"dingtalk completed message: type={ev_type} "
-                    f"parts_count={len(parts)}",
+
+        try:
+            async for event in self._process(request):
+                event_count += 1
+                if stream is not None:
+                    await stream.feed(event)
+                obj = getattr(event, "object", None)
+                status = getattr(event, "status", None)
+                ev_type = getattr(event, "type", None)
+                logger.debug(
+                    "dingtalk event #%s: object=%s status=%s type=%s",
+                    event_count,
+                    obj,
+                    status,
+                    ev_type,
                 )
-                if use_multi and parts and session_webhook:
-                    body = self._parts_to_single_text(
-                        parts,
-                        bot_prefix="",
+                if obj == "message" and status == RunStatus.Completed:
+                    parts = self._message_to_content_parts(event)
+                    if stream is not None:
+                        parts = await stream.finish(event, parts)
+                    logger.info(
+                        f"dingtalk completed message: type={ev_type} "
+                        f"parts_count={len(parts)}",
                     )
-                    if body.strip():
-                        await self._send_via_session_webhook(
-                            session_webhook,
-                            body.strip(),
+                    if use_multi and parts and session_webhook:
+                        body = self._parts_to_single_text(
+                            parts,
                             bot_prefix="",
                         )
-                    _media_types = ("image", "file", "video", "audio")
-                    media_count = sum(
-                        1 for p in parts if p.get("type") in _media_types
-                    )
-                    if media_count:
-                        logger.info(
-                            "dingtalk consume_loop: "
-                            "sending %s media "
-                            "parts via webhook",
-                            media_count,
-                        )
-                    for part in parts:
-                        if part.get("type") in _media_types:
-                            ok = await self._send_media_part_via_webhook(
+                        if body.strip():
+                            await self._send_via_session_webhook(
                                 session_webhook,
-                                part,
+                                body.strip(),
+                                bot_prefix="",
                             )
+                        _media_types = ("image", "file", "video", "audio")
+                        media_count = sum(
+                            1 for p in parts if p.get("type") in _media_types
+                        )
+                        if media_count:
                             logger.info(
-                                "dingtalk consume_loop: media part "
-                                "type=%s result=%s",
-                                part.get("type"),
-                                ok,
+                                "dingtalk consume_loop: "
+                                "sending %s media "
+                                "parts via webhook",
+                                media_count,
                             )
-                else:
-                    accumulated_parts.extend(parts)
-            elif obj == "response":
-                last_response = event
+                        for part in parts:
+                            if part.get("type") in _media_types:
+                                ok = await self._send_media_part_via_webhook(
+                                    session_webhook,
+                                    part,
+                                )
+                                logger.info(
+                                    "dingtalk consume_loop: media part "
+                                    "type=%s result=%s",
+                                    part.get("type"),
+                                    ok,
+                                )
+                    else:
+                        accumulated_parts.extend(parts)
+                elif obj == "response":
+                    last_response = event
+        finally:
+            if stream is not None:
+                await stream.close()
 
         logger.info(
             "dingtalk stream done: event_count=%s parts=%s webhook=%s",
@@ -1388,6 +1426,9 @@ class DingTalkChannel(BaseChannel):
                 request.session_id or f"{self.channel}:{msg.sender}",
             )
 
+    def _dispatch_key(self, msg: Incoming) -> str:
+        return self._debounce_key(msg)
+
     def _debounce_key(self, msg: Incoming) -> str:
         meta = msg.meta or {}
         cid = meta.get("conversation_id") or ""
@@ -1507,6 +1548,7 @@ class DingTalkChannel(BaseChannel):
             )
 
         self._loop = asyncio.get_running_loop()
+        self._http.session()
         self._queue = asyncio.Queue(maxsize=1000)  # raw input
         self._debounced_queue = asyncio.Queue(maxsize=1000)  # after merge
 
@@ -1530,6 +1572,8 @@ class DingTalkChannel(BaseChannel):
             queue=self._queue,
             bot_prefix=self.bot_prefix,
             download_url_fetcher=self._get_message_file_download_url,
+            is_duplicate=self._is_duplicate,
+            forget_inbound=self._forget_inbound,
         )
         self._client.register_callback_handler(
             ChatbotMessage.TOPIC,
@@ -1566,6 +1610,7 @@ class DingTalkChannel(BaseChannel):
                 pass
             except Exception:
                 pass
+        await self._http.close()
 
     async def send(
         self,
@@ -1645,14 +1690,14 @@ class DingTalkChannel(BaseChannel):
                 "appSecret": self.client_secret,
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as resp:
-                    data = await resp.json(content_type=None)
-                    if resp.status >= 400:
-                        raise RuntimeError(
-                            f"get accessToken failed status={resp.status} "
-                            f"body={data}",
-                        )
+            session = self._http.session()
+            async with session.post(url, json=payload) as resp:
+                data = await resp.json(content_type=None)
+                if resp.status >= 400:
+                    raise RuntimeError(
+                        f"get accessToken failed status={resp.status} "
+                        f"body={data}",
+                    )
 
             token = data.get("accessToken") or data.get("access_token")
             if not token:
@@ -1685,20 +1730,20 @@ class DingTalkChannel(BaseChannel):
             "x-acs-dingtalk-access-token": token,
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url,
-                json=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json(content_type=None)
-                if resp.status >= 400:
-                    logger.warning(
-                        "messageFiles/download failed status=%s body=%s",
-                        resp.status,
-                        data,
-                    )
-                    return None
+        session = self._http.session()
+        async with session.post(
+            url,
+            json=payload,
+            headers=headers,
+        ) as resp:
+            data = await resp.json(content_type=None)
+            if resp.status >= 400:
+                logger.warning(
+                    "messageFiles/download failed status=%s body=%s",
+                    resp.status,
+                    data,
+                )
+                return None
 
         logger.debug("messageFiles/download response=%s", data)
         return (
@@ -20,6 +20,9 @@ logger = logging.getLogger(__name__)
 
 class DiscordChannel(BaseChannel):
     channel = "discord"
+    # Streamed replies are edited in place (2000 characters per message)
+    supports_message_edit = True
+    stream_max_chars = 2000
 
     def __init__(
         self,
@@ -69,6 +72,12 @@ class DiscordChannel(BaseChannel):
             async def on_message(message):
                 if message.author.bot:
                     return
+                # Gateway resumes can replay messages
+                if await asyncio.to_thread(
+                    self._is_duplicate,
+                    str(message.id),
+                ):
+                    return
                 text = (message.content or "").strip()
                 attachments = message.attachments
 
@@ -146,32 +155,47 @@ class DiscordChannel(BaseChannel):
                         "bot_prefix": self.bot_prefix,
                     }
                     event_count = 0
-                    async for event in self._process(request):
-                        event_count += 1
-                        obj = getattr(event, "object", None)
-                        status = getattr(event, "status", None)
-                        ev_type = getattr(event, "type", None)
-                        logger.debug(
-                            "discord event #%s: object=%s status=%s type=%s",
-                            event_count,
-                            obj,
-                            status,
-                            ev_type,
-                        )
-                        if obj == "message" and status == RunStatus.Completed:
-                            logger.info(
-                                "discord sending completed message: type=%s "
-                                "to=%s",
+                    stream = self._reply_stream(msg.sender, send_meta)
+                    try:
+                        async for event in self._process(request):
+                            event_count += 1
+                            if stream is not None:
+                                await stream.feed(event)
+                            obj = getattr(event, "object", None)
+                            status = getattr(event, "status", None)
+                            ev_type = getattr(event, "type", None)
+                            logger.debug(
+                                "discord event #%s: object=%s status=%s "
+                                "type=%s",
+                                event_count,
+                                obj,
+                                status,
                                 ev_type,
-                                msg.sender,
                             )
-                            await self.send_message_content(
-                                msg.sender,
-                                event,
-                                send_meta,
-                            )
-                        elif obj == "response":
-                            last_response = event
+                            if (
+                                obj == "message"
+                                and status == RunStatus.Completed
+                            ):
+                                logger.info(
+                                    "discord sending completed message: "
+                                    "type=%s to=%s",
+                                    ev_type,
+                                    msg.sender,
+                                )
+                                parts = self._message_to_content_parts(event)
+                                if stream is not None:
+                                    parts = await stream.finish(event, parts)
+                                if parts:
+                                    await self.send_content_parts(
+                                        msg.sender,
+                                        parts,
+                                        send_meta,
+                                    )
+                            elif obj == "response":
+                                last_response = event
+                    finally:
+                        if stream is not None:
+                            await stream.close()
                     logger.info(
                         "discord stream done: event_count=%s "
                         "has_response=%s has_error=%s",
@@ -257,12 +281,17 @@ class DiscordChannel(BaseChannel):
         """
         if not self.enabled:
             return
+        target = await self._resolve_target(to_handle, meta)
+        await target.send(text)
+
+    async def _resolve_target(self, to_handle: str, meta: Optional[dict]):
+        """Return the channel or DM to send to (see send)."""
         if not self._client:
             raise RuntimeError("Discord client is not initialized")
         if not self._client.is_ready():
             raise RuntimeError("Discord client is not ready yet")
 
-        meta = meta or {}
+        meta = dict(meta or {})
 
         if not meta.get("channel_id") and not meta.get("user_id"):
             meta.update(self._route_from_handle(to_handle))
@@ -276,8 +305,7 @@ class DiscordChannel(BaseChannel):
                 ch = await self._client.fetch_channel(
                     int(channel_id),
                 )
-            await ch.send(text)
-            return
+            return ch
 
         if user_id:
             user = self._client.get_user(int(user_id))
@@ -285,15 +313,42 @@ class DiscordChannel(BaseChannel):
                 user = await self._client.fetch_user(
                     int(user_id),
                 )
-            dm = user.dm_channel or await user.create_dm()
-            await dm.send(text)
-            return
+            return user.dm_channel or await user.create_dm()
 
         raise ValueError(
             "DiscordChannel.send requires meta['channel_id'] or meta["
             "'user_id']",
         )
 
+    async def stream_begin(
+        self,
+        to_handle: str,
+        text: str,
+        meta: Optional[dict] = None,
+    ):
+        """Send *text*; the returned discord.Message is edited later."""
+        if not self.enabled:
+            return None
+        try:
+            target = await self._resolve_target(to_handle, meta)
+            return await target.send(text)
+        except Exception:
+            logger.exception("discord stream_begin failed")
+            return None
+
+    async def stream_update(
+        self,
+        handle,
+        text: str,
+        meta: Optional[dict] = None,
+    ) -> bool:
+        try:
+            await handle.edit(content=text)
+        except Exception:
+            logger.exception("discord stream_update failed")
+            return False
+        return True
+
     async def _run(self) -> None:
         if not self.enabled or not self.token or not self._client:
             return
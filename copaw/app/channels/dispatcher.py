@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Per-session dispatcher for channel consume loops.
+
+Messages of different sessions are processed concurrently by a bounded
+pool, messages of the same session strictly in arrival order. Each
+session with pending messages gets one worker task that drains its own
+FIFO; a semaphore caps how many of them run the handler at once.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+from .schema import Incoming
+
+logger = logging.getLogger(__name__)
+
+# Messages taken off the intake queue but not yet processed, all sessions
+DISPATCH_MAX_PENDING = 1000
+
+
+class SessionDispatcher:
+    """Run *handler* for queued messages, concurrently across sessions.
+
+    Args:
+        handler: Coroutine function processing one message
+        key_func: Maps a message to its session key
+        max_concurrency: Max messages processed at once
+        name: Used in logs and task names
+        max_pending: Max messages buffered across all sessions; the
+            intake queue is not read while the buffer is full
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Incoming], Awaitable[None]],
+        key_func: Callable[[Incoming], str],
+        max_concurrency: int,
+        name: str = "channel",
+        max_pending: int = DISPATCH_MAX_PENDING,
+    ):
+        self._handler = handler
+        self._key_func = key_func
+        self._name = name
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._workers_sem = asyncio.Semaphore(self._max_concurrency)
+        self._pending_slots = asyncio.Semaphore(max(1, max_pending))
+        self._queue: asyncio.Queue[Incoming] | None = None
+
+        self._sessions: Dict[str, Deque[Incoming]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._pending = 0
+        self._active = 0
+        self._processed = 0
+        self._failed = 0
+        self._max_pending_seen = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters."""
+        return {
+            "max_concurrency": self._max_concurrency,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "pending": self._pending,
+            "max_pending": self._max_pending_seen,
+            "active": self._active,
+            "sessions": len(self._sessions),
+            "processed": self._processed,
+            "failed": self._failed,
+        }
+
+    async def run(self, queue: "asyncio.Queue[Incoming]") -> None:
+        """Consume *queue* until cancelled; cancels workers on exit."""
+        self._queue = queue
+        try:
+            while True:
+                await self._pending_slots.acquire()
+                try:
+                    msg = await queue.get()
+                except BaseException:
+                    self._pending_slots.release()
+                    raise
+                self._submit(msg)
+        finally:
+            workers = list(self._workers.values())
+            for task in workers:
+                task.cancel()
+            if workers:
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    def _submit(self, msg: Incoming) -> None:
+        try:
+            key = self._key_func(msg)
+        except Exception:
+            logger.exception("%s dispatch key failed", self._name)
+            key = f"{msg.channel}:{msg.sender}"
+
+        self._sessions.setdefault(key, deque()).append(msg)
+        self._pending += 1
+        self._max_pending_seen = max(self._max_pending_seen, self._pending)
+        logger.debug(
+            "%s dispatch: session=%s stats=%s",
+            self._name,
+            key,
+            self.stats(),
+        )
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(
+                self._drain(key),
+                name=f"{self._name}_session_worker",
+            )
+
+    async def _drain(self, key: str) -> None:
+        """Process the session's messages one by one, in order."""
+        pending = self._sessions[key]
+        try:
+            while pending:
+                msg = pending.popleft()
+                try:
+                    async with self._workers_sem:
+                        self._active += 1
+                        try:
+                            await self._handler(msg)
+                            self._processed += 1
+                        except Exception:
+                            self._failed += 1
+                            logger.exception(
+                                "%s process failed (session=%s)",
+                                self._name,
+                                key,
+                            )
+                        finally:
+                            self._active -= 1
+                finally:
+                    self._pending -= 1
+                    self._pending_slots.release()
+        finally:
+            # No await since the last emptiness check: a message for this
+            # key arriving later starts a new worker
+            self._workers.pop(key, None)
+            dropped = self._sessions.pop(key, None)
+            if dropped:
+                for _ in dropped:
+                    self._pending -= 1
+                    self._pending_slots.release()
@@ -20,7 +20,6 @@ import mimetypes
 import re
 import threading
 import time
-from collections import OrderedDict
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
@@ -37,10 +36,15 @@ from lark_oapi.api.im.v1 import (
     CreateMessageReactionRequestBody,
     Emoji,
     P2ImMessageReceiveV1,
+    UpdateMessageRequest,
+    UpdateMessageRequestBody,
 )
 
 from ...config.config import FeishuConfig as FeishuChannelConfig
 from ...config.utils import get_config_path
+from ...constant import CHANNEL_PROFILE_CACHE_DIR, CHANNEL_PROFILE_PERSIST
+from .http_session import PooledHttpSession
+from .profile_cache import ProfileCache
 from .schema import Incoming, IncomingContentItem
 from .base import BaseChannel, OnReplySent, OutgoingContentPart, ProcessHandler
 
@@ -55,9 +59,6 @@ FEISHU_TOKEN_REFRESH_BEFORE_SECONDS = 60
 # Max size for Feishu file upload (30MB)
 FEISHU_FILE_MAX_BYTES = 30 * 1024 * 1024
 
-# Dedup cache max size
-FEISHU_PROCESSED_IDS_MAX = 1000
-
 # Nickname cache max size (open_id -> name from Contact API)
 FEISHU_NICKNAME_CACHE_MAX = 500
 
@@ -122,6 +123,10 @@ class FeishuChannel(BaseChannel):
     """
 
     channel = "feishu"
+    # Streamed replies are edited in place (a message takes 20 edits)
+    supports_message_edit = True
+    stream_max_edits = 20
+    stream_max_chars = 20000
 
     def __init__(
         self,
@@ -156,19 +161,26 @@ class FeishuChannel(BaseChannel):
         self._queue: Optional[asyncio.Queue[Incoming]] = None
         self._consumer_task: Optional[asyncio.Task[None]] = None
         self._stop_event = threading.Event()
+        # Pooled keep-alive HTTP session for API calls (start() / stop())
+        self._http = PooledHttpSession(self.channel)
 
         self._tenant_access_token: Optional[str] = None
         self._tenant_access_token_expire_at: float = 0.0
         self._token_lock = asyncio.Lock()
 
-        # message_id dedup (ordered, trim when over limit)
-        self._processed_message_ids: OrderedDict[str, None] = OrderedDict()
         # session_id -> (receive_id, receive_id_type) for send
         self._receive_id_store: Dict[str, Tuple[str, str]] = {}
         self._receive_id_lock = asyncio.Lock()
         # open_id -> nickname (from Contact API) for sender display
-        self._nickname_cache: Dict[str, str] = {}
-        self._nickname_cache_lock = asyncio.Lock()
+        self._nickname_cache = ProfileCache(
+            self.channel,
+            FEISHU_NICKNAME_CACHE_MAX,
+            path=(
+                CHANNEL_PROFILE_CACHE_DIR / f"{self.channel}.json"
+                if CHANNEL_PROFILE_PERSIST
+                else None
+            ),
+        )
 
     @classmethod
     def from_env(
@@ -211,6 +223,26 @@ class FeishuChannel(BaseChannel):
             show_tool_details=show_tool_details,
         )
 
+    def _session_id_for(self, incoming: Incoming) -> str:
+        """Session id: group chat -> chat_id, p2p -> sender open_id."""
+        meta = incoming.meta or {}
+        chat_id = (meta.get("feishu_chat_id") or "").strip()
+        chat_type = (meta.get("feishu_chat_type") or "p2p").strip()
+        sender_id = (
+            meta.get("feishu_sender_id") or incoming.sender or ""
+        ).strip()
+
+        if chat_type == "group" and chat_id:
+            return _short_session_id_from_full_id(chat_id)
+        if sender_id:
+            return _short_session_id_from_full_id(sender_id)
+        if chat_id:
+            return _short_session_id_from_full_id(chat_id)
+        return f"{self.channel}:{incoming.sender}"
+
+    def _dispatch_key(self, msg: Incoming) -> str:
+        return self._session_id_for(msg)
+
     def to_agent_request(self, incoming: Incoming) -> "AgentRequest":
         """Build AgentRequest; session_id = short suffix of chat_id or open_id
         (like DingTalk) so request and to_handle stay short; put
@@ -237,15 +269,7 @@ class FeishuChannel(BaseChannel):
         sender_id = (
             meta.get("feishu_sender_id") or incoming.sender or ""
         ).strip()
-
-        if chat_type == "group" and chat_id:
-            session_id = _short_session_id_from_full_id(chat_id)
-        elif sender_id:
-            session_id = _short_session_id_from_full_id(sender_id)
-        elif chat_id:
-            session_id = _short_session_id_from_full_id(chat_id)
-        else:
-            session_id = f"{self.channel}:{incoming.sender}"
+        session_id = self._session_id_for(incoming)
 
         content_list = incoming.get_content_list()
         contents = []
@@ -368,14 +392,14 @@ class FeishuChannel(BaseChannel):
                 "app_id": self.app_id,
                 "app_secret": self.app_secret,
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as resp:
-                    data = await resp.json(content_type=None)
-                    if resp.status >= 400:
-                        raise RuntimeError(
-                            f"Feishu token failed status={resp.status} "
-                            f"body={data}",
-                        )
+            session = self._http.session()
+            async with session.post(url, json=payload) as resp:
+                data = await resp.json(content_type=None)
+                if resp.status >= 400:
+                    raise RuntimeError(
+                        f"Feishu token failed status={resp.status} "
+                        f"body={data}",
+                    )
             if data.get("code") != 0:
                 raise RuntimeError(
                     f"Feishu token error code={data.get('code')} msg"
@@ -390,128 +414,120 @@ class FeishuChannel(BaseChannel):
             return token
 
     async def _get_user_name_by_open_id(self, open_id: str) -> Optional[str]:
+        """User name (nickname) of *open_id*, from the cache or Contact API.
+
+        Returns None on failure or missing permission.
+        """
+        if not open_id or open_id.startswith("unknown_"):
+            return None
+        return await self._nickname_cache.get(
+            open_id,
+            lambda: self._fetch_user_name(open_id),
+        )
+
+    async def _fetch_user_name(self, open_id: str) -> Optional[str]:
         """Fetch user name (nickname) from Feishu Contact API by open_id.
 
         Uses Contact v3 GET /open-apis/contact/v3/users/{user_id} with
         user_id_type=open_id (see Feishu user identity doc:
         https://open.feishu.cn/document/platform-overveiw/basic-concepts/
         user-identity-introduction/open-id).
-        Result is cached. Returns None on failure or missing permission.
+        Returns None if the user has no name or the app lacks permission;
+        raises on transient errors (timeout, rate limit, server error), so
+        only definite answers are cached.
         """
-        if not open_id or open_id.startswith("unknown_"):
-            return None
-        async with self._nickname_cache_lock:
-            if open_id in self._nickname_cache:
-                return self._nickname_cache[open_id]
         url = (
             "https://open.feishu.cn/open-apis/contact/v3/users/"
             f"{open_id}?user_id_type=open_id"
         )
-        try:
-            token = await self._get_tenant_access_token()
-            timeout = aiohttp.ClientTimeout(
-                total=FEISHU_USER_NAME_FETCH_TIMEOUT,
-            )
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    url,
-                    headers={"Authorization": f"Bearer {token}"},
-                ) as resp:
-                    body = await resp.text()
-                    if resp.status >= 400:
-                        logger.info(
-                            "feishu get user name failed: open_id=%s "
-                            "status=%s "
-                            "body=%s",
-                            open_id[:20],
-                            resp.status,
-                            body[:200] if body else "",
-                        )
-                        return None
-                    try:
-                        data = json.loads(body) if body else {}
-                    except json.JSONDecodeError:
-                        data = {}
-            if data.get("code") != 0:
+        token = await self._get_tenant_access_token()
+        timeout = aiohttp.ClientTimeout(
+            total=FEISHU_USER_NAME_FETCH_TIMEOUT,
+        )
+        session = self._http.session()
+        async with session.get(
+            url,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout,
+        ) as resp:
+            body = await resp.text()
+            if resp.status == 429 or resp.status >= 500:
+                raise RuntimeError(
+                    f"feishu get user name: status {resp.status}",
+                )
+            if resp.status >= 400:
                 logger.info(
-                    "feishu get user name api error: open_id=%s code=%s "
-                    "msg=%s",
+                    "feishu get user name failed: open_id=%s "
+                    "status=%s "
+                    "body=%s",
                     open_id[:20],
-                    data.get("code"),
-                    data.get("msg", ""),
+                    resp.status,
+                    body[:200] if body else "",
                 )
                 return None
-            # Response per Feishu doc: GET contact/v3/users/{user_id}
-            # https://open.feishu.cn/document/server-docs/contact-v3/user/get
-            # Body: { "code": 0, "data": { "user": { "name": ... } } }
-            # "name" can be string or i18n object { "zh_cn": "中文", "en": "en" }
-            user = data.get("data") or {}
-            inner = user.get("user") or {}
-            name = None
-            for obj in (inner, user):
-                if not isinstance(obj, dict):
-                    continue
-                raw_name = (
-                    obj.get("name")
-                    or obj.get("real_name")
-                    or obj.get(
-                        "nickname",
-                    )
-                    or obj.get("name_cn")
-                    or obj.get("name_en")
-                    or obj.get(
-                        "en_name",
-                    )
+            try:
+                data = json.loads(body) if body else {}
+            except json.JSONDecodeError:
+                data = {}
+        if data.get("code") != 0:
+            logger.info(
+                "feishu get user name api error: open_id=%s code=%s "
+                "msg=%s",
+                open_id[:20],
+                data.get("code"),
+                data.get("msg", ""),
+            )
+            return None
+        # Response per Feishu doc: GET contact/v3/users/{user_id}
+        # https://open.feishu.cn/document/server-docs/contact-v3/user/get
+        # Body: { "code": 0, "data": { "user": { "name": ... } } }
+        # "name" can be string or i18n object { "zh_cn": "中文", "en": "en" }
+        user = data.get("data") or {}
+        inner = user.get("user") or {}
+        name = None
+        for obj in (inner, user):
+            if not isinstance(obj, dict):
+                continue
+            raw_name = (
+                obj.get("name")
+                or obj.get("real_name")
+                or obj.get(
+                    "nickname",
                 )
-                if isinstance(raw_name, str) and raw_name.strip():
-                    name = raw_name.strip()
-                    break
-                if isinstance(raw_name, dict):
-                    name = (
-                        raw_name.get("zh_cn")
-                        or raw_name.get("zh_CN")
-                        or raw_name.get("zh-Cn")
-                        or raw_name.get("zh-CN")
-                        or raw_name.get("en")
-                        or (list(raw_name.values()) or [None])[0]
-                    )
-                    if name and isinstance(name, str):
-                        name = name.strip()
-                        break
-                    first_val = (list(raw_name.values()) or [None])[0]
-                    if isinstance(first_val, str) and first_val.strip():
-                        name = first_val.strip()
-                        break
-            if not name:
-                logger.info(
-                    f"feishu get user name: no name in response (open_id"
-                    f"={(open_id or '')[:20]}). inner_keys"
-                    f"={list(inner.keys()) if inner else []} - app likely "
-                    f"missing contact name permission. Add scope e.g. "
-                    f"contact:user.base:readonly in Feishu console.",
+                or obj.get("name_cn")
+                or obj.get("name_en")
+                or obj.get(
+                    "en_name",
                 )
-
-            if name:
-                async with self._nickname_cache_lock:
-                    if len(self._nickname_cache) >= FEISHU_NICKNAME_CACHE_MAX:
-                        # Drop oldest: dict has no order, drop arbitrary
-                        self._nickname_cache.pop(
-                            next(iter(self._nickname_cache)),
-                        )
-                    self._nickname_cache[open_id] = name
-                return name
-        except asyncio.TimeoutError:
-            logger.debug(
-                "feishu get user name timeout: open_id=%s",
-                open_id[:16],
             )
-        except Exception:
-            logger.debug(
-                "feishu get user name failed: open_id=%s",
-                open_id[:16],
-                exc_info=True,
+            if isinstance(raw_name, str) and raw_name.strip():
+                name = raw_name.strip()
+                break
+            if isinstance(raw_name, dict):
+                name = (
+                    raw_name.get("zh_cn")
+                    or raw_name.get("zh_CN")
+                    or raw_name.get("zh-Cn")
+                    or raw_name.get("zh-CN")
+                    or raw_name.get("en")
+                    or (list(raw_name.values()) or [None])[0]
+                )
+                if name and isinstance(name, str):
+                    name = name.strip()
+                    break
+                first_val = (list(raw_name.values()) or [None])[0]
+                if isinstance(first_val, str) and first_val.strip():
+                    name = first_val.strip()
+                    break
+        if not name:
+            logger.info(
+                f"feishu get user name: no name in response (open_id"
+                f"={(open_id or '')[:20]}). inner_keys"
+                f"={list(inner.keys()) if inner else []} - app likely "
+                f"missing contact name permission. Add scope e.g. "
+                f"contact:user.base:readonly in Feishu console.",
             )
-        return None
+        return name if isinstance(name, str) and name else None
 
     def _emit_incoming_threadsafe(self, msg: Incoming) -> None:
         if self._loop and self._queue:
@@ -538,6 +554,7 @@ class FeishuChannel(BaseChannel):
             or not getattr(data, "event", None)
         ):
             return
+        message_id = ""
         try:
             event = data.event
             message = getattr(event, "message", None)
@@ -547,11 +564,8 @@ class FeishuChannel(BaseChannel):
 
             message_id = getattr(message, "message_id", None) or ""
             message_id = str(message_id).strip()
-            if message_id in self._processed_message_ids:
+            if await asyncio.to_thread(self._is_duplicate, message_id):
                 return
-            self._processed_message_ids[message_id] = None
-            while len(self._processed_message_ids) > FEISHU_PROCESSED_IDS_MAX:
-                self._processed_message_ids.popitem(last=False)
 
             sender_type = getattr(sender, "sender_type", "") or ""
             if sender_type == "bot":
@@ -668,6 +682,8 @@ class FeishuChannel(BaseChannel):
             self._emit_incoming_threadsafe(msg)
         except Exception:
             logger.exception("feishu _on_message failed")
+            # Let a redelivery of the message through
+            await asyncio.to_thread(self._forget_inbound, message_id)
 
     async def _add_reaction(
         self,
@@ -730,24 +746,24 @@ class FeishuChannel(BaseChannel):
         )
         headers = {"Authorization": f"Bearer {token}"}
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    params={"type": "image"},
-                    headers=headers,
-                ) as resp:
-                    if resp.status >= 400:
-                        logger.warning(
-                            "feishu image download failed status=%s",
-                            resp.status,
-                        )
-                        return None
-                    data = await resp.read()
-                    content_type = (
-                        resp.headers.get("Content-Type", "")
-                        .split(";")[0]
-                        .strip()
+            session = self._http.session()
+            async with session.get(
+                url,
+                params={"type": "image"},
+                headers=headers,
+            ) as resp:
+                if resp.status >= 400:
+                    logger.warning(
+                        "feishu image download failed status=%s",
+                        resp.status,
                     )
+                    return None
+                data = await resp.read()
+                content_type = (
+                    resp.headers.get("Content-Type", "")
+                    .split(";")[0]
+                    .strip()
+                )
             ext = (mimetypes.guess_extension(content_type) or ".jpg").lstrip(
                 ".",
             )
@@ -773,19 +789,19 @@ class FeishuChannel(BaseChannel):
         url = f"https://open.feishu.cn/open-apis/im/v1/files/{file_key}"
         headers = {"Authorization": f"Bearer {token}"}
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status >= 400:
-                        logger.warning(
-                            "feishu file download failed status=%s",
-                            resp.status,
-                        )
-                        return None
-                    data = await resp.read()
-                    disposition = resp.headers.get(
-                        "Content-Disposition",
-                        "",
+            session = self._http.session()
+            async with session.get(url, headers=headers) as resp:
+                if resp.status >= 400:
+                    logger.warning(
+                        "feishu file download failed status=%s",
+                        resp.status,
                     )
+                    return None
+                data = await resp.read()
+                disposition = resp.headers.get(
+                    "Content-Disposition",
+                    "",
+                )
             filename = "file.bin"
             if "filename=" in disposition:
                 part = (
@@ -1006,44 +1022,44 @@ class FeishuChannel(BaseChannel):
             content_type=mime,
         )
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    headers={"Authorization": f"Bearer {token}"},
-                    data=form,
-                ) as resp:
-                    data = await resp.json(content_type=None)
-                    if resp.status >= 400:
-                        logger.warning(
-                            "feishu file upload failed status=%s body=%s",
-                            resp.status,
-                            data,
-                        )
-                        return None
-                    if data.get("code") != 0:
-                        logger.info(
-                            "feishu _upload_file api code=%s msg=%s",
-                            data.get("code"),
-                            data.get("msg"),
-                        )
-                        return None
-                    fk = (data.get("data") or {}).get("file_key")
+            session = self._http.session()
+            async with session.post(
+                url,
+                headers={"Authorization": f"Bearer {token}"},
+                data=form,
+            ) as resp:
+                data = await resp.json(content_type=None)
+                if resp.status >= 400:
+                    logger.warning(
+                        "feishu file upload failed status=%s body=%s",
+                        resp.status,
+                        data,
+                    )
+                    return None
+                if data.get("code") != 0:
                     logger.info(
-                        "feishu _upload_file ok: file_key=%s",
-                        fk[:24] if fk else "None",
+                        "feishu _upload_file api code=%s msg=%s",
+                        data.get("code"),
+                        data.get("msg"),
                     )
-                    return fk
+                    return None
+                fk = (data.get("data") or {}).get("file_key")
+                logger.info(
+                    "feishu _upload_file ok: file_key=%s",
+                    fk[:24] if fk else "None",
+                )
+                return fk
         except Exception:
             logger.exception("feishu _upload_file failed")
             return None
 
     async def _fetch_bytes_from_url(self, url: str) -> Optional[bytes]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status >= 400:
-                        return None
-                    return await resp.read()
+            session = self._http.session()
+            async with session.get(url) as resp:
+                if resp.status >= 400:
+                    return None
+                return await resp.read()
         except Exception:
             logger.exception("feishu _fetch_bytes_from_url failed")
             return None
@@ -1056,8 +1072,26 @@ class FeishuChannel(BaseChannel):
         content: str,
     ) -> bool:
         """Send one message (post, image, or file) via lark client."""
+        return (
+            self._create_message_sync(
+                receive_id_type,
+                receive_id,
+                msg_type,
+                content,
+            )
+            is not None
+        )
+
+    def _create_message_sync(
+        self,
+        receive_id_type: str,
+        receive_id: str,
+        msg_type: str,
+        content: str,
+    ) -> Optional[str]:
+        """Send one message via lark client; return its message_id."""
         if not FEISHU_AVAILABLE or not self._client:
-            return False
+            return None
         logger.info(
             "feishu _send_message_sync: msg_type=%s receive_id_type=%s "
             "content_len=%s",
@@ -1087,14 +1121,48 @@ class FeishuChannel(BaseChannel):
                     getattr(resp, "code", ""),
                     getattr(resp, "msg", ""),
                 )
-                return False
+                return None
             logger.info(
                 "feishu _send_message_sync ok: msg_type=%s",
                 msg_type,
             )
-            return True
+            return getattr(resp.data, "message_id", None) or ""
         except Exception:
             logger.exception("feishu _send_message_sync failed")
+            return None
+
+    def _update_message_sync(
+        self,
+        message_id: str,
+        msg_type: str,
+        content: str,
+    ) -> bool:
+        """Replace the content of a sent text/post message."""
+        if not FEISHU_AVAILABLE or not self._client:
+            return False
+        try:
+            req = (
+                UpdateMessageRequest.builder()
+                .message_id(message_id)
+                .request_body(
+                    UpdateMessageRequestBody.builder()
+                    .msg_type(msg_type)
+                    .content(content)
+                    .build(),
+                )
+                .build()
+            )
+            resp = self._client.im.v1.message.update(req)
+            if not resp.success():
+                logger.warning(
+                    "feishu update failed code=%s msg=%s",
+                    getattr(resp, "code", ""),
+                    getattr(resp, "msg", ""),
+                )
+                return False
+            return True
+        except Exception:
+            logger.exception("feishu _update_message_sync failed")
             return False
 
     async def _send_text(
@@ -1117,6 +1185,51 @@ class FeishuChannel(BaseChannel):
             ),
         )
 
+    async def stream_begin(
+        self,
+        to_handle: str,
+        text: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """Send *text* as a post; return its message_id for edits."""
+        if not self.enabled or not FEISHU_AVAILABLE:
+            return None
+        recv = await self._get_receive_for_send(to_handle, meta)
+        if not recv:
+            return None
+        receive_id_type, receive_id = recv
+        content = json.dumps(
+            self._build_post_content(text, []),
+            ensure_ascii=False,
+        )
+        loop = asyncio.get_running_loop()
+        message_id = await loop.run_in_executor(
+            None,
+            lambda: self._create_message_sync(
+                receive_id_type,
+                receive_id,
+                "post",
+                content,
+            ),
+        )
+        return message_id or None
+
+    async def stream_update(
+        self,
+        handle: Any,
+        text: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        content = json.dumps(
+            self._build_post_content(text, []),
+            ensure_ascii=False,
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self._update_message_sync(handle, "post", content),
+        )
+
     async def _part_to_image_bytes(
         self,
         part: OutgoingContentPart,
@@ -1471,20 +1584,29 @@ class FeishuChannel(BaseChannel):
         send_meta = {**(meta or {}), "bot_prefix": self.bot_prefix}
         to_handle = request.session_id or msg.sender
         last_response = None
+        stream = self._reply_stream(to_handle, send_meta)
         try:
-            async for event in self._process(request):
-                obj = getattr(event, "object", None)
-                status = getattr(event, "status", None)
-                if obj == "message" and status == RunStatus.Completed:
-                    parts = self._message_to_content_parts(event)
-                    if parts:
-                        await self.send_content_parts(
-                            to_handle,
-                            parts,
-                            send_meta,
-                        )
-                elif getattr(event, "object", None) == "response":
-                    last_response = event
+            try:
+                async for event in self._process(request):
+                    if stream is not None:
+                        await stream.feed(event)
+                    obj = getattr(event, "object", None)
+                    status = getattr(event, "status", None)
+                    if obj == "message" and status == RunStatus.Completed:
+                        parts = self._message_to_content_parts(event)
+                        if stream is not None:
+                            parts = await stream.finish(event, parts)
+                        if parts:
+                            await self.send_content_parts(
+                                to_handle,
+                                parts,
+                                send_meta,
+                            )
+                    elif getattr(event, "object", None) == "response":
+                        last_response = event
+            finally:
+                if stream is not None:
+                    await stream.close()
         except Exception:
             logger.exception("feishu _consume_one process failed")
             err_text = self.bot_prefix + "Processing failed."
@@ -1526,9 +1648,7 @@ class FeishuChannel(BaseChannel):
 
     async def _consume_loop(self) -> None:
         assert self._queue is not None
-        while True:
-            msg = await self._queue.get()
-            await self._consume_one(msg)
+        await self._dispatch_loop(self._queue, self._consume_one)
 
     def _run_ws_forever(self) -> None:
         # lark-oapi ws.Client uses a module-level event loop; when start() runs
@@ -1555,6 +1675,7 @@ class FeishuChannel(BaseChannel):
             logger.info("feishu channel disabled")
             return
         self._load_receive_id_store_from_disk()
+        await asyncio.to_thread(self._nickname_cache.load)
         if not FEISHU_AVAILABLE:
             raise RuntimeError(
                 "Feishu channel enabled but lark-oapi not installed. "
@@ -1566,6 +1687,7 @@ class FeishuChannel(BaseChannel):
                 "feishu channel is enabled.",
             )
         self._loop = asyncio.get_running_loop()
+        self._http.session()
         self._queue = asyncio.Queue(maxsize=1000)
         self._client = (
             lark.Client.builder()
@@ -1621,4 +1743,9 @@ class FeishuChannel(BaseChannel):
                 pass
         self._client = None
         self._ws_client = None
-        logger.info("feishu channel stopped")
+        await self._http.close()
+        await self._nickname_cache.flush()
+        logger.info(
+            "feishu channel stopped (user name cache: %s)",
+            self._nickname_cache.stats(),
+        )
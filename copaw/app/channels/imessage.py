@@ -182,14 +182,23 @@ ORDER BY m.ROWID ASC
 
     async def _consume_loop(self) -> None:
         assert self._queue is not None
-        while True:
-            msg = await self._queue.get()
+        await self._dispatch_loop(self._queue, self._consume_one)
+
+    async def _consume_one(self, msg: Incoming) -> None:
+        try:
+            request = self.to_agent_request(msg)
+            last_response = None
+            event_count = 0
+            send_meta = {
+                **(msg.meta or {}),
+                "bot_prefix": self.bot_prefix,
+            }
+            stream = self._reply_stream(msg.sender, send_meta)
             try:
-                request = self.to_agent_request(msg)
-                last_response = None
-                event_count = 0
                 async for event in self._process(request):
                     event_count += 1
+                    if stream is not None:
+                        await stream.feed(event)
                     obj = getattr(event, "object", None)
                     status = getattr(event, "status", None)
                     ev_type = getattr(event, "type", None)
@@ -207,41 +216,44 @@ ORDER BY m.ROWID ASC
                             ev_type,
                             msg.sender,
                         )
-                        send_meta = {
-                            **(msg.meta or {}),
-                            "bot_prefix": self.bot_prefix,
-                        }
-                        await self.send_message_content(
-                            msg.sender,
-                            event,
-                            send_meta,
-                        )
+                        parts = self._message_to_content_parts(event)
+                        if stream is not None:
+                            parts = await stream.finish(event, parts)
+                        if parts:
+                            await self.send_content_parts(
+                                msg.sender,
+                                parts,
+                                send_meta,
+                            )
                     elif obj == "response":
                         last_response = event
-                logger.info(
-                    "imessage stream done: event_count=%s has_response=%s",
-                    event_count,
-                    last_response is not None,
+            finally:
+                if stream is not None:
+                    await stream.close()
+            logger.info(
+                "imessage stream done: event_count=%s has_response=%s",
+                event_count,
+                last_response is not None,
+            )
+            if last_response and getattr(last_response, "error", None):
+                err = getattr(
+                    last_response.error,
+                    "message",
+                    str(last_response.error),
                 )
-                if last_response and getattr(last_response, "error", None):
-                    err = getattr(
-                        last_response.error,
-                        "message",
-                        str(last_response.error),
-                    )
-                    await asyncio.to_thread(
-                        self._send_sync,
-                        msg.sender,
-                        self.bot_prefix + f"Error: {err}",
-                    )
-                if self._on_reply_sent:
-                    self._on_reply_sent(
-                        self.channel,
-                        request.user_id or msg.sender,
-                        request.session_id or f"{self.channel}:{msg.sender}",
-                    )
-            except Exception:
-                logger.exception("process/send failed")
+                await asyncio.to_thread(
+                    self._send_sync,
+                    msg.sender,
+                    self.bot_prefix + f"Error: {err}",
+                )
+            if self._on_reply_sent:
+                self._on_reply_sent(
+                    self.channel,
+                    request.user_id or msg.sender,
+                    request.session_id or f"{self.channel}:{msg.sender}",
+                )
+        except Exception:
+            logger.exception("process/send failed")
 
     async def start(self) -> None:
         if not self.enabled:
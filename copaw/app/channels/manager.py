@@ -8,6 +8,7 @@ import logging
 from typing import Callable, List, Optional, Any, Dict, TYPE_CHECKING
 
 from .base import BaseChannel, ProcessHandler
+from .dedup import get_inbound_dedup
 from .imessage import IMessageChannel
 from .discord_ import DiscordChannel
 from .dingtalk import DingTalkChannel
@@ -82,22 +83,21 @@ class ChannelManager:
                 continue
             # ConsoleChannel.from_config does not accept show_tool_details
             if key == "console":
-                channels.append(
-                    ch_cls.from_config(
-                        process,
-                        ch_cfg,
-                        on_reply_sent=on_last_dispatch,
-                    ),
+                channel = ch_cls.from_config(
+                    process,
+                    ch_cfg,
+                    on_reply_sent=on_last_dispatch,
                 )
             else:
-                channels.append(
-                    ch_cls.from_config(
-                        process,
-                        ch_cfg,
-                        on_reply_sent=on_last_dispatch,
-                        show_tool_details=show_tool_details,
-                    ),
+                channel = ch_cls.from_config(
+                    process,
+                    ch_cfg,
+                    on_reply_sent=on_last_dispatch,
+                    show_tool_details=show_tool_details,
                 )
+            channel.max_concurrency = ch_cfg.max_concurrency
+            channel.stream_replies = ch_cfg.stream_replies
+            channels.append(channel)
         return cls(channels)
 
     async def start_all(self) -> None:
@@ -123,6 +123,11 @@ class ChannelManager:
                 logger.exception(f"failed to stop channels={ch.channel}")
 
         await asyncio.gather(*[_stop(g) for g in reversed(snapshot)])
+        dedup = get_inbound_dedup()
+        stats = dedup.stats()
+        if stats["channels"]:
+            logger.info("inbound dedup: %s", stats)
+        dedup.close()
 
     async def get_channel(self, channel: str) -> Optional[BaseChannel]:
         async with self._lock:
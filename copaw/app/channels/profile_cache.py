@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Cache of sender display names looked up from a platform API.
+
+Channels that only get a user id with incoming messages (e.g. Feishu's
+open_id) fetch the sender's name before the message is enqueued. The
+cache keeps those names so a busy group chat costs one lookup per sender
+instead of one per message:
+
+- Found names are kept ``ttl`` seconds, failed lookups (no name in the
+  response, missing permission) ``negative_ttl`` seconds. Errors such as
+  timeouts are not cached.
+- At most ``max_entries`` ids are kept (least recently used dropped).
+- Concurrent lookups of the same id share one fetch.
+- Found names can be saved to a JSON file, so a restart does not look
+  every sender up again.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ...constant import CHANNEL_PROFILE_NEGATIVE_TTL, CHANNEL_PROFILE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Fetches the name of one id; None if it has none, raises on errors
+FetchName = Callable[[], Awaitable[Optional[str]]]
+
+# Min seconds between saves while names are added
+_SAVE_INTERVAL = 60.0
+
+
+class ProfileCache:
+    """TTL + LRU cache of id -> display name (see module docstring).
+
+    Use it from one event loop only.
+
+    Args:
+        name: Label used in logs (e.g. the channel name)
+        max_entries: Max ids kept
+        ttl: Seconds a found name is kept
+        negative_ttl: Seconds a failed lookup is kept
+        path: JSON file the found names are saved to; None keeps them in
+            memory only
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float = CHANNEL_PROFILE_TTL,
+        negative_ttl: float = CHANNEL_PROFILE_NEGATIVE_TTL,
+        path: Optional[Path] = None,
+    ):
+        self._name = name
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._path = path
+        # id -> (name or None, expiry as time.time())
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._hits = 0
+        self._negative_hits = 0
+        self._coalesced = 0
+        self._fetches = 0
+        self._errors = 0
+
+    async def get(self, key: str, fetch: FetchName) -> Optional[str]:
+        """Return the name of *key*, calling *fetch* on a miss.
+
+        Returns None if the id has no name or the lookup failed.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                if value is None:
+                    self._negative_hits += 1
+                else:
+                    self._hits += 1
+                return value
+            del self._entries[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._coalesced += 1
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[Optional[str]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[key] = future
+        self._fetches += 1
+        value: Optional[str] = None
+        try:
+            value = await fetch()
+        except Exception:
+            # Transient (timeout, network): let the next message retry
+            self._errors += 1
+            logger.debug(
+                "%s profile lookup failed: %s",
+                self._name,
+                key[:16],
+                exc_info=True,
+            )
+        else:
+            self._put(key, value)
+        finally:
+            del self._inflight[key]
+            future.set_result(value)
+
+        if self._dirty and time.time() - self._last_save >= _SAVE_INTERVAL:
+            await self.flush()
+        return value
+
+    def _put(self, key: str, value: Optional[str]) -> None:
+        ttl = self._ttl if value is not None else self._negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (value, time.time() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        if value is not None:
+            self._dirty = True
+
+    # ---- persistence ----
+
+    def load(self) -> None:
+        """Read the names saved by :meth:`flush` (expired ones skipped)."""
+        if self._path is None:
+            return
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning(
+                "%s profile cache unreadable, starting empty: %s",
+                self._name,
+                self._path,
+            )
+            return
+        now = time.time()
+        loaded = 0
+        # Saved least recently used first
+        for key, item in (data.get("names") or {}).items():
+            try:
+                value, expires_at = str(item[0]), float(item[1])
+            except (TypeError, ValueError, IndexError):
+                continue
+            if expires_at > now and key not in self._entries:
+                self._entries[key] = (value, expires_at)
+                loaded += 1
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._last_save = now
+        logger.debug("%s profile cache: loaded %d name(s)", self._name, loaded)
+
+    def _write(self, names: Dict[str, Any]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"names": names}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self._path)
+
+    async def flush(self) -> None:
+        """Save the found names if any were added since the last save."""
+        if self._path is None or not self._dirty:
+            return
+        now = time.time()
+        names = {
+            key: [value, expires_at]
+            for key, (value, expires_at) in self._entries.items()
+            if value is not None and expires_at > now
+        }
+        self._dirty = False
+        self._last_save = now
+        try:
+            await asyncio.to_thread(self._write, names)
+        except OSError:
+            self._dirty = True
+            logger.warning(
+                "%s profile cache: saving %s failed",
+                self._name,
+                self._path,
+                exc_info=True,
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters; ``hit_rate`` counts shared fetches as hits."""
+        hits = self._hits + self._negative_hits + self._coalesced
+        lookups = hits + self._fetches
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "negative_hits": self._negative_hits,
+            "coalesced": self._coalesced,
+            "fetches": self._fetches,
+            "errors": self._errors,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
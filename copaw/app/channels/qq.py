@@ -24,6 +24,7 @@ from agentscope_runtime.engine.schemas.agent_schemas import RunStatus
 
 from ...config.config import QQConfig as QQChannelConfig
 
+from .http_session import PooledHttpSession
 from .schema import Incoming
 from .base import BaseChannel, OnReplySent, OutgoingContentPart, ProcessHandler
 
@@ -180,24 +181,27 @@ def _get_next_msg_seq(msg_id: str) -> int:
         return n
 
 
-async def _get_access_token_async(app_id: str, client_secret: str) -> str:
+async def _get_access_token_async(
+    session: aiohttp.ClientSession,
+    app_id: str,
+    client_secret: str,
+) -> str:
     """Async get token for send_content_parts. Uses aiohttp."""
     global _token_cache
     with _token_lock:
         if _token_cache and time.time() < _token_cache["expires_at"] - 300:
             return _token_cache["token"]
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            TOKEN_URL,
-            json={"appId": app_id, "clientSecret": client_secret},
-            headers={"Content-Type": "application/json"},
-        ) as resp:
-            if resp.status >= 400:
-                text = await resp.text()
-                raise RuntimeError(
-                    f"Token request failed {resp.status}: {text}",
-                )
-            data = await resp.json()
+    async with session.post(
+        TOKEN_URL,
+        json={"appId": app_id, "clientSecret": client_secret},
+        headers={"Content-Type": "application/json"},
+    ) as resp:
+        if resp.status >= 400:
+            text = await resp.text()
+            raise RuntimeError(
+                f"Token request failed {resp.status}: {text}",
+            )
+        data = await resp.json()
     token = data.get("access_token")
     if not token:
         raise RuntimeError(f"No access_token: {data}")
@@ -213,29 +217,30 @@ async def _get_access_token_async(app_id: str, client_secret: str) -> str:
 
 
 async def _api_request_async(
+    session: aiohttp.ClientSession,
     access_token: str,
     method: str,
     path: str,
     body: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     url = f"{_get_api_base()}{path}"
-    async with aiohttp.ClientSession() as session:
-        kwargs = {
-            "headers": {
-                "Authorization": f"QQBot {access_token}",
-                "Content-Type": "application/json",
-            },
-        }
-        if body is not None:
-            kwargs["json"] = body
-        async with session.request(method, url, **kwargs) as resp:
-            data = await resp.json()
-            if resp.status >= 400:
-                raise RuntimeError(f"API {path} {resp.status}: {data}")
-            return data
+    kwargs = {
+        "headers": {
+            "Authorization": f"QQBot {access_token}",
+            "Content-Type": "application/json",
+        },
+    }
+    if body is not None:
+        kwargs["json"] = body
+    async with session.request(method, url, **kwargs) as resp:
+        data = await resp.json()
+        if resp.status >= 400:
+            raise RuntimeError(f"API {path} {resp.status}: {data}")
+        return data
 
 
 async def _send_c2c_message_async(
+    session: aiohttp.ClientSession,
     access_token: str,
     openid: str,
     content: str,
@@ -246,6 +251,7 @@ async def _send_c2c_message_async(
     if msg_id:
         body["msg_id"] = msg_id
     await _api_request_async(
+        session,
         access_token,
         "POST",
         f"/v2/users/{openid}/messages",
@@ -254,6 +260,7 @@ async def _send_c2c_message_async(
 
 
 async def _send_channel_message_async(
+    session: aiohttp.ClientSession,
     access_token: str,
     channel_id: str,
     content: str,
@@ -263,6 +270,7 @@ async def _send_channel_message_async(
     if msg_id:
         body["msg_id"] = msg_id
     await _api_request_async(
+        session,
         access_token,
         "POST",
         f"/channels/{channel_id}/messages",
@@ -271,6 +279,7 @@ async def _send_channel_message_async(
 
 
 async def _send_group_message_async(
+    session: aiohttp.ClientSession,
     access_token: str,
     group_openid: str,
     content: str,
@@ -281,6 +290,7 @@ async def _send_group_message_async(
     if msg_id:
         body["msg_id"] = msg_id
     await _api_request_async(
+        session,
         access_token,
         "POST",
         f"/v2/groups/{group_openid}/messages",
@@ -294,6 +304,8 @@ class QQChannel(BaseChannel):
     """
 
     channel = "qq"
+    # QQ takes 5 passive replies per message; keep one for the final parts
+    stream_max_messages = 4
 
     def __init__(
         self,
@@ -320,6 +332,8 @@ class QQChannel(BaseChannel):
         self._consumer_task: Optional[asyncio.Task[None]] = None
         self._ws_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # Pooled keep-alive HTTP session for API calls (start() / stop())
+        self._http = PooledHttpSession(self.channel)
         self._account_id = "default"
 
     @classmethod
@@ -372,6 +386,7 @@ class QQChannel(BaseChannel):
         sender_id = meta.get("sender_id") or to_handle
         channel_id = meta.get("channel_id")
         group_openid = meta.get("group_openid")
+        session = self._http.session()
         if message_type is None:
             if to_handle.startswith("group:"):
                 message_type = "group"
@@ -383,6 +398,7 @@ class QQChannel(BaseChannel):
                 message_type = "c2c"
         try:
             token = await _get_access_token_async(
+                session,
                 self.app_id,
                 self.client_secret,
             )
@@ -392,6 +408,7 @@ class QQChannel(BaseChannel):
         try:
             if message_type == "c2c":
                 await _send_c2c_message_async(
+                    session,
                     token,
                     sender_id,
                     text.strip(),
@@ -399,6 +416,7 @@ class QQChannel(BaseChannel):
                 )
             elif message_type == "group" and group_openid:
                 await _send_group_message_async(
+                    session,
                     token,
                     group_openid,
                     text.strip(),
@@ -406,6 +424,7 @@ class QQChannel(BaseChannel):
                 )
             elif channel_id:
                 await _send_channel_message_async(
+                    session,
                     token,
                     channel_id,
                     text.strip(),
@@ -413,6 +432,7 @@ class QQChannel(BaseChannel):
                 )
             else:
                 await _send_c2c_message_async(
+                    session,
                     token,
                     sender_id,
                     text.strip(),
@@ -421,19 +441,46 @@ class QQChannel(BaseChannel):
         except Exception:
             logger.exception("send failed")
 
+    def _emit_incoming_threadsafe(self, msg: Incoming) -> None:
+        """Queue *msg* from the websocket thread. If it cannot be queued,
+        its id is forgotten, so a redelivery after a resume is handled."""
+        msg_id = (msg.meta or {}).get("message_id")
+        if not (self._loop and self._queue):
+            self._forget_inbound(msg_id)
+            return
+        queue = self._queue
+
+        def _put() -> None:
+            try:
+                queue.put_nowait(msg)
+            except asyncio.QueueFull:
+                logger.warning("qq queue full, dropped message %s", msg_id)
+                self._forget_inbound(msg_id)
+
+        try:
+            self._loop.call_soon_threadsafe(_put)
+        except RuntimeError:
+            # Event loop closed
+            self._forget_inbound(msg_id)
+
     async def _consume_loop(self) -> None:
         assert self._queue is not None
-        while True:
-            msg = await self._queue.get()
-            try:
-                request = self.to_agent_request(msg)
-                last_response = None
-                accumulated_parts: List[OutgoingContentPart] = []
-                event_count = 0
-                send_meta = {**(msg.meta or {}), "bot_prefix": self.bot_prefix}
+        await self._dispatch_loop(self._queue, self._consume_one)
 
+    async def _consume_one(self, msg: Incoming) -> None:
+        try:
+            request = self.to_agent_request(msg)
+            last_response = None
+            accumulated_parts: List[OutgoingContentPart] = []
+            event_count = 0
+            send_meta = {**(msg.meta or {}), "bot_prefix": self.bot_prefix}
+            stream = self._reply_stream(msg.sender, send_meta)
+
+            try:
                 async for event in self._process(request):
                     event_count += 1
+                    if stream is not None:
+                        await stream.feed(event)
                     obj = getattr(event, "object", None)
                     status = getattr(event, "status", None)
                     ev_type = getattr(event, "type", None)
@@ -446,6 +493,8 @@ class QQChannel(BaseChannel):
                     )
                     if obj == "message" and status == RunStatus.Completed:
                         parts = self._message_to_content_parts(event)
+                        if stream is not None:
+                            parts = await stream.finish(event, parts)
                         logger.info(
                             "qq completed message: type=%s parts_count=%s",
                             ev_type,
@@ -454,60 +503,63 @@ class QQChannel(BaseChannel):
                         accumulated_parts.extend(parts)
                     elif obj == "response":
                         last_response = event
-
-                if last_response and getattr(last_response, "error", None):
-                    err = getattr(
-                        last_response.error,
-                        "message",
-                        str(last_response.error),
-                    )
-                    err_text = self.bot_prefix + f"Error: {err}"
-                    await self.send_content_parts(
-                        msg.sender,
-                        [{"type": "text", "text": err_text}],
-                        send_meta,
-                    )
-                elif accumulated_parts:
-                    await self.send_content_parts(
-                        msg.sender,
-                        accumulated_parts,
-                        send_meta,
-                    )
-                elif last_response is None:
-                    await self.send_content_parts(
-                        msg.sender,
-                        [
-                            {
-                                "type": "text",
-                                "text": self.bot_prefix
-                                + "An error occurred while processing your "
-                                "request.",
-                            },
-                        ],
-                        send_meta,
-                    )
-                if self._on_reply_sent:
-                    self._on_reply_sent(
-                        self.channel,
-                        request.user_id or msg.sender,
-                        request.session_id or f"{self.channel}:{msg.sender}",
-                    )
+            finally:
+                if stream is not None:
+                    await stream.close()
+
+            if last_response and getattr(last_response, "error", None):
+                err = getattr(
+                    last_response.error,
+                    "message",
+                    str(last_response.error),
+                )
+                err_text = self.bot_prefix + f"Error: {err}"
+                await self.send_content_parts(
+                    msg.sender,
+                    [{"type": "text", "text": err_text}],
+                    send_meta,
+                )
+            elif accumulated_parts:
+                await self.send_content_parts(
+                    msg.sender,
+                    accumulated_parts,
+                    send_meta,
+                )
+            elif last_response is None:
+                await self.send_content_parts(
+                    msg.sender,
+                    [
+                        {
+                            "type": "text",
+                            "text": self.bot_prefix
+                            + "An error occurred while processing your "
+                            "request.",
+                        },
+                    ],
+                    send_meta,
+                )
+            if self._on_reply_sent:
+                self._on_reply_sent(
+                    self.channel,
+                    request.user_id or msg.sender,
+                    request.session_id or f"{self.channel}:{msg.sender}",
+                )
+        except Exception:
+            logger.exception("qq process/reply failed")
+            try:
+                await self.send_content_parts(
+                    msg.sender,
+                    [
+                        {
+                            "type": "text",
+                            "text": "An error occurred while processing "
+                            "your request.",
+                        },
+                    ],
+                    msg.meta or {},
+                )
             except Exception:
-                logger.exception("qq process/reply failed")
-                try:
-                    await self.send_content_parts(
-                        msg.sender,
-                        [
-                            {
-                                "type": "text",
-                                "text": "An error occurred while processing "
-                                "your request.",
-                            },
-                        ],
-                        msg.meta or {},
-                    )
-                except Exception:
-                    logger.exception("send error message failed")
+                logger.exception("send error message failed")
 
     def _run_ws_forever(self) -> None:
         try:
@@ -660,6 +712,8 @@ class QQChannel(BaseChannel):
                             if not sender:
                                 continue
                             msg_id = (d or {}).get("id", "")
+                            if self._is_duplicate(msg_id):
+                                continue
                             # ts = (d or {}).get("timestamp", "")
                             att = (d or {}).get("attachments") or []
                             incoming = Incoming(
@@ -674,11 +728,7 @@ class QQChannel(BaseChannel):
                                     "attachments": att,
                                 },
                             )
-                            if self._loop and self._queue:
-                                self._loop.call_soon_threadsafe(
-                                    self._queue.put_nowait,
-                                    incoming,
-                                )
+                            self._emit_incoming_threadsafe(incoming)
                             logger.info(
                                 "qq recv c2c from=%s text=%r",
                                 sender,
@@ -703,6 +753,8 @@ class QQChannel(BaseChannel):
                             channel_id = (d or {}).get("channel_id", "")
                             guild_id = (d or {}).get("guild_id", "")
                             msg_id = (d or {}).get("id", "")
+                            if self._is_duplicate(msg_id):
+                                continue
                             # ts = (d or {}).get("timestamp", "")
                             att = (d or {}).get("attachments") or []
                             incoming = Incoming(
@@ -719,11 +771,7 @@ class QQChannel(BaseChannel):
                                     "attachments": att,
                                 },
                             )
-                            if self._loop and self._queue:
-                                self._loop.call_soon_threadsafe(
-                                    self._queue.put_nowait,
-                                    incoming,
-                                )
+                            self._emit_incoming_threadsafe(incoming)
                             logger.info(
                                 "qq recv guild from=%s channel=%s text=%r",
                                 sender,
@@ -749,6 +797,8 @@ class QQChannel(BaseChannel):
                             channel_id = (d or {}).get("channel_id", "")
                             guild_id = (d or {}).get("guild_id", "")
                             msg_id = (d or {}).get("id", "")
+                            if self._is_duplicate(msg_id):
+                                continue
                             att = (d or {}).get("attachments") or []
                             incoming = Incoming(
                                 channel="qq",
@@ -764,11 +814,7 @@ class QQChannel(BaseChannel):
                                     "attachments": att,
                                 },
                             )
-                            if self._loop and self._queue:
-                                self._loop.call_soon_threadsafe(
-                                    self._queue.put_nowait,
-                                    incoming,
-                                )
+                            self._emit_incoming_threadsafe(incoming)
                             logger.info(
                                 "qq recv dm from=%s text=%r",
                                 sender,
@@ -792,6 +838,8 @@ class QQChannel(BaseChannel):
                                 continue
                             group_openid = (d or {}).get("group_openid", "")
                             msg_id = (d or {}).get("id", "")
+                            if self._is_duplicate(msg_id):
+                                continue
                             att = (d or {}).get("attachments") or []
                             incoming = Incoming(
                                 channel="qq",
@@ -806,11 +854,7 @@ class QQChannel(BaseChannel):
                                     "attachments": att,
                                 },
                             )
-                            if self._loop and self._queue:
-                                self._loop.call_soon_threadsafe(
-                                    self._queue.put_nowait,
-                                    incoming,
-                                )
+                            self._emit_incoming_threadsafe(incoming)
                             logger.info(
                                 "qq recv group from=%s group=%s text=%r",
                                 sender,
@@ -897,6 +941,7 @@ class QQChannel(BaseChannel):
                 "channel is enabled.",
             )
         self._loop = asyncio.get_running_loop()
+        self._http.session()
         self._queue = asyncio.Queue(maxsize=1000)
         self._consumer_task = asyncio.create_task(
             self._consume_loop(),
@@ -923,3 +968,4 @@ class QQChannel(BaseChannel):
                 pass
             except Exception:
                 pass
+        await self._http.close()
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""Send a reply's text to a channel while the model generates it.
+
+Channels normally send a message once it is completed, so the user sees
+nothing until the whole text (or the whole ReAct turn, for channels that
+collect all parts) is done. With ``stream_replies`` enabled, the text
+deltas of assistant messages are forwarded as they arrive:
+
+- Channels that can edit a sent message (``supports_message_edit``)
+  post the first text right away and then edit the message with the
+  text so far, at most every CHANNEL_STREAM_EDIT_INTERVAL seconds, and
+  once more with the final text. Text beyond ``stream_max_chars``
+  continues in a new message.
+- Other channels send the text in chunks cut at sentence ends: the first
+  sentence as soon as it is complete, then about
+  CHANNEL_STREAM_CHUNK_CHARS characters at a time. Code blocks are never
+  split.
+
+Tool calls, tool results and media are still sent when their message is
+completed, as without streaming.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+from agentscope_runtime.engine.schemas.agent_schemas import (
+    MessageType,
+    RunStatus,
+)
+
+from ...constant import (
+    CHANNEL_STREAM_CHUNK_CHARS,
+    CHANNEL_STREAM_EDIT_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from .base import BaseChannel
+
+logger = logging.getLogger(__name__)
+
+# Sends one chunk of reply text
+SendText = Callable[[str], Awaitable[None]]
+
+# Appended to a message that is still being written
+_CURSOR = " ▍"
+# Code fences and sentence ends (ASCII ones only before whitespace)
+_BOUNDARY = re.compile(r"```|[。！？；…]+|[.!?;:]+(?=\s)|\n")
+
+
+def _last_boundary(text: str, in_fence: bool) -> int:
+    """End of the last sentence of *text* outside a code block, or 0."""
+    cut = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.group() == "```":
+            in_fence = not in_fence
+        elif not in_fence:
+            cut = match.end()
+    return cut
+
+
+def _toggles_fence(text: str) -> bool:
+    return text.count("```") % 2 == 1
+
+
+class ReplyStream:
+    """Streams the assistant text of one request (see module docstring).
+
+    Feed every event of the run to :meth:`feed`, pass completed messages
+    through :meth:`finish` before sending them, and call :meth:`close`
+    when the run ends.
+
+    Args:
+        channel: Channel the reply is sent to
+        to_handle: Recipient, as for ``channel.send``
+        meta: Send metadata (``bot_prefix`` is honored)
+        send_text: Sends one chunk of text; defaults to the channel's
+            ``send_content_parts``. Passing it disables message edits.
+        edit_interval: Min seconds between edits of a message
+        chunk_chars: Characters sent at once without edits
+    """
+
+    def __init__(
+        self,
+        channel: "BaseChannel",
+        to_handle: str,
+        meta: Optional[Dict[str, Any]] = None,
+        send_text: Optional[SendText] = None,
+        edit_interval: float = CHANNEL_STREAM_EDIT_INTERVAL,
+        chunk_chars: int = CHANNEL_STREAM_CHUNK_CHARS,
+    ):
+        self._channel = channel
+        self._to_handle = to_handle
+        self._meta = meta or {}
+        self._send_text = send_text or self._send_parts
+        self._edit = send_text is None and channel.supports_message_edit
+        self._edit_interval = edit_interval
+        self._chunk_chars = max(1, chunk_chars)
+        self._prefix = self._meta.get("bot_prefix", "") or ""
+
+        # Assistant text messages in progress / that got text deltas
+        self._text_msgs: Set[str] = set()
+        self._streamed: Set[str] = set()
+        self._msg_id: Optional[str] = None
+        # Edit mode: text of the current platform message and its handle
+        self._text = ""
+        self._handle: Any = None
+        self._last_edit = 0.0
+        self._edits = 0
+        # Chunk mode: text not sent yet
+        self._pending = ""
+        self._in_fence = False
+
+        self._started = time.monotonic()
+        self._first_send: Optional[float] = None
+        self._messages = 0
+        self._total_edits = 0
+
+    async def _send_parts(self, text: str) -> None:
+        await self._channel.send_content_parts(
+            self._to_handle,
+            [{"type": "text", "text": text}],
+            self._meta,
+        )
+
+    def _sent(self) -> None:
+        self._messages += 1
+        if self._first_send is None:
+            self._first_send = time.monotonic()
+
+    # ---- events ----
+
+    async def feed(self, event: Any) -> None:
+        """Forward *event* if it is a text delta of an assistant message."""
+        obj = getattr(event, "object", None)
+        if obj == "message":
+            if (
+                getattr(event, "status", None) == RunStatus.InProgress
+                and getattr(event, "type", None) == MessageType.MESSAGE
+                and getattr(event, "role", None) == "assistant"
+            ):
+                self._text_msgs.add(event.id)
+            return
+        if obj != "content" or not getattr(event, "delta", False):
+            return
+        msg_id = getattr(event, "msg_id", None)
+        text = getattr(event, "text", None)
+        if msg_id not in self._text_msgs or not text:
+            return
+        if msg_id != self._msg_id:
+            await self._end_message()
+            self._msg_id = msg_id
+        self._streamed.add(msg_id)
+        if self._edit:
+            self._text += text
+            await self._update(final=False)
+        else:
+            self._pending += text
+            await self._flush(final=False)
+
+    async def finish(
+        self,
+        event: Any,
+        parts: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Return the *parts* of completed message *event* left to send.
+
+        For a streamed message the rest of its text is sent now and only
+        its non-text parts are returned.
+        """
+        msg_id = getattr(event, "id", None)
+        self._text_msgs.discard(msg_id)
+        if msg_id not in self._streamed:
+            return parts
+        self._streamed.discard(msg_id)
+        if msg_id == self._msg_id:
+            await self._end_message()
+        return [p for p in parts if p.get("type") not in ("text", "refusal")]
+
+    async def close(self) -> None:
+        """Send what is left (e.g. after the run failed mid-message)."""
+        await self._end_message()
+        if self._first_send is not None:
+            logger.info(
+                "%s streamed reply: first text after %.0f ms, "
+                "%d message(s), %d edit(s)",
+                self._channel.channel,
+                (self._first_send - self._started) * 1000,
+                self._messages,
+                self._total_edits,
+            )
+
+    async def _end_message(self) -> None:
+        if self._msg_id is None:
+            return
+        # Cleared first so a failed send is not retried by close()
+        self._msg_id = None
+        if self._edit:
+            await self._update(final=True)
+        else:
+            await self._flush(final=True)
+
+    # ---- edit mode ----
+
+    async def _update(self, final: bool) -> None:
+        limit = max(1, self._channel.stream_max_chars - len(self._prefix))
+        # Text beyond one message: finish it and continue in a new one
+        while len(self._text) > limit:
+            cut = _last_boundary(self._text[:limit], False)
+            if not cut:
+                space = self._text.rfind(" ", 0, limit)
+                cut = space + 1 if space > 0 else limit
+            rest = self._text[cut:].lstrip()
+            self._text = self._text[:cut]
+            await self._write(final=True)
+            self._text, self._handle, self._edits = rest, None, 0
+            if not self._edit:
+                # Editing failed: the rest goes out in chunks
+                self._pending, self._text = rest, ""
+                await self._flush(final=final)
+                return
+        if not self._text.strip():
+            return
+        if final:
+            await self._write(final=True)
+            self._text, self._handle, self._edits = "", None, 0
+            return
+        max_edits = self._channel.stream_max_edits
+        due = time.monotonic() - self._last_edit >= self._edit_interval
+        # Keep the last allowed edit for the final text
+        if self._handle is None or (
+            due and (max_edits is None or self._edits < max_edits - 1)
+        ):
+            await self._write(final=False)
+
+    async def _write(self, final: bool) -> None:
+        """Post or edit the current message with the text so far."""
+        body = self._prefix + self._text + ("" if final else _CURSOR)
+        self._last_edit = time.monotonic()
+        if self._handle is None:
+            self._handle = await self._channel.stream_begin(
+                self._to_handle,
+                body,
+                self._meta,
+            )
+            if self._handle is None:
+                # The platform cannot take edits: send in chunks instead
+                self._edit = False
+                self._pending, self._text = self._text, ""
+                await self._flush(final=final)
+                return
+            self._sent()
+            return
+        ok = await self._channel.stream_update(self._handle, body, self._meta)
+        if ok:
+            self._edits += 1
+            self._total_edits += 1
+        elif final:
+            # The final text must arrive: send it as a new message
+            logger.warning(
+                "%s: editing a streamed message failed; resending",
+                self._channel.channel,
+            )
+            await self._send_text(self._text)
+            self._sent()
+
+    # ---- chunk mode ----
+
+    async def _flush(self, final: bool) -> None:
+        if final:
+            cut = len(self._pending)
+        else:
+            max_messages = self._channel.stream_max_messages
+            if max_messages is not None and self._messages >= max(
+                1,
+                max_messages - 1,
+            ):
+                # Keep the last allowed message for the rest
+                return
+            cut = _last_boundary(self._pending, self._in_fence)
+            if self._messages and cut < self._chunk_chars:
+                cut = 0
+            if not cut and len(self._pending) >= 2 * self._chunk_chars:
+                # No sentence end in sight: cut at a space
+                cut = self._space_cut()
+        if not cut:
+            return
+        chunk, self._pending = self._pending[:cut], self._pending[cut:]
+        if _toggles_fence(chunk):
+            self._in_fence = not self._in_fence
+        if chunk.strip():
+            await self._send_text(chunk.strip())
+            self._sent()
+
+    def _space_cut(self) -> int:
+        """Last cut after a space within the first chunk that is outside
+        a code block, or 0."""
+        space = self._pending.rfind(" ", 0, self._chunk_chars)
+        cut = space + 1 if space > 0 else self._chunk_chars
+        while cut and self._in_fence != _toggles_fence(
+            self._pending[:cut],
+        ):
+            space = self._pending.rfind(" ", 0, cut - 1)
+            cut = space + 1 if space > 0 else 0
+        return cut
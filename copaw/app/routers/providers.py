@@ -8,6 +8,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Body, HTTPException, Path
 from pydantic import BaseModel, Field
 
+from ...agents.model_clients import get_model_clients
 from ...providers import (
     ActiveModelsInfo,
     ProviderDefinition,
@@ -199,3 +200,19 @@ async def set_active_model(
     return ActiveModelsInfo(
         active_llm=data.active_llm,
     )
+
+
+# ---------------------------------------------------------------------------
+# Endpoints — client metrics
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/clients/stats",
+    response_model=dict,
+    summary="LLM client pool metrics",
+    description="Cached model clients and HTTP connection reuse counters.",
+)
+async def get_client_stats() -> dict:
+    """Return the shared model client registry's counters."""
+    return get_model_clients().stats()
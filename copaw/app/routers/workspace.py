@@ -14,6 +14,7 @@ from fastapi import APIRouter, HTTPException, UploadFile, File
 from fastapi.responses import StreamingResponse
 
 from ...constant import WORKING_DIR
+from ...utils.walk import walk
 
 router = APIRouter(prefix="/workspace", tags=["workspace"])
 
@@ -33,17 +34,24 @@ def _dir_stats(root: Path) -> tuple[int, int]:
 def _zip_directory(root: Path) -> io.BytesIO:
     """Create an in-memory zip archive of *root* and return the buffer.
 
-    All files **and** directories (including empty ones) are included.
+    All files **and** directories (including empty ones) are included,
+    except paths excluded by ``.copawignore`` files.
     """
     buf = io.BytesIO()
     with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for entry in sorted(root.rglob("*")):
-            arcname = entry.relative_to(root).as_posix()
-            if entry.is_file():
-                zf.write(entry, arcname)
-            elif entry.is_dir():
+        # The archive is a restorable backup: only explicit .copawignore
+        # rules apply, no default excludes and no .gitignore
+        for entry in walk(
+            root,
+            include_dirs=True,
+            ignore_files=(".copawignore",),
+            excluded_dirs=(),
+        ):
+            if entry.is_dir:
                 # Zip spec: directory entries end with '/'
-                zf.write(entry, arcname + "/")
+                zf.write(entry.path, entry.rel_path + "/")
+            elif entry.path.is_file():
+                zf.write(entry.path, entry.rel_path)
     buf.seek(0)
     return buf
 
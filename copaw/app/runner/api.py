@@ -1,15 +1,13 @@
 # -*- coding: utf-8 -*-
 """Chat management API."""
 from __future__ import annotations
-import json
-
 from typing import Optional
 from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from agentscope.session import JSONSession
 from agentscope.memory import InMemoryMemory
 
 from .manager import ChatManager
+from .session import JournalSession
 from .models import (
     ChatSpec,
     ChatHistory,
@@ -41,14 +39,14 @@ def get_chat_manager(request: Request) -> ChatManager:
     return mgr
 
 
-def get_session(request: Request) -> JSONSession:
+def get_session(request: Request) -> JournalSession:
     """Get the session from app state.
 
     Args:
         request: FastAPI request object
 
     Returns:
-        JSONSession instance
+        JournalSession instance
 
     Raises:
         HTTPException: If session is not initialized
@@ -66,6 +64,12 @@ def get_session(request: Request) -> JSONSession:
 async def list_chats(
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
     channel: Optional[str] = Query(None, description="Filter by channel"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Max number of chats to return",
+    ),
+    offset: int = Query(0, ge=0, description="Number of chats to skip"),
     mgr: ChatManager = Depends(get_chat_manager),
 ):
     """List all chats with optional filters.
@@ -73,9 +77,16 @@ async def list_chats(
     Args:
         user_id: Optional user ID to filter chats
         channel: Optional channel name to filter chats
+        limit: Optional max number of chats to return
+        offset: Number of chats to skip
         mgr: Chat manager dependency
     """
-    return await mgr.list_chats(user_id=user_id, channel=channel)
+    return await mgr.list_chats(
+        user_id=user_id,
+        channel=channel,
+        limit=limit,
+        offset=offset,
+    )
 
 
 @router.post("", response_model=ChatSpec)
@@ -129,14 +140,14 @@ async def get_chat(
     chat_id: str,
     request: Request,
     mgr: ChatManager = Depends(get_chat_manager),
-    session: JSONSession = Depends(get_session),
+    session: JournalSession = Depends(get_session),
 ):
     """Get detailed information about a specific chat by UUID.
 
     Args:
         chat_id: Chat UUID
         mgr: Chat manager dependency
-        session: JSONSession  dependency
+        session: JournalSession dependency
 
     Returns:
         ChatHistory with messages
@@ -151,15 +162,11 @@ async def get_chat(
             detail=f"Chat not found: {chat_id}",
         )
 
-    # pylint: disable=protected-access
-    session_path = session._get_save_path(
-        chat_spec.session_id,
-        chat_spec.user_id,
-    )
-
     try:
-        with open(session_path, "r", encoding="utf-8") as file:
-            state = json.load(file)
+        state = session.get_session_state(
+            chat_spec.session_id,
+            chat_spec.user_id,
+        )
     except Exception:
         state = {}
     memories = state.get("agent", {}).get("memory", {})
@@ -242,7 +249,7 @@ async def delete_chat(
     """Delete a chat by UUID.
 
     Note: This only deletes the chat spec (UUID mapping).
-    JSONSession state is NOT deleted.
+    Session state is NOT deleted.
 
     Args:
         chat_id: Chat UUID
@@ -34,6 +34,8 @@ class ChatManager:
             repo: Chat spec repository for persistence
         """
         self._repo = repo
+        # Serializes writes (and get-or-create); reads go straight to the
+        # repository
         self._lock = asyncio.Lock()
 
     # ----- Read Operations -----
@@ -42,21 +44,26 @@ class ChatManager:
         self,
         user_id: Optional[str] = None,
         channel: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> list[ChatSpec]:
         """List chat specs with optional filters.
 
         Args:
             user_id: Optional user ID filter
             channel: Optional channel filter
+            limit: Optional max number of chats to return
+            offset: Number of matching chats to skip
 
         Returns:
             List of chat specifications
         """
-        async with self._lock:
-            return await self._repo.filter_chats(
-                user_id=user_id,
-                channel=channel,
-            )
+        return await self._repo.filter_chats(
+            user_id=user_id,
+            channel=channel,
+            limit=limit,
+            offset=offset,
+        )
 
     async def get_chat(self, chat_id: str) -> Optional[ChatSpec]:
         """Get chat spec by chat_id (UUID).
@@ -67,8 +74,7 @@ class ChatManager:
         Returns:
             Chat spec or None if not found
         """
-        async with self._lock:
-            return await self._repo.get_chat(chat_id)
+        return await self._repo.get_chat(chat_id)
 
     async def get_or_create_chat(
         self,
@@ -174,9 +180,7 @@ class ChatManager:
         Returns:
             Number of matching chats
         """
-        async with self._lock:
-            chats = await self._repo.filter_chats(
-                user_id=user_id,
-                channel=channel,
-            )
-            return len(chats)
+        return await self._repo.count_chats(
+            user_id=user_id,
+            channel=channel,
+        )
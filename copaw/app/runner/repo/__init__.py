@@ -2,5 +2,11 @@
 """Chat repository implementations."""
 from .base import BaseChatRepository
 from .json_repo import JsonChatRepository
+from .sqlite_repo import SqliteChatRepository, import_chats_json
 
-__all__ = ["BaseChatRepository", "JsonChatRepository"]
+__all__ = [
+    "BaseChatRepository",
+    "JsonChatRepository",
+    "SqliteChatRepository",
+    "import_chats_json",
+]
@@ -85,6 +85,22 @@ class BaseChatRepository(ABC):
             cf.chats.append(spec)
         await self.save(cf)
 
+    async def upsert_chats(self, specs: list[ChatSpec]) -> None:
+        """Insert or update several chat specs with a single save.
+
+        Args:
+            specs: Chat specifications to upsert
+        """
+        cf = await self.load()
+        index = {c.id: i for i, c in enumerate(cf.chats)}
+        for spec in specs:
+            if spec.id in index:
+                cf.chats[index[spec.id]] = spec
+            else:
+                index[spec.id] = len(cf.chats)
+                cf.chats.append(spec)
+        await self.save(cf)
+
     async def delete_chats(self, chat_ids: list[str]) -> bool:
         """Delete a chat spec by chat_id (UUID).
 
@@ -109,12 +125,16 @@ class BaseChatRepository(ABC):
         self,
         user_id: Optional[str] = None,
         channel: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> list[ChatSpec]:
         """Filter chats by user_id and/or channel.
 
         Args:
             user_id: Optional user ID filter
             channel: Optional channel filter
+            limit: Optional max number of chats to return
+            offset: Number of matching chats to skip
 
         Returns:
             Filtered list of chat specs
@@ -128,4 +148,22 @@ class BaseChatRepository(ABC):
         if channel is not None:
             results = [c for c in results if c.channel == channel]
 
-        return results
+        if limit is not None:
+            return results[offset : offset + limit]
+        return results[offset:]
+
+    async def count_chats(
+        self,
+        user_id: Optional[str] = None,
+        channel: Optional[str] = None,
+    ) -> int:
+        """Count chats matching filters.
+
+        Args:
+            user_id: Optional user ID filter
+            channel: Optional channel filter
+
+        Returns:
+            Number of matching chats
+        """
+        return len(await self.filter_chats(user_id=user_id, channel=channel))
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""SQLite-based chat repository."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from .base import BaseChatRepository
+from ..models import ChatSpec, ChatsFile
+from ...channels.schema import DEFAULT_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_chats_session
+    ON chats (session_id, user_id, channel);
+CREATE INDEX IF NOT EXISTS idx_chats_user_channel
+    ON chats (user_id, channel);
+"""
+
+_COLUMNS = (
+    "id, name, session_id, user_id, channel, created_at, updated_at, meta"
+)
+
+_UPSERT_SQL = (
+    f"INSERT INTO chats ({_COLUMNS}) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    "name = excluded.name, "
+    "session_id = excluded.session_id, "
+    "user_id = excluded.user_id, "
+    "channel = excluded.channel, "
+    "created_at = excluded.created_at, "
+    "updated_at = excluded.updated_at, "
+    "meta = excluded.meta"
+)
+
+
+def _to_row(spec: ChatSpec) -> tuple:
+    data = spec.model_dump(mode="json")
+    return (
+        data["id"],
+        data["name"],
+        data["session_id"],
+        data["user_id"],
+        data["channel"],
+        data["created_at"],
+        data["updated_at"],
+        json.dumps(data["meta"], ensure_ascii=False),
+    )
+
+
+def _from_row(row: tuple) -> ChatSpec:
+    return ChatSpec.model_validate(
+        {
+            "id": row[0],
+            "name": row[1],
+            "session_id": row[2],
+            "user_id": row[3],
+            "channel": row[4],
+            "created_at": row[5],
+            "updated_at": row[6],
+            "meta": json.loads(row[7] or "{}"),
+        },
+    )
+
+
+class SqliteChatRepository(BaseChatRepository):
+    """chats.db repository (SQLite, WAL mode).
+
+    Lookups by id and by (session_id, user_id, channel) use indexes and
+    upserts touch one row, so the cost per message does not grow with
+    the number of chats. Listing keeps insertion order and supports
+    pagination.
+
+    Notes:
+    - One connection, used from a worker thread behind a lock so the
+      event loop never blocks on disk I/O.
+    """
+
+    def __init__(self, path: Path | str):
+        """Initialize SQLite chat repository.
+
+        Args:
+            path: Path to chats.db file
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        self._path = path.expanduser()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        """Get the repository file path."""
+        return self._path
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self._path),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn, *args: Any) -> Any:
+        with self._lock:
+            return fn(self._connect(), *args)
+
+    async def _call(self, fn, *args: Any) -> Any:
+        return await asyncio.to_thread(self._run, fn, *args)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---- Bulk operations (BaseChatRepository) ----
+
+    async def load(self) -> ChatsFile:
+        """Load all chat specs.
+
+        Returns:
+            ChatsFile with all chat specs
+        """
+        return ChatsFile(version=1, chats=await self.filter_chats())
+
+    async def save(self, chats_file: ChatsFile) -> None:
+        """Replace all chat specs in one transaction.
+
+        Args:
+            chats_file: ChatsFile to persist
+        """
+
+        def _save(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute("DELETE FROM chats")
+                conn.executemany(
+                    f"INSERT INTO chats ({_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+        await self._call(_save, [_to_row(c) for c in chats_file.chats])
+
+    # ---- Indexed operations ----
+
+    async def get_chat(self, chat_id: str) -> Optional[ChatSpec]:
+        """Get chat spec by chat_id (UUID)."""
+
+        def _get(conn: sqlite3.Connection) -> Optional[tuple]:
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM chats WHERE id = ?",
+                (chat_id,),
+            ).fetchone()
+
+        row = await self._call(_get)
+        return _from_row(row) if row else None
+
+    async def get_chat_by_id(
+        self,
+        session_id: str,
+        user_id: str,
+        channel: str = DEFAULT_CHANNEL,
+    ) -> Optional[ChatSpec]:
+        """Get chat spec by session_id, user_id and channel."""
+
+        def _get(conn: sqlite3.Connection) -> Optional[tuple]:
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM chats "
+                "WHERE session_id = ? AND user_id = ? AND channel = ? "
+                "ORDER BY rowid LIMIT 1",
+                (session_id, user_id, channel),
+            ).fetchone()
+
+        row = await self._call(_get)
+        return _from_row(row) if row else None
+
+    async def upsert_chat(self, spec: ChatSpec) -> None:
+        """Insert or update a chat spec (one row)."""
+
+        def _upsert(conn: sqlite3.Connection, row: tuple) -> None:
+            conn.execute(_UPSERT_SQL, row)
+
+        await self._call(_upsert, _to_row(spec))
+
+    async def upsert_chats(self, specs: list[ChatSpec]) -> None:
+        """Insert or update several chat specs in one transaction."""
+
+        def _upsert_many(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(_UPSERT_SQL, rows)
+
+        await self._call(_upsert_many, [_to_row(s) for s in specs])
+
+    async def delete_chats(self, chat_ids: list[str]) -> bool:
+        """Delete chat specs by chat_id."""
+        if not chat_ids:
+            return False
+
+        def _delete(conn: sqlite3.Connection) -> int:
+            placeholders = ", ".join("?" for _ in chat_ids)
+            cur = conn.execute(
+                f"DELETE FROM chats WHERE id IN ({placeholders})",
+                list(chat_ids),
+            )
+            return cur.rowcount
+
+        return await self._call(_delete) > 0
+
+    @staticmethod
+    def _where(
+        user_id: Optional[str],
+        channel: Optional[str],
+    ) -> tuple[str, list[str]]:
+        clauses: list[str] = []
+        params: list[str] = []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if channel is not None:
+            clauses.append("channel = ?")
+            params.append(channel)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    async def filter_chats(
+        self,
+        user_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[ChatSpec]:
+        """Filter chats by user_id and/or channel, in insertion order."""
+        where, params = self._where(user_id, channel)
+
+        def _filter(conn: sqlite3.Connection) -> list[tuple]:
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM chats{where} "
+                "ORDER BY rowid LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset],
+            ).fetchall()
+
+        return [_from_row(row) for row in await self._call(_filter)]
+
+    async def count_chats(
+        self,
+        user_id: Optional[str] = None,
+        channel: Optional[str] = None,
+    ) -> int:
+        """Count chats matching filters."""
+        where, params = self._where(user_id, channel)
+
+        def _count(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM chats{where}",
+                params,
+            ).fetchone()[0]
+
+        return await self._call(_count)
+
+
+async def import_chats_json(
+    json_path: Path | str,
+    repo: BaseChatRepository,
+) -> int:
+    """Import chat specs from a chats.json file into *repo*.
+
+    Existing chats with the same id are overwritten; others are kept.
+
+    Args:
+        json_path: Path to chats.json
+        repo: Target repository
+
+    Returns:
+        Number of imported chats
+    """
+    from .json_repo import JsonChatRepository
+
+    chats_file = await JsonChatRepository(json_path).load()
+    await repo.upsert_chats(chats_file.chats)
+    logger.info(
+        "Imported %d chat(s) from %s",
+        len(chats_file.chats),
+        json_path,
+    )
+    return len(chats_file.chats)
@@ -9,15 +9,16 @@ from copy import deepcopy
 
 from agentscope.mcp import StdIOStatefulClient
 from agentscope.pipeline import stream_printing_messages
-from agentscope.session import JSONSession
 from agentscope_runtime.engine.runner import Runner
 from agentscope_runtime.engine.schemas.agent_schemas import AgentRequest
 from dotenv import load_dotenv
 
+from .session import JournalSession
 from .utils import build_env_context
 from ..channels.schema import DEFAULT_CHANNEL
 from ...agents.memory import MemoryManager
-from ...agents.react_agent import CoPawAgent
+from ...agents.template import AgentTemplate
+from ...agents.tools.shell_session import shell_session_key
 from ...constant import WORKING_DIR
 
 logger = logging.getLogger(__name__)
@@ -36,6 +37,7 @@ class AgentRunner(Runner):
         self._pending_lock = asyncio.Lock()
 
         self.memory_manager: MemoryManager | None = None
+        self._agent_template: AgentTemplate | None = None
 
     async def add_pending_messages(
         self,
@@ -99,6 +101,27 @@ class AgentRunner(Runner):
         """
         self._chat_manager = chat_manager
 
+    def get_agent_template(self) -> AgentTemplate:
+        """Return the shared agent template, creating it on first use."""
+        if self._agent_template is None:
+            mcp_clients = []
+            if self._tavily_search_client is not None:
+                mcp_clients.append(self._tavily_search_client)
+            self._agent_template = AgentTemplate(
+                mcp_clients=mcp_clients,
+                memory_manager=self.memory_manager,
+            )
+        return self._agent_template
+
+    def invalidate_agent_template(self, *_args) -> None:
+        """Make the next query rebuild the agent template.
+
+        Used as a ConfigWatcher subscriber for providers, prompts, skills
+        and envs changes.
+        """
+        if self._agent_template is not None:
+            self._agent_template.invalidate()
+
     async def query_handler(
         self,
         msgs,
@@ -140,17 +163,13 @@ class AgentRunner(Runner):
             channel=channel,
             working_dir=str(WORKING_DIR),
         )
-        mcp_clients = []
-        if self._tavily_search_client is not None:
-            mcp_clients.append(self._tavily_search_client)
-
-        agent = CoPawAgent(
+        agent = await self.get_agent_template().create_agent(
             env_context=env_context,
-            mcp_clients=mcp_clients,
-            memory_manager=self.memory_manager,
+            session_key=f"{user_id}:{session_id}",
         )
-        await agent.register_mcp_clients()
         agent.set_console_output_enabled(enabled=False)
+        # Persistent shells of execute_shell_command are per session
+        shell_session_key.set(f"{user_id}:{session_id}")
 
         try:
             logger.debug(
@@ -232,7 +251,7 @@ class AgentRunner(Runner):
             )
 
         session_dir = str(WORKING_DIR / "sessions")
-        self.session = JSONSession(save_dir=session_dir)
+        self.session = JournalSession(save_dir=session_dir)
 
         tavily_search_client = StdIOStatefulClient(
             name="tavily_mcp",
@@ -268,6 +287,7 @@ class AgentRunner(Runner):
             except Exception as e:
                 logger.error(f"Error closing MCP client: {e}")
         self._tavily_search_client = None
+        self._agent_template = None
 
         try:
             await self.memory_manager.close()
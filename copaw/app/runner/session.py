@@ -0,0 +1,636 @@
+# -*- coding: utf-8 -*-
+"""Journaled session store: snapshot + append-only record log.
+
+``JSONSession`` rewrites the whole session file on every save, so each
+reply pays O(history) JSON and disk cost. ``JournalSession`` keeps the
+same ``{user_id}_{session_id}`` naming but stores:
+
+- ``<name>.snapshot.json``: full state at some generation
+- ``<name>.journal.jsonl``: one record per line, appended on save
+
+Saves diff the current state against the last persisted view by
+message id, content length and marks (no JSON work for unchanged
+messages) and only append new messages, mark changes and edited
+messages. An edit that keeps a message's content length is only
+persisted by the next snapshot. A new snapshot is written when the
+journal grows too large or the change cannot be expressed as records
+(deleted or reordered messages). Loading replays the journal tail on
+top of the snapshot.
+
+Legacy ``<name>.json`` files written by ``JSONSession`` are migrated
+lazily: the first load of a session converts its file into a snapshot
+and renames it to ``<name>.json.migrated``; sessions never loaded again
+keep their old file.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Optional
+
+from agentscope.module import StateModule
+from agentscope.session import JSONSession
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".snapshot.json"
+JOURNAL_SUFFIX = ".journal.jsonl"
+MIGRATED_SUFFIX = ".migrated"
+
+# Take a new snapshot after this many journal records ...
+DEFAULT_SNAPSHOT_EVERY = 200
+# ... or once the journal is larger than the snapshot and this many bytes.
+DEFAULT_JOURNAL_MIN_BYTES = 256 * 1024
+# Persisted views kept in memory for diffing (one per session)
+DEFAULT_MAX_CACHED_SESSIONS = 64
+
+_Path = tuple[str, ...]
+
+
+def _split_state(
+    state: Any,
+    path: _Path = (),
+    memories: Optional[dict[_Path, list]] = None,
+) -> tuple[Any, dict[_Path, list]]:
+    """Separate memory ``content`` lists from the rest of the state.
+
+    Returns ``(rest, memories)`` where *rest* is the state with every
+    memory content list replaced by ``None`` and *memories* maps the key
+    path of each content list to the list itself.
+    """
+    if memories is None:
+        memories = {}
+    if not isinstance(state, dict):
+        return state, memories
+    rest = {}
+    for key, value in state.items():
+        if key == "content" and isinstance(value, list):
+            memories[path + (key,)] = value
+            rest[key] = None
+        elif isinstance(value, dict):
+            rest[key], _ = _split_state(value, path + (key,), memories)
+        else:
+            rest[key] = value
+    return rest, memories
+
+
+def _join_state(rest: Any, memories: dict[_Path, list]) -> Any:
+    """Inverse of :func:`_split_state` (mutates and returns *rest*)."""
+    for path, content in memories.items():
+        node = rest
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = content
+    return rest
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _copy_json(obj: Any) -> Any:
+    return json.loads(_dumps(obj))
+
+
+def _copy_item(item: Any) -> Any:
+    """Copy what loading a memory item into a ``Msg`` may mutate.
+
+    ``Msg.from_dict`` keeps the content list, its blocks and the metadata
+    of the dict, and memories keep the marks list; those are copied,
+    everything below them is shared (and only ever replaced).
+    """
+    if isinstance(item, (list, tuple)) and len(item) == 2:
+        msg, marks = item
+        return [_copy_item(msg), list(marks)]
+    if not isinstance(item, dict):
+        return item
+    msg = dict(item)
+    content = msg.get("content")
+    if isinstance(content, list):
+        msg["content"] = [
+            dict(block) if isinstance(block, dict) else block
+            for block in content
+        ]
+    if isinstance(msg.get("metadata"), dict):
+        msg["metadata"] = dict(msg["metadata"])
+    return msg
+
+
+def _content_size(value: Any) -> int:
+    """Characters of text in a message content (blocks included)."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_content_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_content_size(v) for v in value)
+    return 0
+
+
+def _item_msg(item: Any) -> Any:
+    if isinstance(item, (list, tuple)) and item:
+        return item[0]
+    return item
+
+
+def _item_id(item: Any) -> Any:
+    """Message id of a memory item (``[msg_dict, marks]`` or legacy dict)."""
+    if isinstance(item, (list, tuple)) and item:
+        item = item[0]
+    if isinstance(item, dict):
+        return item.get("id")
+    return None
+
+
+class _PersistedView:
+    """What is on disk for one session, kept for diffing on save."""
+
+    def __init__(
+        self,
+        generation: int,
+        rest: Any,
+        memories: dict[_Path, list],
+    ):
+        self.generation = generation
+        self.rest = rest
+        self.memories = memories
+        self.records = 0
+        self.snapshot_bytes = 0
+        self.journal_bytes = 0
+        # (snapshot stat, journal stat) right after our last write/read
+        self.disk_key: Optional[tuple] = None
+
+
+class JournalSession(JSONSession):
+    """Drop-in replacement for ``JSONSession`` backed by a journal.
+
+    Args:
+        save_dir: Directory holding the session files
+        snapshot_every: Journal records before a new snapshot is taken
+        journal_min_bytes: Journal size that, once also larger than the
+            snapshot, triggers a new snapshot
+        max_cached_sessions: Persisted views kept in memory
+    """
+
+    def __init__(
+        self,
+        save_dir: str = "./",
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        journal_min_bytes: int = DEFAULT_JOURNAL_MIN_BYTES,
+        max_cached_sessions: int = DEFAULT_MAX_CACHED_SESSIONS,
+    ) -> None:
+        super().__init__(save_dir=save_dir)
+        self._snapshot_every = snapshot_every
+        self._journal_min_bytes = journal_min_bytes
+        self._max_cached = max_cached_sessions
+        self._views: OrderedDict[str, _PersistedView] = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Paths
+
+    def _get_base_path(self, session_id: str, user_id: str) -> str:
+        """Session path without the ``.json`` suffix."""
+        legacy = self._get_save_path(session_id, user_id=user_id)
+        return legacy[: -len(".json")]
+
+    def _paths(self, session_id: str, user_id: str) -> tuple[str, str, str]:
+        """Return ``(legacy_json, snapshot, journal)`` paths."""
+        base = self._get_base_path(session_id, user_id)
+        return base + ".json", base + SNAPSHOT_SUFFIX, base + JOURNAL_SUFFIX
+
+    @staticmethod
+    def _disk_key(snapshot_path: str, journal_path: str) -> tuple:
+        keys = []
+        for path in (snapshot_path, journal_path):
+            try:
+                st = os.stat(path)
+                keys.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                keys.append(None)
+        return tuple(keys)
+
+    # ------------------------------------------------------------------
+    # View cache
+
+    def _get_view(self, key: str) -> Optional[_PersistedView]:
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+        return view
+
+    def _put_view(self, key: str, view: _PersistedView) -> None:
+        self._views[key] = view
+        self._views.move_to_end(key)
+        while len(self._views) > self._max_cached:
+            self._views.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Disk format
+
+    def _write_snapshot(
+        self,
+        snapshot_path: str,
+        journal_path: str,
+        generation: int,
+        states: dict,
+    ) -> int:
+        """Atomically write a snapshot and drop the old journal.
+
+        Journal records carry the generation they apply to, so a crash
+        between replacing the snapshot and removing the journal only
+        leaves stale records that are ignored on load.
+        """
+        payload = _dumps({"generation": generation, "state": states})
+        tmp_path = snapshot_path + ".tmp"
+        with open(
+            tmp_path,
+            "w",
+            encoding="utf-8",
+            errors="surrogatepass",
+        ) as file:
+            file.write(payload)
+        os.replace(tmp_path, snapshot_path)
+        try:
+            os.remove(journal_path)
+        except FileNotFoundError:
+            pass
+        return len(payload)
+
+    def _append_records(self, journal_path: str, lines: list[str]) -> int:
+        data = "".join(line + "\n" for line in lines)
+        with open(
+            journal_path,
+            "a",
+            encoding="utf-8",
+            errors="surrogatepass",
+        ) as file:
+            file.write(data)
+        return len(data)
+
+    def _migrate_legacy(
+        self,
+        legacy_path: str,
+        snapshot_path: str,
+        journal_path: str,
+    ) -> None:
+        """Convert a ``JSONSession`` file into a snapshot."""
+        with open(
+            legacy_path,
+            "r",
+            encoding="utf-8",
+            errors="surrogatepass",
+        ) as file:
+            states = json.load(file)
+        self._write_snapshot(snapshot_path, journal_path, 1, states)
+        os.replace(legacy_path, legacy_path + MIGRATED_SUFFIX)
+        logger.info("Migrated session file %s to journal format", legacy_path)
+
+    @staticmethod
+    def _apply_record(
+        record: dict,
+        rest: Any,
+        memories: dict[_Path, list],
+    ) -> Any:
+        """Apply one journal record to a split state; return new *rest*."""
+        op = record.get("op")
+        if op == "state":
+            rest = record["rest"]
+            # Content lists present in the new rest start out empty
+            _, paths = _split_state(rest)
+            for path in paths:
+                memories.setdefault(path, [])
+            return rest
+
+        path = tuple(record.get("path", ()))
+        content = memories.setdefault(path, [])
+        if op == "append":
+            content.extend(record["items"])
+        elif op == "update":
+            for index, item in record["items"].items():
+                content[int(index)] = item
+        elif op == "marks":
+            for index, marks in record["marks"].items():
+                content[int(index)][1] = marks
+        else:
+            raise ValueError(f"Unknown session journal op: {op!r}")
+        return rest
+
+    def _read(
+        self,
+        snapshot_path: str,
+        journal_path: str,
+    ) -> Optional[_PersistedView]:
+        """Reconstruct a session from snapshot plus journal tail."""
+        if not os.path.exists(snapshot_path):
+            return None
+        with open(
+            snapshot_path,
+            "r",
+            encoding="utf-8",
+            errors="surrogatepass",
+        ) as file:
+            raw = file.read()
+        snapshot = json.loads(raw)
+        generation = snapshot.get("generation", 0)
+        rest, memories = _split_state(snapshot.get("state", {}))
+        view = _PersistedView(generation, rest, memories)
+        view.snapshot_bytes = len(raw)
+
+        if os.path.exists(journal_path):
+            with open(
+                journal_path,
+                "r",
+                encoding="utf-8",
+                errors="surrogatepass",
+            ) as file:
+                for line_no, line in enumerate(file, start=1):
+                    view.journal_bytes += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn write at the tail (e.g. crash mid-append)
+                        logger.warning(
+                            "Ignoring corrupt session journal record at "
+                            "%s:%d",
+                            journal_path,
+                            line_no,
+                        )
+                        break
+                    if record.get("gen") != generation:
+                        continue
+                    view.rest = self._apply_record(
+                        record,
+                        view.rest,
+                        view.memories,
+                    )
+                    view.records += 1
+
+        view.disk_key = self._disk_key(snapshot_path, journal_path)
+        return view
+
+    # ------------------------------------------------------------------
+    # Public API
+
+    def _load_view(
+        self,
+        session_id: str,
+        user_id: str,
+    ) -> Optional[_PersistedView]:
+        """Return the persisted view of a session.
+
+        The cached view is used while the files are unchanged; otherwise
+        snapshot plus journal are read once and the result is cached.
+        """
+        legacy_path, snapshot_path, journal_path = self._paths(
+            session_id,
+            user_id,
+        )
+        key = self._get_base_path(session_id, user_id)
+        view = self._get_view(key)
+        if view is not None and view.disk_key == self._disk_key(
+            snapshot_path,
+            journal_path,
+        ):
+            return view
+        if not os.path.exists(snapshot_path) and os.path.exists(legacy_path):
+            self._migrate_legacy(legacy_path, snapshot_path, journal_path)
+        view = self._read(snapshot_path, journal_path)
+        if view is not None:
+            self._put_view(key, view)
+        return view
+
+    def get_session_state(self, session_id: str, user_id: str = "") -> dict:
+        """Return the persisted state dicts of a session (``{}`` if none).
+
+        Loading the result into state modules leaves the cached view
+        untouched: the (small) non-memory state is copied, memory items
+        get a structural copy (see :func:`_copy_item`).
+        """
+        view = self._load_view(session_id, user_id)
+        if view is None:
+            return {}
+        return _join_state(
+            _copy_json(view.rest),
+            {
+                path: [_copy_item(item) for item in items]
+                for path, items in view.memories.items()
+            },
+        )
+
+    async def load_session_state(
+        self,
+        session_id: str,
+        user_id: str = "",
+        allow_not_exist: bool = True,
+        **state_modules_mapping: StateModule,
+    ) -> None:
+        """Load the session state from snapshot plus journal.
+
+        Args:
+            session_id: The session id.
+            user_id: The user ID for the storage.
+            allow_not_exist: Whether to allow the session to not exist.
+            **state_modules_mapping: State modules to be loaded.
+        """
+        _, snapshot_path, _ = self._paths(session_id, user_id)
+        states = self.get_session_state(session_id, user_id)
+        if not states:
+            if not allow_not_exist:
+                raise ValueError(
+                    f"Failed to load session state for {snapshot_path} "
+                    "does not exist.",
+                )
+            logger.info(
+                "Session %s does not exist. Skip loading session state.",
+                snapshot_path,
+            )
+            return
+
+        for name, state_module in state_modules_mapping.items():
+            if name in states:
+                state_module.load_state_dict(states[name])
+        logger.info(
+            "Load session state from %s successfully.",
+            snapshot_path,
+        )
+
+    async def save_session_state(
+        self,
+        session_id: str,
+        user_id: str = "",
+        **state_modules_mapping: StateModule,
+    ) -> None:
+        """Persist the session by appending changes to the journal.
+
+        Args:
+            session_id: The session id.
+            user_id: The user ID for the storage.
+            **state_modules_mapping: State modules to be saved.
+        """
+        _, snapshot_path, journal_path = self._paths(session_id, user_id)
+        key = self._get_base_path(session_id, user_id)
+        states = {
+            name: state_module.state_dict()
+            for name, state_module in state_modules_mapping.items()
+        }
+        rest, memories = _split_state(states)
+
+        view = self._get_view(key)
+        if view is not None and view.disk_key != self._disk_key(
+            snapshot_path,
+            journal_path,
+        ):
+            # Changed behind our back (another process / manual edit)
+            view = None
+
+        lines = None
+        if view is not None:
+            lines = self._diff(view, rest, memories)
+
+        if lines is None or (lines and self._needs_snapshot(view, lines)):
+            generation = (view.generation + 1) if view is not None else 1
+            if view is None and os.path.exists(snapshot_path):
+                try:
+                    with open(snapshot_path, "r", encoding="utf-8") as file:
+                        generation = json.load(file).get("generation", 0) + 1
+                except (OSError, ValueError):
+                    pass
+            size = self._write_snapshot(
+                snapshot_path,
+                journal_path,
+                generation,
+                states,
+            )
+            # Re-parse so the cached view shares nothing with live modules
+            new_rest, new_memories = _split_state(_copy_json(states))
+            view = _PersistedView(generation, new_rest, new_memories)
+            view.snapshot_bytes = size
+            logger.debug(
+                "Session %s snapshot written (gen=%d, %d bytes)",
+                key,
+                generation,
+                size,
+            )
+        elif lines:
+            view.journal_bytes += self._append_records(journal_path, lines)
+            view.records += len(lines)
+            for line in lines:
+                view.rest = self._apply_record(
+                    json.loads(line),
+                    view.rest,
+                    view.memories,
+                )
+
+        view.disk_key = self._disk_key(snapshot_path, journal_path)
+        self._put_view(key, view)
+
+    # ------------------------------------------------------------------
+    # Diffing
+
+    def _needs_snapshot(
+        self,
+        view: Optional[_PersistedView],
+        lines: list[str],
+    ) -> bool:
+        if view is None:
+            return True
+        records = view.records + len(lines)
+        journal_bytes = view.journal_bytes + sum(len(x) + 1 for x in lines)
+        if records >= self._snapshot_every:
+            return True
+        return (
+            journal_bytes >= self._journal_min_bytes
+            and journal_bytes > view.snapshot_bytes
+        )
+
+    @staticmethod
+    def _diff(
+        view: _PersistedView,
+        rest: Any,
+        memories: dict[_Path, list],
+    ) -> Optional[list[str]]:
+        """Compute journal records turning *view* into the given state.
+
+        Returns ``None`` when the change cannot be expressed as records
+        (messages deleted/reordered, memory removed) and a snapshot is
+        required instead.
+        """
+        gen = view.generation
+        lines: list[str] = []
+
+        if set(view.memories) - set(memories):
+            return None
+        if rest != view.rest:
+            lines.append(_dumps({"gen": gen, "op": "state", "rest": rest}))
+
+        for path, content in memories.items():
+            base = view.memories.get(path, [])
+            if len(content) < len(base):
+                return None
+
+            updates: dict[str, Any] = {}
+            marks: dict[str, Any] = {}
+            for index, (old, new) in enumerate(zip(base, content)):
+                if _item_id(old) != _item_id(new):
+                    return None
+                old_msg, new_msg = _item_msg(old), _item_msg(new)
+                if not isinstance(old_msg, dict) or not isinstance(
+                    new_msg,
+                    dict,
+                ):
+                    if old != new:
+                        updates[str(index)] = new
+                    continue
+                if _content_size(old_msg.get("content")) != _content_size(
+                    new_msg.get("content"),
+                ):
+                    updates[str(index)] = new
+                elif (
+                    isinstance(old, list)
+                    and len(old) == 2
+                    and isinstance(new, (list, tuple))
+                    and len(new) == 2
+                ):
+                    if list(old[1]) != list(new[1]):
+                        marks[str(index)] = new[1]
+
+            rec_path = list(path)
+            if updates:
+                lines.append(
+                    _dumps(
+                        {
+                            "gen": gen,
+                            "op": "update",
+                            "path": rec_path,
+                            "items": updates,
+                        },
+                    ),
+                )
+            if marks:
+                lines.append(
+                    _dumps(
+                        {
+                            "gen": gen,
+                            "op": "marks",
+                            "path": rec_path,
+                            "marks": marks,
+                        },
+                    ),
+                )
+            if len(content) > len(base):
+                lines.append(
+                    _dumps(
+                        {
+                            "gen": gen,
+                            "op": "append",
+                            "path": rec_path,
+                            "items": content[len(base) :],
+                        },
+                    ),
+                )
+        return lines
+
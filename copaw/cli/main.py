@@ -76,6 +76,11 @@ from .providers_cmd import models_group  # noqa: E402
 
 _record(".providers_cmd", time.perf_counter() - _t)
 
+_t = time.perf_counter()
+from .search_index_cmd import search_index_group  # noqa: E402
+
+_record(".search_index_cmd", time.perf_counter() - _t)
+
 _t = time.perf_counter()
 from .skills_cmd import skills_group  # noqa: E402
 
@@ -127,6 +132,7 @@ cli.add_command(cron_group)
 cli.add_command(env_group)
 cli.add_command(init_cmd)
 cli.add_command(models_group)
+cli.add_command(search_index_group)
 cli.add_command(skills_group)
 
 
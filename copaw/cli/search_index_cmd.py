@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""CLI commands for the grep_search trigram index."""
+from __future__ import annotations
+
+import click
+
+from .http import print_json
+
+
+@click.group("search-index")
+def search_index_group() -> None:
+    """Manage the trigram index used by grep_search.
+
+    \b
+    Examples:
+      copaw search-index stats      # Show index statistics
+      copaw search-index rebuild    # Re-index WORKING_DIR from scratch
+    """
+
+
+@search_index_group.command("stats")
+def stats_cmd() -> None:
+    """Show index statistics."""
+    from ..agents.tools.search_index import get_search_index
+
+    print_json(get_search_index().stats())
+
+
+@search_index_group.command("rebuild")
+def rebuild_cmd() -> None:
+    """Drop the index and re-index every text file in WORKING_DIR."""
+    from ..agents.tools.file_search import rebuild_search_index
+
+    click.echo("Rebuilding search index ...")
+    print_json(rebuild_search_index())
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Process-wide cache of parsed config.json with coalesced writes.
+
+The parsed ``Config`` is kept in memory and only re-read when the file's
+stat signature (mtime, size, inode) changes, so repeated ``load_config``
+calls cost one ``stat`` instead of a JSON parse plus validation.
+
+Frequent small updates (e.g. ``last_dispatch`` after every reply) are
+queued as mutations, applied to the cached config at once and written
+after a short debounce, in one atomic replace. If the file was edited
+externally in the meantime, it is re-read and the queued mutations are
+re-applied on top before writing.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import Config
+from ..constant import CONFIG_WRITE_DEBOUNCE
+
+logger = logging.getLogger(__name__)
+
+Signature = Optional[Tuple[int, int, int]]
+Mutation = Callable[[Config], None]
+
+
+def _signature(path: Path) -> Signature:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _read_config(path: Path) -> Config:
+    """Parse config.json. Returns default Config if file is missing."""
+    if not path.is_file():
+        return Config()
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    # Backward compat: top-level last_api_host / last_api_port -> last_api
+    if "last_api_host" in data or "last_api_port" in data:
+        la = data.setdefault("last_api", {})
+        if "host" not in la and "last_api_host" in data:
+            la["host"] = data.get("last_api_host")
+        if "port" not in la and "last_api_port" in data:
+            la["port"] = data.get("last_api_port")
+    return Config.model_validate(data)
+
+
+def _write_config(path: Path, config: Config) -> Signature:
+    """Atomically replace *path* with *config*; return the new signature."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(
+                config.model_dump(mode="json", by_alias=True),
+                file,
+                indent=2,
+                ensure_ascii=False,
+            )
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _signature(path)
+
+
+class ConfigCache:
+    """Cached config for one config.json path (see module docstring).
+
+    Args:
+        path: Path to config.json
+        debounce: Seconds to wait before writing queued mutations
+    """
+
+    def __init__(self, path: Path, debounce: float = CONFIG_WRITE_DEBOUNCE):
+        self._path = path
+        self._debounce = debounce
+        self._lock = threading.RLock()
+        self._config: Optional[Config] = None
+        self._signature: Signature = None
+        self._pending: List[Mutation] = []
+        self._timer: Optional[threading.Timer] = None
+        self._hits = 0
+        self._reads = 0
+        self._writes = 0
+
+    def _current(self) -> Config:
+        """Cached config (with queued mutations); re-read if file changed.
+
+        Caller must hold the lock.
+        """
+        signature = _signature(self._path)
+        if self._config is None or signature != self._signature:
+            config = _read_config(self._path)
+            for mutate in self._pending:
+                mutate(config)
+            self._config = config
+            self._signature = signature
+            self._reads += 1
+        else:
+            self._hits += 1
+        return self._config
+
+    def load(self) -> Config:
+        """Return a copy of the current config (safe to modify)."""
+        with self._lock:
+            return self._current().model_copy(deep=True)
+
+    def save(self, config: Config) -> None:
+        """Write *config* now, superseding queued mutations."""
+        with self._lock:
+            self._cancel_timer()
+            self._pending.clear()
+            self._signature = _write_config(self._path, config)
+            self._config = config.model_copy(deep=True)
+            self._writes += 1
+
+    def update(self, mutate: Mutation) -> None:
+        """Apply *mutate* to the cached config and write it debounced."""
+        with self._lock:
+            if self._config is not None:
+                mutate(self._config)
+            self._pending.append(mutate)
+            if self._debounce <= 0:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write queued mutations now (no-op if there are none)."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._cancel_timer()
+        if not self._pending:
+            return
+        try:
+            config = self._current()
+            self._signature = _write_config(self._path, config)
+            self._writes += 1
+        except Exception:
+            logger.exception("Failed to write config to %s", self._path)
+        finally:
+            self._pending.clear()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> Dict[str, int]:
+        """Cache hit / file read / file write counters."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "reads": self._reads,
+                "writes": self._writes,
+                "pending": len(self._pending),
+            }
+
+
+_caches: Dict[Path, ConfigCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_config_cache(path: Path) -> ConfigCache:
+    """Return the process-wide cache for *path*."""
+    key = Path(os.path.abspath(path))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ConfigCache(key)
+        return cache
+
+
+def flush_config_caches() -> None:
+    """Write all queued config mutations (called on shutdown)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.flush()
+
+
+atexit.register(flush_config_caches)
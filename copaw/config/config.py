@@ -3,6 +3,7 @@ from typing import Optional, Union
 from pydantic import BaseModel, Field
 
 from ..constant import (
+    CHANNEL_MAX_CONCURRENCY,
     HEARTBEAT_DEFAULT_EVERY,
     HEARTBEAT_DEFAULT_TARGET,
 )
@@ -13,6 +14,10 @@ class BaseChannelConfig(BaseModel):
 
     enabled: bool = False
     bot_prefix: str = ""
+    # Max messages processed at once (different sessions only)
+    max_concurrency: int = CHANNEL_MAX_CONCURRENCY
+    # Send the reply text while it is generated (see channels/streaming.py)
+    stream_replies: bool = False
 
 
 class IMessageChannelConfig(BaseChannelConfig):
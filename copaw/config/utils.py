@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Optional, Tuple
 
-from ..constant import HEARTBEAT_FILE, JOBS_FILE, CHATS_FILE, WORKING_DIR
+from ..constant import (
+    HEARTBEAT_FILE,
+    JOBS_FILE,
+    CHATS_FILE,
+    CHATS_DB_FILE,
+    WORKING_DIR,
+)
+from .cache import get_config_cache
 from .config import Config, HeartbeatConfig, LastApiConfig, LastDispatchConfig
 
 
@@ -20,35 +26,21 @@ def get_heartbeat_query_path() -> Path:
 
 
 def load_config(config_path: Optional[Path] = None) -> Config:
-    """Load config from file. Returns default Config if file is missing."""
+    """Load config from file. Returns default Config if file is missing.
+
+    Served from the process-wide cache; the file is only parsed again
+    when it changed on disk. The returned object is a private copy.
+    """
     if config_path is None:
         config_path = get_config_path()
-    if not config_path.is_file():
-        return Config()
-    with open(config_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-    # Backward compat: top-level last_api_host / last_api_port -> last_api
-    if "last_api_host" in data or "last_api_port" in data:
-        la = data.setdefault("last_api", {})
-        if "host" not in la and "last_api_host" in data:
-            la["host"] = data.get("last_api_host")
-        if "port" not in la and "last_api_port" in data:
-            la["port"] = data.get("last_api_port")
-    return Config.model_validate(data)
+    return get_config_cache(config_path).load()
 
 
 def save_config(config: Config, config_path: Optional[Path] = None) -> None:
-    """Save the config to the file."""
+    """Save the config to the file (atomic replace)."""
     if config_path is None:
         config_path = get_config_path()
-    config_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(config_path, "w", encoding="utf-8") as file:
-        json.dump(
-            config.model_dump(mode="json", by_alias=True),
-            file,
-            indent=2,
-            ensure_ascii=False,
-        )
+    get_config_cache(config_path).save(config)
 
 
 def get_heartbeat_config() -> HeartbeatConfig:
@@ -59,14 +51,22 @@ def get_heartbeat_config() -> HeartbeatConfig:
 
 
 def update_last_dispatch(channel: str, user_id: str, session_id: str) -> None:
-    """Persist last user-reply dispatch target (user send+reply only)."""
-    config = load_config()
-    config.last_dispatch = LastDispatchConfig(
+    """Persist last user-reply dispatch target (user send+reply only).
+
+    Called after every reply, so the write is coalesced: the cached
+    config is updated at once and config.json is written after a short
+    debounce.
+    """
+    last_dispatch = LastDispatchConfig(
         channel=channel,
         user_id=user_id,
         session_id=session_id,
     )
-    save_config(config)
+
+    def _set_last_dispatch(config: Config) -> None:
+        config.last_dispatch = last_dispatch.model_copy()
+
+    get_config_cache(get_config_path()).update(_set_last_dispatch)
 
 
 def read_last_api() -> Optional[Tuple[str, int]]:
@@ -95,3 +95,8 @@ def get_jobs_path() -> Path:
 def get_chats_path() -> Path:
     """Return chats.json path."""
     return (WORKING_DIR / CHATS_FILE).expanduser()
+
+
+def get_chats_db_path() -> Path:
+    """Return chats.db path."""
+    return (WORKING_DIR / CHATS_DB_FILE).expanduser()
@@ -1,122 +1,461 @@
 # -*- coding: utf-8 -*-
-"""Watch config.json for changes and auto-reload channels."""
+"""Watch CoPaw's on-disk configuration and notify subscribers.
+
+Watched sections:
+
+- ``config.<field>``: a top-level field of config.json changed (e.g.
+  ``config.channels``); changed channels are reloaded automatically
+- ``providers``: providers.json
+- ``envs``: envs.json
+- ``prompts``: AGENTS.md / SOUL.md / PROFILE.md in the working dir
+- ``skills``: the active_skills directory and the skills in it
+
+On Linux, changes are delivered by inotify (no idle wakeups); elsewhere,
+or if inotify is unavailable, the files are polled. Bursts of events
+(an editor saving, a write plus rename) are debounced into one
+notification per section.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import ctypes
+import ctypes.util
+import errno
+import inspect
 import logging
+import os
+import struct
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 
 from .utils import load_config, get_config_path
-from .config import ChannelConfig
+from .config import ChannelConfig, Config
+from ..agents.prompt import PROMPT_FILES
 from ..app.channels import ChannelManager  # pylint: disable=no-name-in-module
-from ..constant import get_available_channels
+from ..constant import (
+    ACTIVE_SKILLS_DIR,
+    CONFIG_WATCHER_BACKEND,
+    get_available_channels,
+)
+from ..envs.store import get_envs_json_path
+from ..providers.store import get_providers_json_path
 
 logger = logging.getLogger(__name__)
 
-# How often to poll (seconds)
+# How often to poll (seconds) when inotify is not available
 DEFAULT_POLL_INTERVAL = 2.0
+# Seconds to collect events before notifying subscribers
+DEFAULT_DEBOUNCE = 0.3
+
+SECTION_CONFIG = "config"
+SECTION_PROVIDERS = "providers"
+SECTION_ENVS = "envs"
+SECTION_PROMPTS = "prompts"
+SECTION_SKILLS = "skills"
+
+Subscriber = Callable[[str], Any]
+
+# inotify(7) constants
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal inotify binding (directory watches only) via ctypes.
+
+    Args:
+        on_event: Called with (directory, entry name, mask) per event;
+            the name is empty for events on the directory itself
+    """
+
+    def __init__(self, on_event: Callable[[Path, str, int], None]):
+        self._on_event = on_event
+        self._libc: Any = None
+        self._fd = -1
+        self._dirs: Dict[int, Path] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def open(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Create the inotify instance; False if not supported."""
+        if not self.available():
+            return False
+        try:
+            libc = ctypes.CDLL(
+                ctypes.util.find_library("c") or None,
+                use_errno=True,
+            )
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+        if fd < 0:
+            logger.warning(
+                "inotify_init1 failed: %s",
+                os.strerror(ctypes.get_errno()),
+            )
+            return False
+        self._libc = libc
+        self._fd = fd
+        self._loop = loop
+        loop.add_reader(fd, self._read)
+        return True
+
+    def add_dir(self, path: Path) -> bool:
+        """Watch *path* (a directory); False if it does not exist."""
+        if self._fd < 0:
+            return False
+        if path in self._dirs.values():
+            return True
+        wd = self._libc.inotify_add_watch(
+            self._fd,
+            os.fsencode(str(path)),
+            _WATCH_MASK,
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err not in (errno.ENOENT, errno.ENOTDIR):
+                logger.warning(
+                    "inotify_add_watch(%s) failed: %s",
+                    path,
+                    os.strerror(err),
+                )
+            return False
+        self._dirs[wd] = path
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            if self._loop is not None:
+                self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+        self._fd = -1
+        self._dirs.clear()
+
+    def _read(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(
+                data,
+                offset,
+            )
+            start = offset + _EVENT_HEADER.size
+            name = os.fsdecode(data[start : start + length].rstrip(b"\0"))
+            offset = start + length
+            if mask & _IN_Q_OVERFLOW:
+                self._on_event(Path(), "", mask)
+                continue
+            directory = self._dirs.get(wd)
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+            if directory is not None:
+                self._on_event(directory, name, mask)
 
 
 class ConfigWatcher:
-    """Poll config.json mtime; reload only changed channels automatically."""
+    """Watch config files; reload changed channels and notify subscribers.
+
+    Args:
+        channel_manager: Channels to reload on ``config.channels`` changes
+        poll_interval: Seconds between polls when inotify is unavailable
+        config_path: Path to config.json
+        debounce: Seconds to collect events before notifying
+        backend: ``"auto"`` (inotify if available), ``"inotify"`` or
+            ``"poll"``
+    """
 
     def __init__(
         self,
         channel_manager: ChannelManager,
         poll_interval: float = DEFAULT_POLL_INTERVAL,
         config_path: Optional[Path] = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        backend: str = CONFIG_WATCHER_BACKEND,
     ):
         self._channel_manager = channel_manager
         self._poll_interval = poll_interval
         self._config_path = config_path or get_config_path()
+        self._debounce = debounce
+        self._backend = backend
         self._task: Optional[asyncio.Task] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._inotify: Optional[_Inotify] = None
+
+        # Watched files: path -> section
+        working_dir = self._config_path.parent
+        self._files: Dict[Path, str] = {
+            self._config_path: SECTION_CONFIG,
+            get_providers_json_path(): SECTION_PROVIDERS,
+            get_envs_json_path(): SECTION_ENVS,
+        }
+        for name in PROMPT_FILES:
+            self._files[working_dir / name] = SECTION_PROMPTS
+        self._skills_dir = ACTIVE_SKILLS_DIR
 
-        # Snapshot of the last known channel config (for diffing)
-        self._last_channels: Optional[ChannelConfig] = None
-        self._last_channels_hash: Optional[int] = None
-        # mtime of config.json at last check
-        self._last_mtime: float = 0.0
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._dirty: Set[str] = set()
+        self._changed = asyncio.Event()
+        self._signatures: Dict[str, Any] = {}
+
+        # Snapshot of the last known config (for diffing)
+        self._last_config: Optional[Config] = None
+
+    @property
+    def backend(self) -> str:
+        """Backend in use: ``"inotify"`` or ``"poll"``."""
+        return "inotify" if self._inotify is not None else "poll"
+
+    def subscribe(
+        self,
+        sections: str | Iterable[str],
+        callback: Subscriber,
+    ) -> None:
+        """Call *callback(section)* when one of *sections* changes.
+
+        Sections are ``providers``, ``envs``, ``prompts``, ``skills``,
+        ``config`` (any field) or ``config.<field>``. The callback may be
+        a coroutine function.
+        """
+        if isinstance(sections, str):
+            sections = (sections,)
+        for section in sections:
+            self._subscribers.setdefault(section, []).append(callback)
 
     async def start(self) -> None:
-        """Take initial snapshot and start the polling task."""
+        """Take initial snapshot and start watching."""
         self._snapshot()
+        loop = asyncio.get_running_loop()
+        if self._backend != "poll":
+            inotify = _Inotify(self._on_inotify_event)
+            if inotify.open(loop):
+                self._inotify = inotify
+                self._add_watches()
+            elif self._backend == "inotify":
+                logger.warning("ConfigWatcher: inotify unavailable, polling")
+        if self._inotify is None:
+            self._signatures = self._poll_signatures()
+            self._poll_task = asyncio.create_task(
+                self._poll_loop(),
+                name="config_watcher_poll",
+            )
         self._task = asyncio.create_task(
-            self._poll_loop(),
+            self._dispatch_loop(),
             name="config_watcher",
         )
         logger.info(
-            "ConfigWatcher started (poll=%.1fs, path=%s)",
-            self._poll_interval,
+            "ConfigWatcher started (backend=%s, path=%s)",
+            self.backend,
             self._config_path,
         )
 
     async def stop(self) -> None:
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
-            self._task = None
+        for task in (self._poll_task, self._task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._poll_task = None
+        self._task = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
         logger.info("ConfigWatcher stopped")
 
     # ------------------------------------------------------------------
 
     def _snapshot(self) -> None:
-        """Load current config and record mtime + channels hash."""
+        """Load current config as the baseline for diffing."""
         try:
-            self._last_mtime = self._config_path.stat().st_mtime
-        except FileNotFoundError:
-            self._last_mtime = 0.0
-        try:
-            config = load_config(self._config_path)
-            self._last_channels = config.channels.model_copy(deep=True)
-            self._last_channels_hash = self._channels_hash(config.channels)
+            self._last_config = load_config(self._config_path)
         except Exception:
             logger.exception("ConfigWatcher: failed to load initial config")
-            self._last_channels = None
-            self._last_channels_hash = None
+            self._last_config = None
+
+    def _mark(self, section: str) -> None:
+        self._dirty.add(section)
+        self._changed.set()
+
+    # ---- inotify backend ----
+
+    def _add_watches(self) -> None:
+        assert self._inotify is not None
+        dirs = {path.parent for path in self._files}
+        dirs.add(self._skills_dir.parent)
+        for directory in dirs:
+            self._inotify.add_dir(directory)
+        self._watch_skills_dir()
+
+    def _watch_skills_dir(self) -> None:
+        assert self._inotify is not None
+        if not self._inotify.add_dir(self._skills_dir):
+            return
+        try:
+            entries = list(os.scandir(self._skills_dir))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir():
+                self._inotify.add_dir(Path(entry.path))
+
+    def _on_inotify_event(self, directory: Path, name: str, mask: int):
+        if mask & _IN_Q_OVERFLOW:
+            # Events were lost: treat everything as changed
+            for section in set(self._files.values()) | {SECTION_SKILLS}:
+                self._mark(section)
+            return
+
+        path = directory / name if name else directory
+        section = self._files.get(path)
+        if section is not None:
+            self._mark(section)
+            return
+
+        if path == self._skills_dir or directory == self._skills_dir:
+            self._mark(SECTION_SKILLS)
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_skills_dir()
+        elif directory.parent == self._skills_dir:
+            self._mark(SECTION_SKILLS)
+
+    # ---- polling backend ----
 
     @staticmethod
-    def _channels_hash(channels: ChannelConfig) -> int:
-        """Fast hash of channels section for quick change detection."""
-        return hash(str(channels.model_dump(mode="json")))
+    def _stat_key(path: Path) -> Any:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _poll_signatures(self) -> Dict[str, Any]:
+        """Return a change signature per section (stat calls only)."""
+        signatures: Dict[str, list] = {}
+        for path, section in self._files.items():
+            signatures.setdefault(section, []).append(self._stat_key(path))
+
+        skills: list = [self._stat_key(self._skills_dir)]
+        try:
+            entries = sorted(
+                e.name for e in os.scandir(self._skills_dir) if e.is_dir()
+            )
+        except OSError:
+            entries = []
+        for name in entries:
+            skill_dir = self._skills_dir / name
+            skills.append((name, self._stat_key(skill_dir / "SKILL.md")))
+        signatures[SECTION_SKILLS] = skills
+        return {section: tuple(keys) for section, keys in signatures.items()}
 
     async def _poll_loop(self) -> None:
         while True:
             try:
                 await asyncio.sleep(self._poll_interval)
-                await self._check()
+                signatures = self._poll_signatures()
+                for section, signature in signatures.items():
+                    if signature != self._signatures.get(section):
+                        self._mark(section)
+                self._signatures = signatures
             except Exception:
                 logger.exception("ConfigWatcher: poll iteration failed")
 
-    async def _check(self) -> None:
-        # 1) Check mtime
-        try:
-            mtime = self._config_path.stat().st_mtime
-        except FileNotFoundError:
-            return
-        if mtime == self._last_mtime:
-            return
-        self._last_mtime = mtime
+    # ---- dispatch ----
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._changed.wait()
+            # Let the burst settle, then handle all sections at once
+            await asyncio.sleep(self._debounce)
+            self._changed.clear()
+            dirty, self._dirty = self._dirty, set()
+            try:
+                await self._handle(dirty)
+            except Exception:
+                logger.exception("ConfigWatcher: change handling failed")
+
+    async def _handle(self, dirty: Set[str]) -> None:
+        sections = sorted(dirty - {SECTION_CONFIG})
+        if SECTION_CONFIG in dirty:
+            sections.extend(await self._check_config())
+        for section in sections:
+            logger.debug("ConfigWatcher: %s changed", section)
+            await self._notify(section)
+
+    async def _notify(self, section: str) -> None:
+        callbacks = list(self._subscribers.get(section, ()))
+        if section.startswith(f"{SECTION_CONFIG}."):
+            callbacks.extend(self._subscribers.get(SECTION_CONFIG, ()))
+        for callback in callbacks:
+            try:
+                result = callback(section)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(
+                    "ConfigWatcher: subscriber for '%s' failed",
+                    section,
+                )
 
-        # 2) Load new config; quick-reject if channels section unchanged
+    async def _check_config(self) -> List[str]:
+        """Reload config.json; reload channels and return changed fields."""
         try:
+            # Served from the config cache if the change was our own write
             config = load_config(self._config_path)
         except Exception:
             logger.exception("ConfigWatcher: failed to parse config.json")
-            return
+            return []
 
-        new_hash = self._channels_hash(config.channels)
-        if new_hash == self._last_channels_hash:
-            return  # Only non-channel fields changed (e.g. last_dispatch)
-
-        # 3) Diff per-channel and reload changed ones
-        new_channels = config.channels
-        old_channels = self._last_channels
+        old = self._last_config
+        changed = [
+            name
+            for name in Config.model_fields
+            if old is None or getattr(old, name) != getattr(config, name)
+        ]
+        if "channels" in changed:
+            await self._reload_channels(
+                config.channels,
+                old.channels if old is not None else None,
+            )
+        self._last_config = config
+        return [f"{SECTION_CONFIG}.{name}" for name in changed]
 
+    async def _reload_channels(
+        self,
+        new_channels: ChannelConfig,
+        old_channels: Optional[ChannelConfig],
+    ) -> None:
+        """Diff per-channel and reload changed ones."""
         for name in get_available_channels():
             new_ch = getattr(new_channels, name, None)
             old_ch = (
@@ -151,7 +490,3 @@ class ConfigWatcher:
                     f"ConfigWatcher: failed to reload channel '{name}'",
                 )
                 setattr(new_channels, name, old_ch if old_ch else new_ch)
-
-        # 4) Update snapshot
-        self._last_channels = new_channels.model_copy(deep=True)
-        self._last_channels_hash = self._channels_hash(new_channels)
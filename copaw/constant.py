@@ -12,13 +12,30 @@ JOBS_FILE = os.environ.get("COPAW_JOBS_FILE", "jobs.json")
 
 CHATS_FILE = os.environ.get("COPAW_CHATS_FILE", "chats.json")
 
+CHATS_DB_FILE = os.environ.get("COPAW_CHATS_DB_FILE", "chats.db")
+
 CONFIG_FILE = os.environ.get("COPAW_CONFIG_FILE", "config.json")
 
+# Seconds to coalesce frequent config.json updates (e.g. last_dispatch)
+CONFIG_WRITE_DEBOUNCE = float(
+    os.environ.get("COPAW_CONFIG_WRITE_DEBOUNCE", "1.0"),
+)
+
 HEARTBEAT_FILE = os.environ.get("COPAW_HEARTBEAT_FILE", "HEARTBEAT.md")
 HEARTBEAT_DEFAULT_EVERY = "30m"
 HEARTBEAT_DEFAULT_TARGET = "main"
 HEARTBEAT_TARGET_LAST = "last"
 
+# Config watcher backend: "auto" (inotify if available), "inotify", "poll"
+CONFIG_WATCHER_BACKEND = os.environ.get("COPAW_CONFIG_WATCHER", "auto")
+
+# System prompt layout: "prefix_cache" puts the static prompt (prompt
+# files, then the skill prompt) first and the per-session env context
+# last, so requests of all sessions share a byte-identical prefix that
+# provider-side prefix/KV caches can reuse; "legacy" puts the env
+# context first.
+PROMPT_LAYOUT = os.environ.get("COPAW_PROMPT_LAYOUT", "prefix_cache")
+
 # Env key for app log level (used by CLI and app load for reload child).
 LOG_LEVEL_ENV = "COPAW_LOG_LEVEL"
 
@@ -39,6 +56,44 @@ CUSTOMIZED_SKILLS_DIR = WORKING_DIR / "customized_skills"
 # Memory directory
 MEMORY_DIR = WORKING_DIR / "memory"
 
+# Shared cache for downloaded user media (content-addressed, LRU bounded)
+MEDIA_CACHE_DIR = WORKING_DIR / "media_cache"
+
+MEDIA_CACHE_MAX_BYTES = int(
+    os.environ.get("COPAW_MEDIA_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)),
+)
+
+MEDIA_DOWNLOAD_CONCURRENCY = int(
+    os.environ.get("COPAW_MEDIA_DOWNLOAD_CONCURRENCY", "4"),
+)
+
+# Trigram index used by grep_search (SQLite)
+SEARCH_INDEX_PATH = WORKING_DIR / "search_index.db"
+
+# Shell tool output: bytes of stdout / stderr (each) kept in the tool
+# result (half head, half tail); the full output of a stream beyond that
+# is written to a file under SHELL_OUTPUT_DIR.
+SHELL_OUTPUT_DIR = WORKING_DIR / "shell_output"
+
+SHELL_OUTPUT_MAX_BYTES = int(
+    os.environ.get("COPAW_SHELL_OUTPUT_MAX_BYTES", str(32 * 1024)),
+)
+
+# Seconds between progress updates of a running shell command
+SHELL_PROGRESS_INTERVAL = float(
+    os.environ.get("COPAW_SHELL_PROGRESS_INTERVAL", "2.0"),
+)
+
+# Persistent shell sessions (execute_shell_command persistent=True):
+# closed after this many idle seconds; at most SHELL_SESSION_MAX kept
+SHELL_SESSION_IDLE_TIMEOUT = float(
+    os.environ.get("COPAW_SHELL_SESSION_IDLE_TIMEOUT", "600"),
+)
+
+SHELL_SESSION_MAX = int(
+    os.environ.get("COPAW_SHELL_SESSION_MAX", "8"),
+)
+
 # Memory compaction configuration
 MEMORY_COMPACT_THRESHOLD = int(
     os.environ.get("COPAW_MEMORY_COMPACT_THRESHOLD", "100000"),
@@ -48,6 +103,118 @@ MEMORY_COMPACT_KEEP_RECENT = int(
     os.environ.get("COPAW_MEMORY_COMPACT_KEEP_RECENT", "5"),
 )
 
+# Background compaction starts at SOFT_RATIO * THRESHOLD tokens; no new
+# background job starts until usage drops below REARM_RATIO * THRESHOLD.
+MEMORY_COMPACT_SOFT_RATIO = float(
+    os.environ.get("COPAW_MEMORY_COMPACT_SOFT_RATIO", "0.8"),
+)
+
+MEMORY_COMPACT_REARM_RATIO = float(
+    os.environ.get("COPAW_MEMORY_COMPACT_REARM_RATIO", "0.5"),
+)
+
+# Max tool calls of one reasoning step an agent runs concurrently
+TOOL_CALL_CONCURRENCY = int(
+    os.environ.get("COPAW_TOOL_CALL_CONCURRENCY", "4"),
+)
+
+# Tool results with more text than this are saved to TOOL_RESULTS_DIR and
+# replaced in memory by a preview of TOOL_RESULT_PREVIEW_CHARS plus the
+# file path. Results older than TOOL_RESULT_COLLAPSE_AFTER reasoning steps
+# are collapsed to a preview as well (0 disables).
+TOOL_RESULTS_DIR = WORKING_DIR / "tool_results"
+
+TOOL_RESULT_OFFLOAD_CHARS = int(
+    os.environ.get("COPAW_TOOL_RESULT_OFFLOAD_CHARS", "16000"),
+)
+
+TOOL_RESULT_PREVIEW_CHARS = int(
+    os.environ.get("COPAW_TOOL_RESULT_PREVIEW_CHARS", "2000"),
+)
+
+TOOL_RESULT_COLLAPSE_AFTER = int(
+    os.environ.get("COPAW_TOOL_RESULT_COLLAPSE_AFTER", "3"),
+)
+
+# Default max messages a channel processes concurrently (across sessions;
+# one session is always processed in order). Per channel: max_concurrency.
+CHANNEL_MAX_CONCURRENCY = int(
+    os.environ.get("COPAW_CHANNEL_MAX_CONCURRENCY", "4"),
+)
+
+# Shared HTTP pools of the LLM clients (one per endpoint, HTTP/2 when the
+# h2 package is installed and COPAW_LLM_HTTP2 is not "false")
+LLM_HTTP_MAX_CONNECTIONS = int(
+    os.environ.get("COPAW_LLM_HTTP_MAX_CONNECTIONS", "100"),
+)
+
+LLM_HTTP_MAX_KEEPALIVE = int(
+    os.environ.get("COPAW_LLM_HTTP_MAX_KEEPALIVE", "20"),
+)
+
+LLM_HTTP_KEEPALIVE_EXPIRY = float(
+    os.environ.get("COPAW_LLM_HTTP_KEEPALIVE_EXPIRY", "120"),
+)
+
+LLM_HTTP_CONNECT_TIMEOUT = float(
+    os.environ.get("COPAW_LLM_HTTP_CONNECT_TIMEOUT", "10"),
+)
+
+LLM_HTTP_TIMEOUT = float(
+    os.environ.get("COPAW_LLM_HTTP_TIMEOUT", "600"),
+)
+
+LLM_HTTP2 = os.environ.get("COPAW_LLM_HTTP2", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Streaming replies (per channel: stream_replies). Channels that can edit
+# a sent message update it at most every CHANNEL_STREAM_EDIT_INTERVAL s;
+# others send the text in chunks of about CHANNEL_STREAM_CHUNK_CHARS,
+# cut at sentence ends (the first sentence is sent as soon as it ends).
+CHANNEL_STREAM_EDIT_INTERVAL = float(
+    os.environ.get("COPAW_CHANNEL_STREAM_EDIT_INTERVAL", "1.0"),
+)
+
+CHANNEL_STREAM_CHUNK_CHARS = int(
+    os.environ.get("COPAW_CHANNEL_STREAM_CHUNK_CHARS", "300"),
+)
+
+# Sender display names looked up by channels (e.g. Feishu Contact API):
+# found names are kept CHANNEL_PROFILE_TTL s, failed lookups (no name or
+# no permission) CHANNEL_PROFILE_NEGATIVE_TTL s. Found names are saved
+# under CHANNEL_PROFILE_CACHE_DIR unless CHANNEL_PROFILE_PERSIST is off.
+CHANNEL_PROFILE_CACHE_DIR = WORKING_DIR / "profile_cache"
+
+CHANNEL_PROFILE_TTL = float(
+    os.environ.get("COPAW_CHANNEL_PROFILE_TTL", str(24 * 3600)),
+)
+
+CHANNEL_PROFILE_NEGATIVE_TTL = float(
+    os.environ.get("COPAW_CHANNEL_PROFILE_NEGATIVE_TTL", "600"),
+)
+
+CHANNEL_PROFILE_PERSIST = os.environ.get(
+    "COPAW_CHANNEL_PROFILE_PERSIST",
+    "true",
+).lower() in ("true", "1", "yes")
+
+# Inbound message ids already received, per channel: redelivered events
+# (reconnects, platform retries) within CHANNEL_DEDUP_TTL seconds are
+# dropped. The ids are stored in CHANNEL_DEDUP_PATH (SQLite), the most
+# recent CHANNEL_DEDUP_MEMORY_MAX of them also in memory.
+CHANNEL_DEDUP_PATH = WORKING_DIR / "inbound_dedup.db"
+
+CHANNEL_DEDUP_TTL = float(
+    os.environ.get("COPAW_CHANNEL_DEDUP_TTL", str(24 * 3600)),
+)
+
+CHANNEL_DEDUP_MEMORY_MAX = int(
+    os.environ.get("COPAW_CHANNEL_DEDUP_MEMORY_MAX", "10000"),
+)
+
 DASHSCOPE_BASE_URL = os.environ.get(
     "DASHSCOPE_BASE_URL",
     "https://dashscope.aliyuncs.com/compatible-mode/v1",
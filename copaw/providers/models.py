@@ -93,6 +93,7 @@ class ActiveModelsInfo(BaseModel):
 class ResolvedModelConfig(BaseModel):
     """Resolved config for a model slot (URL + key + model)."""
 
+    provider_id: str = Field(default="", description="Provider identifier")
     model: str = Field(default="", description="Model identifier")
     base_url: str = Field(default="", description="API base URL")
     api_key: str = Field(default="", description="API key")
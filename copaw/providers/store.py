@@ -4,8 +4,10 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from .models import (
     ModelSlotConfig,
@@ -15,6 +17,8 @@ from .models import (
 )
 from .registry import PROVIDERS
 
+Signature = Optional[Tuple[int, int, int]]
+
 # ---------------------------------------------------------------------------
 # JSON file path
 # ---------------------------------------------------------------------------
@@ -119,21 +123,56 @@ def _ensure_all_providers(
 # Load / Save
 # ---------------------------------------------------------------------------
 
+# path -> (file signature, parsed data); a load costs one stat while the
+# file is unchanged
+_cache: dict[Path, tuple[Signature, ProvidersData]] = {}
+_cache_lock = threading.Lock()
 
-def load_providers_json(
-    path: Optional[Path] = None,
-) -> ProvidersData:
-    """Load providers.json, creating/repairing as needed."""
-    if path is None:
-        path = get_providers_json_path()
 
+def _signature(path: Path) -> Signature:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _dumps(data: ProvidersData) -> str:
+    out: dict = {
+        "providers": {
+            pid: settings.model_dump(mode="json")
+            for pid, settings in data.providers.items()
+        },
+        "active_llm": data.active_llm.model_dump(mode="json"),
+    }
+    return json.dumps(out, indent=2, ensure_ascii=False)
+
+
+def _write_text(path: Path, text: str) -> Signature:
+    """Atomically replace *path* with *text*; return the new signature."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _signature(path)
+
+
+def _read_providers(path: Path) -> tuple[ProvidersData, str]:
+    """Parse and repair *path*; return the data and the file's text."""
     providers: dict[str, ProviderSettings] = {}
     active_llm = ModelSlotConfig()
+    text = ""
 
     if path.is_file():
         try:
             with open(path, "r", encoding="utf-8") as fh:
-                raw: dict = json.load(fh)
+                text = fh.read()
+            raw: dict = json.loads(text)
             if "providers" in raw and isinstance(
                 raw["providers"],
                 dict,
@@ -151,8 +190,39 @@ def load_providers_json(
         providers=providers,
         active_llm=active_llm,
     )
-    save_providers_json(data, path)
-    return data
+    return data, text
+
+
+def _load_cached(path: Path) -> ProvidersData:
+    """Return the shared parsed data of *path*; callers must not modify.
+
+    The file is only rewritten when the repair or migration changed its
+    content.
+    """
+    sig = _signature(path)
+    with _cache_lock:
+        entry = _cache.get(path)
+        if entry is not None and sig is not None and entry[0] == sig:
+            return entry[1]
+
+        data, text = _read_providers(path)
+        repaired = _dumps(data)
+        if repaired != text:
+            sig = _write_text(path, repaired)
+        _cache[path] = (sig, data)
+        return data
+
+
+def load_providers_json(
+    path: Optional[Path] = None,
+) -> ProvidersData:
+    """Load providers.json, creating/repairing as needed.
+
+    Returns a copy of the cached state, free to modify.
+    """
+    if path is None:
+        path = get_providers_json_path()
+    return _load_cached(path).model_copy(deep=True)
 
 
 def save_providers_json(
@@ -162,18 +232,9 @@ def save_providers_json(
     """Write provider settings to providers.json."""
     if path is None:
         path = get_providers_json_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    out: dict = {
-        "providers": {
-            pid: settings.model_dump(mode="json")
-            for pid, settings in data.providers.items()
-        },
-        "active_llm": data.active_llm.model_dump(mode="json"),
-    }
-
-    with open(path, "w", encoding="utf-8") as fh:
-        json.dump(out, fh, indent=2, ensure_ascii=False)
+    sig = _write_text(path, _dumps(data))
+    with _cache_lock:
+        _cache[path] = (sig, data.model_copy(deep=True))
 
 
 # ---------------------------------------------------------------------------
@@ -238,6 +299,7 @@ def _resolve_slot(
     if settings is None:
         return None
     return ResolvedModelConfig(
+        provider_id=slot.provider_id,
         model=slot.model,
         base_url=settings.base_url,
         api_key=settings.api_key,
@@ -246,7 +308,7 @@ def _resolve_slot(
 
 def get_active_llm_config() -> Optional[ResolvedModelConfig]:
     """Return resolved config for the active LLM slot, or ``None``."""
-    data = load_providers_json()
+    data = _load_cached(get_providers_json_path())
     return _resolve_slot(data.active_llm, data)
 
 
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""Lazy directory walker with .gitignore / .copawignore support.
+
+Entries are produced one by one from ``os.scandir`` (depth first, each
+directory's entries sorted by name, which yields the same order as
+``sorted(root.rglob("*"))``), so callers that only need the first N
+results never list or sort the whole tree. Ignored directories are
+pruned before being entered.
+
+Ignore files use the gitignore syntax: ``#`` comments, ``!`` negation,
+a trailing ``/`` for directories only, patterns containing ``/``
+anchored to the ignore file's directory, and ``*``, ``?``, ``[...]``,
+``**`` wildcards. Rules of deeper ignore files take precedence.
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Ignore files read in every visited directory
+DEFAULT_IGNORE_FILES = (".gitignore", ".copawignore")
+
+# Directory names never entered by default
+DEFAULT_EXCLUDED_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "node_modules",
+        "__pycache__",
+        ".venv",
+        "venv",
+        ".tox",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        # Chromium profile caches (browser automation)
+        "Code Cache",
+        "GPUCache",
+        "GrShaderCache",
+        "ShaderCache",
+    },
+)
+
+
+def _translate(pattern: str) -> str:
+    """Translate a path glob (``/``-separated, with ``**``) to a regex."""
+    parts: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                i += 2
+                if at_start and pattern.startswith("/", i):
+                    # "**/": zero or more leading directories
+                    parts.append("(?:.*/)?")
+                    i += 1
+                else:
+                    parts.append(".*")
+                continue
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            # A "]" right after "[" belongs to the set
+            j = pattern.find("]", i + 2)
+            if j < 0:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def split_glob(pattern: str) -> Tuple[int, str]:
+    """Normalize a ``Path.glob``-style pattern.
+
+    ``.`` and empty segments are dropped. Leading ``..`` segments are
+    counted and removed, so the caller can walk from that many parents
+    up.
+
+    Returns:
+        (number of leading ``..`` segments, rest of the pattern)
+
+    Raises:
+        ValueError: if ``..`` follows a name or wildcard segment
+    """
+    ups = 0
+    parts: List[str] = []
+    for part in pattern.split("/"):
+        if part in ("", "."):
+            continue
+        if part == "..":
+            if parts:
+                raise ValueError(
+                    f"'..' is only supported at the start of a glob "
+                    f"pattern: {pattern}",
+                )
+            ups += 1
+            continue
+        parts.append(part)
+    return ups, "/".join(parts)
+
+
+def compile_glob(pattern: str) -> re.Pattern:
+    """Compile a ``Path.glob``-style pattern matched against rel paths.
+
+    *pattern* should be normalized by :func:`split_glob`. As with
+    ``Path.glob``, a trailing ``**`` also matches the directory it
+    starts from.
+    """
+    pattern = pattern.strip("/")
+    if pattern.endswith("/**"):
+        return re.compile(_translate(pattern[:-3]) + r"(?:/.*)?\Z")
+    return re.compile(_translate(pattern) + r"\Z")
+
+
+@dataclass(frozen=True)
+class _Rule:
+    regex: re.Pattern
+    negated: bool
+    dir_only: bool
+
+
+class IgnoreRules:
+    """Rules of one ignore file, relative to the directory holding it."""
+
+    def __init__(self, lines: Iterable[str]):
+        self.rules: List[_Rule] = []
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            if "/" in line:
+                # Anchored to the ignore file's directory
+                regex = _translate(line.lstrip("/"))
+            else:
+                regex = "(?:.*/)?" + _translate(line)
+            self.rules.append(
+                _Rule(re.compile(regex + r"\Z"), negated, dir_only),
+            )
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional["IgnoreRules"]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                rules = cls(f)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included, None if no rule applies.
+
+        Args:
+            rel_path: Path relative to the ignore file's directory
+            is_dir: Whether the path is a directory
+        """
+        result = None
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(rel_path):
+                result = not rule.negated
+        return result
+
+
+@dataclass(frozen=True)
+class WalkEntry:
+    """A file or directory found by :func:`walk`."""
+
+    path: Path
+    rel_path: str
+    is_dir: bool
+
+
+# (rel path of the ignore file's directory, rules)
+_Scope = Tuple[str, IgnoreRules]
+
+
+def _is_ignored(
+    scopes: Sequence[_Scope],
+    rel_path: str,
+    is_dir: bool,
+) -> bool:
+    ignored = False
+    for base, rules in scopes:
+        sub = rel_path[len(base) + 1 :] if base else rel_path
+        decision = rules.match(sub, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+
+def walk(
+    root: Path,
+    *,
+    include_dirs: bool = False,
+    ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES,
+    excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+    max_depth: Optional[int] = None,
+    sort: bool = True,
+) -> Iterator[WalkEntry]:
+    """Lazily yield entries below *root* (see module docstring).
+
+    Symlinked directories are listed but not entered.
+
+    Args:
+        root: Directory to walk
+        include_dirs: Also yield directories (before their contents)
+        ignore_files: Names of ignore files honored in each directory
+        excluded_dirs: Directory names never entered or yielded
+        max_depth: Max path depth yielded (1 = direct children only)
+        sort: Sort each directory's entries by name; gives a stable
+            order; only one directory listing per level is held
+
+    Yields:
+        WalkEntry for every file (and directory if requested) not
+        ignored.
+    """
+    excluded = frozenset(excluded_dirs)
+
+    def _walk_dir(
+        dir_path: str,
+        dir_rel: str,
+        depth: int,
+        scopes: Tuple[_Scope, ...],
+    ) -> Iterator[WalkEntry]:
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return
+        if sort:
+            entries.sort(key=lambda e: e.name)
+        if ignore_files:
+            names = {entry.name for entry in entries}
+            for name in ignore_files:
+                if name not in names:
+                    continue
+                rules = IgnoreRules.from_file(Path(dir_path) / name)
+                if rules is not None:
+                    scopes = scopes + ((dir_rel, rules),)
+
+        for entry in entries:
+            rel = f"{dir_rel}/{entry.name}" if dir_rel else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir and entry.name in excluded:
+                continue
+            if scopes and _is_ignored(scopes, rel, is_dir):
+                continue
+            if not is_dir or include_dirs:
+                yield WalkEntry(Path(entry.path), rel, is_dir)
+            if (
+                is_dir
+                and not entry.is_symlink()
+                and (max_depth is None or depth + 1 < max_depth)
+            ):
+                yield from _walk_dir(entry.path, rel, depth + 1, scopes)
+
+    yield from _walk_dir(str(root), "", 0, ())
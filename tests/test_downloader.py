@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+web = pytest.importorskip("aiohttp.web")
+
+from copaw.agents.downloader import MediaCache  # noqa: E402
+
+_BODY = b"image bytes" * 1000
+_ETAG = '"v1"'
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_get("/img.png", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/img.png"
+
+
+def test_304_for_evicted_content_fetches_again(tmp_path):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == _ETAG:
+            return web.Response(status=304)
+        return web.Response(body=_BODY, headers={"ETag": _ETAG})
+
+    async def run():
+        runner, url = await _serve(handler)
+        cache = MediaCache(cache_dir=tmp_path / "cache")
+        try:
+            first = Path(await cache.download(url))
+            assert await cache.download(url) == str(first)
+            # Content removed while its URL is still indexed
+            shutil.rmtree(first.parent)
+            again = Path(await cache.download(url))
+            assert again.read_bytes() == _BODY
+        finally:
+            await cache.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+    assert requests == [None, _ETAG, _ETAG, None]
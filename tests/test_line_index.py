@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+
+from copaw.agents.tools import line_index
+from copaw.agents.tools.line_index import read_line_range
+
+
+def _write(path, data, mtime_ns):
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.seek(0)
+        f.write(data)
+        f.truncate()
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _lines(n):
+    return b"".join(b"line %05d with some text\n" % i for i in range(n))
+
+
+def test_same_size_rewrite_rebuilds(tmp_path):
+    path = str(tmp_path / "big.txt")
+    data = _lines(30000)
+    _write(path, data, 1_000_000_000)
+    first = read_line_range(path, 20000, 20000, 1024)
+    assert first.total == 30000
+
+    # Same size, same inode: a space early in the file becomes a newline
+    cut = data.index(b" ", 100)
+    _write(path, data[:cut] + b"\n" + data[cut + 1 :], 2_000_000_000)
+    after = read_line_range(path, 20000, 20000, 1024)
+    line_index._cache.clear()
+    fresh = read_line_range(path, 20000, 20000, 1024)
+    assert after.total == fresh.total == 30001
+    assert after.text == fresh.text != first.text
+
+
+def test_append_is_incremental(tmp_path):
+    path = str(tmp_path / "log.txt")
+    _write(path, _lines(1000), 1_000_000_000)
+    assert read_line_range(path, None, None, 1024, tail=1).total == 1000
+    with open(path, "ab") as f:
+        f.write(b"appended\n")
+    result = read_line_range(path, None, None, 1024, tail=1)
+    assert (result.total, result.text) == (1001, "appended\n")
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+pytest.importorskip("agentscope")
+
+from agentscope.tool import Toolkit  # noqa: E402
+
+from copaw.agents.prompt import compute_prefix_fingerprint  # noqa: E402
+from copaw.agents.react_agent import CoPawAgent  # noqa: E402
+
+
+def test_env_context_follows_skill_prompt():
+    toolkit = Toolkit()
+    toolkit.get_agent_skill_prompt = lambda: "SKILLS"
+    agent = CoPawAgent(
+        env_context="ENV",
+        enable_memory_manager=False,
+        toolkit=toolkit,
+        model=object(),
+        formatter=object(),
+        base_sys_prompt="BASE",
+    )
+    assert agent.sys_prompt == "BASE\n\nSKILLS\n\nENV"
+    agent.rebuild_sys_prompt()
+    assert agent._sys_prompt == "BASE"
+
+
+def test_prefix_fingerprint_covers_skill_prompt():
+    assert compute_prefix_fingerprint([], "BASE", "a") != (
+        compute_prefix_fingerprint([], "BASE", "b")
+    )
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agentscope_runtime")
+
+from agentscope_runtime.engine.schemas.agent_schemas import (  # noqa: E402
+    MessageType,
+    RunStatus,
+)
+
+from copaw.app.channels.streaming import ReplyStream  # noqa: E402
+
+
+def _channel():
+    return SimpleNamespace(
+        channel="test",
+        supports_message_edit=False,
+        stream_max_chars=4000,
+        stream_max_edits=None,
+        stream_max_messages=None,
+    )
+
+
+def _stream_chunks(text, step, chunk_chars):
+    sent = []
+
+    async def send_text(chunk):
+        sent.append(chunk)
+
+    async def run():
+        stream = ReplyStream(
+            _channel(),
+            "user",
+            send_text=send_text,
+            chunk_chars=chunk_chars,
+        )
+        await stream.feed(
+            SimpleNamespace(
+                object="message",
+                id="m1",
+                status=RunStatus.InProgress,
+                type=MessageType.MESSAGE,
+                role="assistant",
+            ),
+        )
+        for i in range(0, len(text), step):
+            await stream.feed(
+                SimpleNamespace(
+                    object="content",
+                    delta=True,
+                    msg_id="m1",
+                    text=text[i : i + step],
+                ),
+            )
+        await stream.close()
+
+    asyncio.run(run())
+    return sent
+
+
+def test_chunks_do_not_split_code_blocks():
+    text = "... ```code\nx = 1. y\n``` More text follows here;"
+    sent = _stream_chunks(text, step=7, chunk_chars=20)
+    assert "".join(sent).replace(" ", "").replace("\n", "") == (
+        text.replace(" ", "").replace("\n", "")
+    )
+    for chunk in sent:
+        assert chunk.count("```") % 2 == 0, sent
+
+
+def test_close_sends_pending_text():
+    sent = _stream_chunks("no sentence end yet", step=5, chunk_chars=100)
+    assert sent == ["no sentence end yet"]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from copaw.agents.tools.search_index import TrigramIndex
+
+
+def _listing(root):
+    return [
+        (p, p.stat().st_mtime_ns, p.stat().st_size)
+        for p in sorted(root.iterdir())
+        if p.suffix == ".txt"
+    ]
+
+
+def test_clear_by_another_connection_is_detected(tmp_path):
+    root = tmp_path / "work"
+    root.mkdir()
+    (root / "a.txt").write_text("hello needle world", encoding="utf-8")
+    (root / "b.txt").write_text("nothing here", encoding="utf-8")
+    db = tmp_path / "index.db"
+
+    index = TrigramIndex(db_path=db, root=root)
+    index.refresh(_listing(root), under=root)
+    assert index.candidates(["needle"]) == {"a.txt"}
+
+    # e.g. `copaw search-index rebuild` running in another process
+    other = TrigramIndex(db_path=db, root=root)
+    other.clear()
+    other.close()
+
+    # Before any refresh, the index no longer has the rows: full scan
+    assert index.candidates(["needle"]) is None
+    # The next refresh reloads the entries and re-indexes the files
+    index.refresh(_listing(root), under=root)
+    assert index.candidates(["needle"]) == {"a.txt"}
+    assert index.stats()["files"] == 2
+    index.close()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+from copaw.app.runner.session import JournalSession
+
+
+class _Module:
+    """Minimal state module holding a raw state dict."""
+
+    def __init__(self, state=None):
+        self.state = state
+
+    def state_dict(self):
+        return self.state
+
+    def load_state_dict(self, state):
+        self.state = state
+
+
+def _item(msg_id, text, marks=None):
+    block = {"type": "tool_result", "id": msg_id, "output": text}
+    return [
+        {"id": msg_id, "role": "user", "content": [block], "metadata": {}},
+        list(marks or []),
+    ]
+
+
+def _records(tmp_path):
+    (journal,) = tmp_path.glob("*.journal.jsonl")
+    lines = journal.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line)["op"] for line in lines]
+
+
+def test_loaded_state_does_not_alias_view_and_diffs(tmp_path):
+    session = JournalSession(save_dir=str(tmp_path))
+    memory = _Module({"content": [_item("a", "x" * 100), _item("b", "hi")]})
+    asyncio.run(session.save_session_state("s", memory=memory))
+
+    loaded = session.get_session_state("s")["memory"]
+    # What a collapse of an old tool result does to the loaded Msg
+    loaded["content"][0][0]["content"][0]["output"] = "preview"
+    loaded["content"][1][1].append("compressed")
+    again = session.get_session_state("s")["memory"]
+    assert again["content"][0][0]["content"][0]["output"] == "x" * 100
+    assert again["content"][1][1] == []
+
+    memory.state = {"content": loaded["content"] + [_item("c", "new")]}
+    asyncio.run(session.save_session_state("s", memory=memory))
+    assert _records(tmp_path) == ["update", "marks", "append"]
+
+    fresh = JournalSession(save_dir=str(tmp_path))
+    assert fresh.get_session_state("s")["memory"] == memory.state
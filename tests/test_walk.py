@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from copaw.utils.walk import compile_glob, split_glob, walk
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.py").write_text("a")
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "m.py").write_text("m")
+    (tmp_path / "src" / "pkg" / "n.py").write_text("n")
+    return tmp_path
+
+
+def _glob(root, pattern):
+    ups, pattern = split_glob(pattern)
+    for _ in range(ups):
+        root = root.parent
+    regex = compile_glob(pattern)
+    return [
+        entry.rel_path
+        for entry in walk(root, include_dirs=True)
+        if regex.match(entry.rel_path)
+    ]
+
+
+def test_dot_prefixed_pattern(tree):
+    assert _glob(tree, "./*.py") == ["a.py"]
+    assert _glob(tree, "src/./*.py") == ["src/m.py"]
+
+
+def test_trailing_double_star_matches_base_dir(tree):
+    assert _glob(tree, "src/**") == [
+        "src",
+        "src/m.py",
+        "src/pkg",
+        "src/pkg/n.py",
+    ]
+
+
+def test_leading_parent_segments(tree):
+    assert split_glob("../../*.py") == (2, "*.py")
+    assert _glob(tree / "src", "../*.py") == ["a.py"]
+    with pytest.raises(ValueError):
+        split_glob("src/../*.py")
+
+
+def test_matches_path_glob(tree):
+    for pattern in ("*.py", "src/*", "**/*.py", "src/**/*.py", "*/pkg"):
+        expected = sorted(
+            p.relative_to(tree).as_posix() for p in tree.glob(pattern)
+        )
+        assert _glob(tree, pattern) == expected, pattern
+
+
+def test_glob_entries_like_path_glob(tree):
+    pytest.importorskip("agentscope")
+    from copaw.agents.tools.file_search import _glob_entries
+
+    assert _glob_entries(tree, "./*.py") == (["a.py"], False)
+    assert _glob_entries(tree, "src/**") == (["src/", "src/pkg/"], False)
+    assert _glob_entries(tree / "src", "../*.py") == (["../a.py"], False)